@@ -0,0 +1,313 @@
+from datetime import date
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import Date, case, cast, delete, event, func, insert, select
+from sqlalchemy.orm import Session
+from app import cache, models, units
+
+# ============================================================================
+# Exercise Progression Analytics
+# ============================================================================
+# Sets are rolled up into one `exercise_daily_summaries` row per user, exercise
+# name and workout date. Writes that touch a set recompute only the (user, name,
+# date) buckets they affect, so a progression query reads a few hundred summary
+# rows through the primary key instead of every set the lifter has logged.
+# Summaries are kept in kilograms, like the sets, and converted to the user's
+# unit by the progression query.
+#
+# The users whose summaries a transaction touches are noted on its session,
+# and their cached training reports are invalidated once it commits.
+
+# Brzycki divides by (37 - reps), so it is undefined from 37 reps up
+BRZYCKI_MAX_REPS = 37
+# Days refreshed per statement, keeping IN lists under SQLite's variable limit
+REFRESH_BATCH_SIZE = 500
+# Session.info key of the users whose sets the transaction changed
+CHANGED_USERS = "changed_users"
+
+SummaryKey = Tuple[int, str, date]
+
+summary = models.ExerciseDailySummary.__table__
+
+
+def epley(weight, reps):
+    return weight * (1 + reps / 30.0)
+
+
+def brzycki(weight, reps):
+    return case(
+        (reps < BRZYCKI_MAX_REPS, weight * 36.0 / (BRZYCKI_MAX_REPS - reps)),
+        else_=None,
+    )
+
+
+def summary_select(*criteria):
+    """SELECT producing summary rows for the sets matching `criteria`"""
+    s, e, w = models.Set, models.Exercise, models.Workout
+    e1rm = epley(s.weight_kg, s.reps)
+    ranked = (
+        select(
+            w.user_id.label("user_id"),
+            e.name.label("name"),
+            w.date.label("date"),
+            s.reps.label("reps"),
+            s.weight_kg.label("weight"),
+            e1rm.label("epley"),
+            brzycki(s.weight_kg, s.reps).label("brzycki"),
+            func.row_number()
+            .over(
+                partition_by=(w.user_id, e.name, w.date),
+                order_by=(e1rm.desc(), s.id),
+            )
+            .label("rank"),
+        )
+        .join(e, s.exercise_id == e.id)
+        .join(w, e.workout_id == w.id)
+        .where(*criteria)
+        .subquery()
+    )
+    best = ranked.c.rank == 1
+    return select(
+        ranked.c.user_id,
+        ranked.c.name,
+        ranked.c.date,
+        func.count(),
+        func.sum(ranked.c.reps),
+        func.sum(ranked.c.reps * ranked.c.weight),
+        func.max(ranked.c.weight),
+        func.max(ranked.c.epley),
+        func.max(ranked.c.brzycki),
+        func.max(case((best, ranked.c.reps))),
+        func.max(case((best, ranked.c.weight))),
+    ).group_by(ranked.c.user_id, ranked.c.name, ranked.c.date)
+
+
+SUMMARY_COLUMNS = [
+    "user_id",
+    "name",
+    "date",
+    "set_count",
+    "total_reps",
+    "total_volume",
+    "max_weight",
+    "best_e1rm_epley",
+    "best_e1rm_brzycki",
+    "best_set_reps",
+    "best_set_weight",
+]
+
+
+def refresh_summaries(db: Session, keys: Iterable[SummaryKey]):
+    """Recompute the summary rows for `keys` inside the caller's transaction
+
+    Whole days of a user are recomputed, so the sets are found through the
+    workout (user_id, date) index however many keys a bulk write touches; a
+    day holds few sets, and the rows of other exercises on it are rewritten
+    unchanged.
+    """
+    days_by_user = {}
+    for user_id, name, day in keys:
+        if name is not None:
+            days_by_user.setdefault(user_id, set()).add(day)
+    if not days_by_user:
+        return
+    note_changed_users(db, days_by_user)
+    db.flush()
+    for user_id, days in days_by_user.items():
+        days = list(days)
+        for offset in range(0, len(days), REFRESH_BATCH_SIZE):
+            batch = days[offset : offset + REFRESH_BATCH_SIZE]
+            db.execute(
+                delete(summary).where(
+                    summary.c.user_id == user_id, summary.c.date.in_(batch)
+                )
+            )
+            db.execute(
+                insert(summary).from_select(
+                    SUMMARY_COLUMNS,
+                    summary_select(
+                        models.Workout.user_id == user_id,
+                        models.Workout.date.in_(batch),
+                    ),
+                )
+            )
+
+
+def delete_summaries(db: Session, user_id: int, start: date, end: date):
+    """Drop a user's summary rows from `start` to `end`, after every workout on
+    those days was deleted"""
+    note_changed_users(db, [user_id])
+    db.execute(
+        delete(summary).where(
+            summary.c.user_id == user_id, summary.c.date.between(start, end)
+        )
+    )
+
+
+def note_changed_users(db: Session, user_ids: Iterable[int]):
+    db.info.setdefault(CHANGED_USERS, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_reports(session: Session):
+    for user_id in session.info.pop(CHANGED_USERS, ()):
+        cache.invalidate_reports(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_users(session: Session):
+    session.info.pop(CHANGED_USERS, None)
+
+
+def rebuild_summaries(db: Session):
+    """Recompute every summary row, e.g. to backfill existing history"""
+    db.execute(delete(summary))
+    db.execute(insert(summary).from_select(SUMMARY_COLUMNS, summary_select()))
+    db.commit()
+
+
+def summaries_need_rebuild(db: Session) -> bool:
+    has_sets = db.scalar(select(models.Set.id).limit(1)) is not None
+    has_summaries = db.scalar(select(summary.c.name).limit(1)) is not None
+    return has_sets and not has_summaries
+
+
+def key_for_exercise(db: Session, exercise_id: int) -> Optional[SummaryKey]:
+    row = db.execute(
+        select(models.Workout.user_id, models.Exercise.name, models.Workout.date)
+        .join(models.Workout, models.Exercise.workout_id == models.Workout.id)
+        .where(models.Exercise.id == exercise_id)
+    ).first()
+    return tuple(row) if row else None
+
+
+def refresh_for_exercise(db: Session, exercise_id: int):
+    key = key_for_exercise(db, exercise_id)
+    if key is not None:
+        refresh_summaries(db, [key])
+
+
+def keys_for_workout(db: Session, workout_id: int):
+    rows = db.execute(
+        select(models.Workout.user_id, models.Exercise.name, models.Workout.date)
+        .join(models.Workout, models.Exercise.workout_id == models.Workout.id)
+        .where(models.Workout.id == workout_id)
+        .distinct()
+    ).all()
+    return [tuple(row) for row in rows]
+
+
+# ============================================================================
+# Progression Queries
+# ============================================================================
+def date_bucket(db: Session, column, bucket: str):
+    """Truncate a date column to the start of its day, week or month"""
+    if bucket == "day":
+        return column
+    if db.get_bind().dialect.name == "sqlite":
+        if bucket == "week":
+            # SQLite weeks start on the most recent Monday
+            return func.date(column, "weekday 0", "-6 days")
+        return func.date(column, "start of month")
+    return cast(func.date_trunc(bucket, column), Date)
+
+
+def get_progression(
+    db: Session,
+    user_id: int,
+    exercise_name: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: str = "day",
+):
+    """Time series of volume, best set and e1RM for one of a user's exercises
+
+    A point is flagged as a PR when its best Epley e1RM beats every earlier
+    point, including history before `start`.
+    """
+    period = date_bucket(db, summary.c.date, bucket).label("period")
+    criteria = [summary.c.user_id == user_id, summary.c.name == exercise_name]
+    if start is not None:
+        criteria.append(summary.c.date >= start)
+    if end is not None:
+        criteria.append(summary.c.date <= end)
+
+    ranked = (
+        select(
+            period,
+            summary.c.set_count,
+            summary.c.total_reps,
+            summary.c.total_volume,
+            summary.c.max_weight,
+            summary.c.best_e1rm_epley,
+            summary.c.best_e1rm_brzycki,
+            summary.c.best_set_reps,
+            summary.c.best_set_weight,
+            func.row_number()
+            .over(
+                partition_by=period,
+                order_by=(summary.c.best_e1rm_epley.desc(), summary.c.date),
+            )
+            .label("rank"),
+        )
+        .where(*criteria)
+        .subquery()
+    )
+    best = ranked.c.rank == 1
+    rows = db.execute(
+        select(
+            ranked.c.period,
+            func.sum(ranked.c.set_count).label("set_count"),
+            func.sum(ranked.c.total_reps).label("total_reps"),
+            units.display_weight(func.sum(ranked.c.total_volume), user_id).label(
+                "total_volume"
+            ),
+            units.display_weight(func.max(ranked.c.max_weight), user_id).label(
+                "max_weight"
+            ),
+            units.to_user_unit(func.max(ranked.c.best_e1rm_epley), user_id).label(
+                "e1rm_epley"
+            ),
+            units.to_user_unit(func.max(ranked.c.best_e1rm_brzycki), user_id).label(
+                "e1rm_brzycki"
+            ),
+            func.max(case((best, ranked.c.best_set_reps))).label("best_set_reps"),
+            units.display_weight(
+                func.max(case((best, ranked.c.best_set_weight))), user_id
+            ).label("best_set_weight"),
+        )
+        .group_by(ranked.c.period)
+        .order_by(ranked.c.period)
+    ).all()
+
+    record = None
+    if start is not None:
+        record = db.scalar(
+            select(
+                units.to_user_unit(func.max(summary.c.best_e1rm_epley), user_id)
+            ).where(
+                summary.c.user_id == user_id,
+                summary.c.name == exercise_name,
+                summary.c.date < start,
+            )
+        )
+
+    points = []
+    for row in rows:
+        is_pr = record is None or row.e1rm_epley > record
+        if is_pr:
+            record = row.e1rm_epley
+        points.append(
+            {
+                "period": row.period,
+                "set_count": row.set_count,
+                "total_reps": row.total_reps,
+                "total_volume": row.total_volume,
+                "max_weight": row.max_weight,
+                "e1rm_epley": row.e1rm_epley,
+                "e1rm_brzycki": row.e1rm_brzycki,
+                "best_set": {"reps": row.best_set_reps, "weight": row.best_set_weight},
+                "is_pr": is_pr,
+            }
+        )
+    return {"exercise_name": exercise_name, "bucket": bucket, "points": points}
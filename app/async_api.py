@@ -0,0 +1,528 @@
+from fastapi import APIRouter, Body, Depends, FastAPI, HTTPException, Query, Request
+from fastapi import Response, status
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import async_crud as crud, schemas
+from app import crud as sync_crud
+from app.cache import template_cache, template_key
+from app.config import settings
+from app.database import get_async_db
+from app.idempotency import Idempotent, get_idempotency_key
+from app.pagination import InvalidCursor
+from app.tenancy import get_user_id
+from app.serialization import json_response
+
+# Async handlers for the core CRUD routes in app.main. They are installed in
+# place of the sync handlers when FITNESS_ASYNC_DB is enabled; every other
+# route keeps running on the threadpool against the sync engine.
+
+router = APIRouter()
+
+
+# Workout Template Endpoints
+@router.post(
+    "/workout-templates/",
+    response_model=schemas.WorkoutTemplateResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_workout_template(
+    workout_template: schemas.WorkoutTemplateCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a new workout template"""
+    async with Idempotent(
+        db, request, workout_template, idempotency_key, user_id
+    ) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        if not await crud.user_exists(db=db, user_id=user_id):
+            raise HTTPException(status_code=404, detail="User not found")
+        db_template = await crud.create_workout_template(
+            db=db, user_id=user_id, workout_template=workout_template
+        )
+        return await idempotent.respond_async(
+            schemas.WorkoutTemplateResponse,
+            db_template,
+            status_code=status.HTTP_201_CREATED,
+        )
+
+
+@router.get("/workout-templates/", response_model=List[schemas.WorkoutTemplateResponse])
+async def read_workout_templates(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, gt=0, le=schemas.PAGE_LIMIT_MAX),
+    cursor: Optional[str] = None,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all workout templates
+
+    Passing `cursor` switches from offset to keyset pagination; the cursor for
+    the following page is returned in the `X-Next-Cursor` header.
+    """
+    if cursor is None:
+        key = template_key("workout_templates", user_id, skip, limit)
+        cached = template_cache.respond(request, key)
+        if cached is not None:
+            return cached
+        return template_cache.store(
+            request,
+            key,
+            List[schemas.WorkoutTemplateResponse],
+            await crud.get_workout_templates(
+                db=db, user_id=user_id, skip=skip, limit=limit
+            ),
+        )
+    try:
+        items, next_cursor = await db.run_sync(
+            sync_crud.get_workout_templates_page, user_id, cursor, limit
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@router.get(
+    "/workout-templates/{workout_template_id}",
+    response_model=schemas.WorkoutTemplateResponse,
+)
+async def read_workout_template(
+    workout_template_id: int,
+    request: Request,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a specific workout template by ID"""
+    key = template_key("workout_template", user_id, workout_template_id)
+    cached = template_cache.respond(request, key)
+    if cached is not None:
+        return cached
+    db_workout_template = await crud.get_workout_template(
+        db=db, user_id=user_id, workout_template_id=workout_template_id
+    )
+    if db_workout_template is None:
+        raise HTTPException(status_code=404, detail="Workout template not found")
+    return template_cache.store(
+        request, key, schemas.WorkoutTemplateResponse, db_workout_template
+    )
+
+
+@router.put(
+    "/workout-templates/{workout_template_id}",
+    response_model=schemas.WorkoutTemplateResponse,
+)
+@router.patch(
+    "/workout-templates/{workout_template_id}",
+    response_model=schemas.WorkoutTemplateResponse,
+)
+async def update_workout_template(
+    workout_template_id: int,
+    workout_template: schemas.WorkoutTemplateUpdate,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update a workout template"""
+    db_workout_template = await crud.update_workout_template(
+        db=db,
+        user_id=user_id,
+        workout_template_id=workout_template_id,
+        workout_template=workout_template,
+    )
+    if db_workout_template is None:
+        raise HTTPException(status_code=404, detail="Workout template not found")
+    return db_workout_template
+
+
+@router.delete(
+    "/workout-templates/{workout_template_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_workout_template(
+    workout_template_id: int,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Delete a workout template"""
+    if not await crud.delete_workout_template(
+        db=db, user_id=user_id, workout_template_id=workout_template_id
+    ):
+        raise HTTPException(status_code=404, detail="Workout template not found")
+    return None
+
+
+# Exercise Template Endpoints
+@router.post(
+    "/workout-templates/{workout_template_id}/exercise-templates/",
+    response_model=schemas.ExerciseTemplateResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_exercise_template(
+    workout_template_id: int,
+    exercise_template: schemas.ExerciseTemplateCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a new exercise template within a workout template"""
+    async with Idempotent(
+        db, request, exercise_template, idempotency_key, user_id
+    ) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        # Verify workout template exists
+        if not await crud.workout_template_exists(
+            db=db, user_id=user_id, workout_template_id=workout_template_id
+        ):
+            raise HTTPException(status_code=404, detail="Workout template not found")
+        db_template = await crud.create_exercise_template(
+            db=db,
+            user_id=user_id,
+            workout_template_id=workout_template_id,
+            exercise_template=exercise_template,
+        )
+        return await idempotent.respond_async(
+            schemas.ExerciseTemplateResponse,
+            db_template,
+            status_code=status.HTTP_201_CREATED,
+        )
+
+
+@router.get(
+    "/workout-templates/{workout_template_id}/exercise-templates/",
+    response_model=List[schemas.ExerciseTemplateResponse],
+)
+async def read_exercise_templates(
+    workout_template_id: int,
+    request: Request,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all exercise templates for a workout template"""
+    key = template_key("exercise_templates", user_id, workout_template_id)
+    cached = template_cache.respond(request, key)
+    if cached is not None:
+        return cached
+    return template_cache.store(
+        request,
+        key,
+        List[schemas.ExerciseTemplateResponse],
+        await crud.get_exercise_templates_by_workout_template(
+            db=db, user_id=user_id, workout_template_id=workout_template_id
+        ),
+    )
+
+
+@router.get(
+    "/exercise-templates/{exercise_template_id}",
+    response_model=schemas.ExerciseTemplateResponse,
+)
+async def read_exercise_template(
+    exercise_template_id: int,
+    request: Request,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a specific exercise template by ID"""
+    key = template_key("exercise_template", user_id, exercise_template_id)
+    cached = template_cache.respond(request, key)
+    if cached is not None:
+        return cached
+    db_exercise_template = await crud.get_exercise_template(
+        db=db, user_id=user_id, exercise_template_id=exercise_template_id
+    )
+    if db_exercise_template is None:
+        raise HTTPException(status_code=404, detail="Exercise template not found")
+    return template_cache.store(
+        request, key, schemas.ExerciseTemplateResponse, db_exercise_template
+    )
+
+
+@router.put(
+    "/exercise-templates/{exercise_template_id}",
+    response_model=schemas.ExerciseTemplateResponse,
+)
+@router.patch(
+    "/exercise-templates/{exercise_template_id}",
+    response_model=schemas.ExerciseTemplateResponse,
+)
+async def update_exercise_template(
+    exercise_template_id: int,
+    exercise_template: schemas.ExerciseTemplateUpdate,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update an exercise template"""
+    db_exercise_template = await crud.update_exercise_template(
+        db=db,
+        user_id=user_id,
+        exercise_template_id=exercise_template_id,
+        exercise_template=exercise_template,
+    )
+    if db_exercise_template is None:
+        raise HTTPException(status_code=404, detail="Exercise template not found")
+    return db_exercise_template
+
+
+@router.delete(
+    "/exercise-templates/{exercise_template_id}", status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_exercise_template(
+    exercise_template_id: int,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Delete an exercise template"""
+    if not await crud.delete_exercise_template(
+        db=db, user_id=user_id, exercise_template_id=exercise_template_id
+    ):
+        raise HTTPException(status_code=404, detail="Exercise template not found")
+    return None
+
+
+# Exercise Endpoints
+@router.post(
+    "/workout/{workout_id}/exercises/",
+    response_model=schemas.ExerciseResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_exercise(
+    workout_id: int,
+    exercise: schemas.ExerciseCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a new exercise within a workout"""
+    async with Idempotent(
+        db, request, exercise, idempotency_key, user_id
+    ) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        # Verify workout exists
+        if not await crud.workout_exists(db=db, user_id=user_id, workout_id=workout_id):
+            raise HTTPException(status_code=404, detail="Workout  not found")
+        db_exercise = await crud.create_exercise(
+            db=db, workout_id=workout_id, exercise=exercise
+        )
+        return await idempotent.respond_async(
+            schemas.ExerciseResponse,
+            db_exercise,
+            status_code=status.HTTP_201_CREATED,
+        )
+
+
+@router.get(
+    "/workout/{workout_id}/exercises/", response_model=List[schemas.ExerciseResponse]
+)
+async def read_exercises(
+    workout_id: int,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all exercises for a workout"""
+    if settings.fast_json:
+        rows = await db.run_sync(
+            sync_crud.get_exercise_rows_by_workout, user_id, workout_id
+        )
+        if rows is None:
+            raise HTTPException(status_code=404, detail="Workout not found")
+        return json_response(List[schemas.ExerciseResponse], rows)
+    exercises = await crud.get_exercises_by_workout(
+        db=db, user_id=user_id, workout_id=workout_id
+    )
+    if exercises is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    return exercises
+
+
+@router.get("/exercises/{exercise_id}", response_model=schemas.ExerciseResponse)
+async def read_exercise(
+    exercise_id: int,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a specific exercise by ID"""
+    if settings.fast_json:
+        row = await db.run_sync(sync_crud.get_exercise_row, user_id, exercise_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        return json_response(schemas.ExerciseResponse, row)
+    db_exercise = await crud.get_exercise(
+        db=db, user_id=user_id, exercise_id=exercise_id
+    )
+    if db_exercise is None:
+        raise HTTPException(status_code=404, detail="Exercise not found")
+    return db_exercise
+
+
+@router.put("/exercises/{exercise_id}", response_model=schemas.ExerciseResponse)
+@router.patch("/exercises/{exercise_id}", response_model=schemas.ExerciseResponse)
+async def update_exercise(
+    exercise_id: int,
+    exercise: schemas.ExerciseUpdate,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update an exercise"""
+    db_exercise = await crud.update_exercise(
+        db=db, user_id=user_id, exercise_id=exercise_id, exercise=exercise
+    )
+    if db_exercise is None:
+        raise HTTPException(status_code=404, detail="Exercise not found")
+    return db_exercise
+
+
+@router.delete("/exercises/{exercise_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_exercise(
+    exercise_id: int,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Delete an exercise"""
+    if not await crud.delete_exercise(db=db, user_id=user_id, exercise_id=exercise_id):
+        raise HTTPException(status_code=404, detail="Exercise not found")
+    return None
+
+
+# Set Endpoints
+@router.post(
+    "/exercises/{exercise_id}/sets/",
+    response_model=schemas.SetResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_set(
+    exercise_id: int,
+    set_data: schemas.SetCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create a new set for an exercise"""
+    async with Idempotent(
+        db, request, set_data, idempotency_key, user_id
+    ) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        # Verify exercise exists
+        if not await crud.exercise_exists(
+            db=db, user_id=user_id, exercise_id=exercise_id
+        ):
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        db_set = await crud.create_set(
+            db=db, user_id=user_id, exercise_id=exercise_id, set_data=set_data
+        )
+        return await idempotent.respond_async(
+            schemas.SetResponse, db_set, status_code=status.HTTP_201_CREATED
+        )
+
+
+@router.patch(
+    "/exercises/{exercise_id}/sets/", response_model=List[schemas.SetResponse]
+)
+async def update_sets(
+    exercise_id: int,
+    set_updates: List[schemas.SetBulkUpdate] = Body(
+        min_length=1, max_length=schemas.SETS_UPDATE_MAX
+    ),
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update several sets of an exercise in one statement"""
+    if len({set_update.id for set_update in set_updates}) != len(set_updates):
+        raise HTTPException(status_code=422, detail="Set ids must be unique")
+    sets = await crud.update_sets(
+        db=db, user_id=user_id, exercise_id=exercise_id, set_updates=set_updates
+    )
+    if sets is None:
+        raise HTTPException(status_code=404, detail="Set not found")
+    return sets
+
+
+@router.get("/exercises/{exercise_id}/sets/", response_model=List[schemas.SetResponse])
+async def read_sets(
+    exercise_id: int,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get all sets for an exercise"""
+    if settings.fast_json:
+        rows = await db.run_sync(
+            sync_crud.get_set_rows_by_exercise, user_id, exercise_id
+        )
+        if rows is None:
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        return json_response(List[schemas.SetResponse], rows)
+    sets = await crud.get_sets_by_exercise(
+        db=db, user_id=user_id, exercise_id=exercise_id
+    )
+    if sets is None:
+        raise HTTPException(status_code=404, detail="Exercise not found")
+    return sets
+
+
+@router.get("/sets/{set_id}", response_model=schemas.SetResponse)
+async def read_set(
+    set_id: int,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a specific set by ID"""
+    db_set = await crud.get_set(db=db, user_id=user_id, set_id=set_id)
+    if db_set is None:
+        raise HTTPException(status_code=404, detail="Set not found")
+    return db_set
+
+
+@router.put("/sets/{set_id}", response_model=schemas.SetResponse)
+@router.patch("/sets/{set_id}", response_model=schemas.SetResponse)
+async def update_set(
+    set_id: int,
+    set_data: schemas.SetUpdate,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Update a set; fields left out keep their value"""
+    db_set = await crud.update_set(
+        db=db, user_id=user_id, set_id=set_id, set_data=set_data
+    )
+    if db_set is None:
+        raise HTTPException(status_code=404, detail="Set not found")
+    return db_set
+
+
+@router.delete("/sets/{set_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_set(
+    set_id: int,
+    user_id: int = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Delete a set"""
+    if not await crud.delete_set(db=db, user_id=user_id, set_id=set_id):
+        raise HTTPException(status_code=404, detail="Set not found")
+    return None
+
+
+def route_keys(route):
+    return {(route.path, method) for method in route.methods}
+
+
+def install(app: FastAPI):
+    """Replace the sync handlers of `app` that this router reimplements"""
+    replaced = set().union(*(route_keys(route) for route in router.routes))
+    app.router.routes = [
+        route
+        for route in app.router.routes
+        if not (isinstance(route, APIRoute) and route_keys(route) <= replaced)
+    ]
+    app.include_router(router)
+    app.openapi_schema = None
@@ -0,0 +1,350 @@
+from typing import List
+from sqlalchemy import delete, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import analytics, cache, models, schemas, units
+from app.crud import (
+    WORKOUT_TEMPLATE_LOAD,
+    changed_fields,
+    delete_exercise_template_statement,
+    delete_set_statement,
+    delete_workout_template_statement,
+    exercise_load,
+    outer_joined_children,
+    renamed_exercise_keys,
+    update_exercise_statement,
+    update_exercise_template_statement,
+    update_set_statement,
+    update_sets_statement,
+    update_workout_template_statement,
+    updated_sets,
+)
+
+# Async counterparts of app.crud. Lazy loading cannot run outside an await, so
+# every read eagerly loads the graph its response schema serializes and new
+# parents are created with empty child collections already loaded. Summary
+# maintenance reuses the sync analytics code through `run_sync`.
+
+
+# User CRUD
+async def user_exists(db: AsyncSession, user_id: int) -> bool:
+    return await db.scalar(select(exists().where(models.User.id == user_id)))
+
+
+# Workout Template CRUD
+async def create_workout_template(
+    db: AsyncSession, user_id: int, workout_template: schemas.WorkoutTemplateCreate
+):
+    db_workout_template = models.WorkoutTemplate(
+        name=workout_template.name, user_id=user_id, exercise_templates=[]
+    )
+    db.add(db_workout_template)
+    await db.commit()
+    cache.invalidate_templates(user_id)
+    return db_workout_template
+
+
+async def get_workout_template(
+    db: AsyncSession, user_id: int, workout_template_id: int
+):
+    return await db.scalar(
+        select(models.WorkoutTemplate)
+        .options(WORKOUT_TEMPLATE_LOAD)
+        .where(
+            models.WorkoutTemplate.id == workout_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
+    )
+
+
+async def get_workout_templates(
+    db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100
+):
+    result = await db.scalars(
+        select(models.WorkoutTemplate)
+        .options(WORKOUT_TEMPLATE_LOAD)
+        .where(models.WorkoutTemplate.user_id == user_id)
+        .order_by(models.WorkoutTemplate.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def update_workout_template(
+    db: AsyncSession,
+    user_id: int,
+    workout_template_id: int,
+    workout_template: schemas.WorkoutTemplateUpdate,
+):
+    db_workout_template = (
+        await db.scalars(
+            update_workout_template_statement(
+                user_id, workout_template_id, workout_template
+            )
+        )
+    ).one_or_none()
+    await db.commit()
+    if db_workout_template is not None:
+        cache.invalidate_templates(user_id)
+    return db_workout_template
+
+
+async def delete_workout_template(
+    db: AsyncSession, user_id: int, workout_template_id: int
+) -> bool:
+    deleted = await db.scalar(
+        delete_workout_template_statement(user_id, workout_template_id)
+    )
+    await db.commit()
+    if deleted is None:
+        return False
+    cache.invalidate_templates(user_id)
+    return True
+
+
+# Exercise Template CRUD
+async def create_exercise_template(
+    db: AsyncSession,
+    user_id: int,
+    workout_template_id: int,
+    exercise_template: schemas.ExerciseTemplateCreate,
+):
+    db_exercise_template = models.ExerciseTemplate(
+        name=exercise_template.name, workout_template_id=workout_template_id
+    )
+    db.add(db_exercise_template)
+    await db.commit()
+    cache.invalidate_templates(user_id)
+    return db_exercise_template
+
+
+async def workout_template_exists(
+    db: AsyncSession, user_id: int, workout_template_id: int
+) -> bool:
+    return await db.scalar(
+        select(
+            exists().where(
+                models.WorkoutTemplate.id == workout_template_id,
+                models.WorkoutTemplate.user_id == user_id,
+            )
+        )
+    )
+
+
+async def get_exercise_template(
+    db: AsyncSession, user_id: int, exercise_template_id: int
+):
+    return await db.scalar(
+        select(models.ExerciseTemplate)
+        .join(models.ExerciseTemplate.workout_template)
+        .where(
+            models.ExerciseTemplate.id == exercise_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
+    )
+
+
+async def get_exercise_templates_by_workout_template(
+    db: AsyncSession, user_id: int, workout_template_id: int
+):
+    result = await db.scalars(
+        select(models.ExerciseTemplate)
+        .join(models.ExerciseTemplate.workout_template)
+        .where(
+            models.ExerciseTemplate.workout_template_id == workout_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
+    )
+    return result.all()
+
+
+async def update_exercise_template(
+    db: AsyncSession,
+    user_id: int,
+    exercise_template_id: int,
+    exercise_template: schemas.ExerciseTemplateUpdate,
+):
+    db_exercise_template = (
+        await db.scalars(
+            update_exercise_template_statement(
+                user_id, exercise_template_id, exercise_template
+            )
+        )
+    ).one_or_none()
+    await db.commit()
+    if db_exercise_template is not None:
+        cache.invalidate_templates(user_id)
+    return db_exercise_template
+
+
+async def delete_exercise_template(
+    db: AsyncSession, user_id: int, exercise_template_id: int
+) -> bool:
+    deleted = await db.scalar(
+        delete_exercise_template_statement(user_id, exercise_template_id)
+    )
+    await db.commit()
+    if deleted is None:
+        return False
+    cache.invalidate_templates(user_id)
+    return True
+
+
+# Workout CRUD
+async def workout_exists(db: AsyncSession, user_id: int, workout_id: int) -> bool:
+    return await db.scalar(
+        select(
+            exists().where(
+                models.Workout.id == workout_id, models.Workout.user_id == user_id
+            )
+        )
+    )
+
+
+# Exercise CRUD
+async def create_exercise(
+    db: AsyncSession, workout_id: int, exercise: schemas.ExerciseCreate
+):
+    db_exercise = models.Exercise(name=exercise.name, workout_id=workout_id, sets=[])
+    db.add(db_exercise)
+    await db.commit()
+    return db_exercise
+
+
+async def get_exercise(db: AsyncSession, user_id: int, exercise_id: int):
+    return await db.scalar(
+        select(models.Exercise)
+        .join(models.Exercise.workout)
+        .options(exercise_load(user_id))
+        .where(models.Exercise.id == exercise_id, models.Workout.user_id == user_id)
+    )
+
+
+async def exercise_exists(db: AsyncSession, user_id: int, exercise_id: int) -> bool:
+    return await db.scalar(
+        select(
+            exists().where(
+                models.Exercise.id == exercise_id,
+                models.Exercise.workout_id == models.Workout.id,
+                models.Workout.user_id == user_id,
+            )
+        )
+    )
+
+
+async def get_exercises_by_workout(db: AsyncSession, user_id: int, workout_id: int):
+    result = await db.scalars(
+        select(models.Exercise)
+        .select_from(models.Workout)
+        .outerjoin(models.Exercise)
+        .options(exercise_load(user_id))
+        .where(models.Workout.id == workout_id, models.Workout.user_id == user_id)
+        .order_by(models.Exercise.id)
+    )
+    return outer_joined_children(result.all())
+
+
+async def update_exercise(
+    db: AsyncSession, user_id: int, exercise_id: int, exercise: schemas.ExerciseUpdate
+):
+    stale_key = await db.run_sync(analytics.key_for_exercise, exercise_id)
+    if stale_key is None or stale_key[0] != user_id:
+        return None
+    values = changed_fields(exercise)
+    db_exercise = (
+        await db.scalars(update_exercise_statement(user_id, exercise_id, values))
+    ).one()
+    await db.run_sync(
+        analytics.refresh_summaries, renamed_exercise_keys(stale_key, values)
+    )
+    await db.commit()
+    return db_exercise
+
+
+async def delete_exercise(db: AsyncSession, user_id: int, exercise_id: int) -> bool:
+    stale_key = await db.run_sync(analytics.key_for_exercise, exercise_id)
+    if stale_key is None or stale_key[0] != user_id:
+        return False
+    await db.execute(delete(models.Exercise).where(models.Exercise.id == exercise_id))
+    await db.run_sync(analytics.refresh_summaries, [stale_key])
+    await db.commit()
+    return True
+
+
+# Set CRUD
+async def create_set(
+    db: AsyncSession, user_id: int, exercise_id: int, set_data: schemas.SetCreate
+):
+    db_set = models.Set(
+        reps=set_data.reps,
+        weight_kg=units.canonical_weight(set_data.weight, user_id),
+        exercise_id=exercise_id,
+    )
+    db.add(db_set)
+    await db.run_sync(analytics.refresh_for_exercise, exercise_id)
+    await db.commit()
+    return await get_set(db, user_id, db_set.id)
+
+
+async def get_set(db: AsyncSession, user_id: int, set_id: int):
+    return await db.scalar(
+        select(models.Set)
+        .join(models.Set.exercise)
+        .join(models.Exercise.workout)
+        .options(units.set_weight(user_id))
+        .where(models.Set.id == set_id, models.Workout.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def get_sets_by_exercise(db: AsyncSession, user_id: int, exercise_id: int):
+    result = await db.scalars(
+        select(models.Set)
+        .select_from(models.Exercise)
+        .join(models.Exercise.workout)
+        .outerjoin(models.Exercise.sets)
+        .options(units.set_weight(user_id))
+        .where(models.Exercise.id == exercise_id, models.Workout.user_id == user_id)
+        .order_by(models.Set.id)
+    )
+    return outer_joined_children(result.all())
+
+
+async def update_set(
+    db: AsyncSession, user_id: int, set_id: int, set_data: schemas.SetUpdate
+):
+    row = (
+        await db.execute(update_set_statement(user_id, set_id, set_data))
+    ).one_or_none()
+    if row is None:
+        return None
+    await db.run_sync(analytics.refresh_for_exercise, row.exercise_id)
+    await db.commit()
+    return row._asdict()
+
+
+async def update_sets(
+    db: AsyncSession,
+    user_id: int,
+    exercise_id: int,
+    set_updates: List[schemas.SetBulkUpdate],
+):
+    rows = (
+        await db.execute(update_sets_statement(user_id, exercise_id, set_updates))
+    ).all()
+    sets = updated_sets(rows, set_updates)
+    if sets is None:
+        await db.rollback()
+        return None
+    await db.run_sync(analytics.refresh_for_exercise, exercise_id)
+    await db.commit()
+    return sets
+
+
+async def delete_set(db: AsyncSession, user_id: int, set_id: int) -> bool:
+    exercise_id = await db.scalar(delete_set_statement(user_id, set_id))
+    if exercise_id is None:
+        return False
+    await db.run_sync(analytics.refresh_for_exercise, exercise_id)
+    await db.commit()
+    return True
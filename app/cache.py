@@ -0,0 +1,205 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request, Response, status
+from app.config import settings
+from app.serialization import dump_json
+
+# ============================================================================
+# Template Response Cache
+# ============================================================================
+# Workout and exercise templates are read far more often than they change, so
+# their serialized JSON is cached and served with an ETag. Entries are keyed on
+# a generation counter that the crud mutators bump after they commit, so every
+# cached id and list page goes stale at once without enumerating keys, and
+# unreachable entries age out through the LRU and TTL.
+
+
+class MemoryBackend:
+    """Process local LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Counters live outside the LRU so they outlive the entries they version
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key]).encode()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisBackend:
+    """Cache shared by every worker, stored in Redis (requires `redis`)"""
+
+    def __init__(self, url: str, prefix: str = "fitness:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+def create_backend(url: str, max_entries: int):
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisBackend(url)
+    if url == "memory://":
+        return MemoryBackend(max_entries)
+    raise ValueError(f"Unsupported cache URL {url!r}")
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl: Optional[int] = None):
+        self.backend = backend
+        self.ttl = ttl
+
+    def json_response(self, request: Request, body: bytes) -> Response:
+        etag = make_etag(body)
+        if etag_matches(request, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+        return Response(
+            content=body, media_type="application/json", headers={"ETag": etag}
+        )
+
+    def respond(self, request: Request, key: str) -> Optional[Response]:
+        """Build a response from the cache, or return None on a miss"""
+        body = self.backend.get(key)
+        if body is None:
+            return None
+        return self.json_response(request, body)
+
+    def store(self, request: Request, key: str, response_type, value) -> Response:
+        """Serialize `value` as `response_type`, cache it and build a response"""
+        body = dump_json(response_type, value)
+        self.backend.set(key, body, self.ttl)
+        return self.json_response(request, body)
+
+    def generation(self, name: str) -> int:
+        value = self.backend.get(f"{name}:generation")
+        return int(value) if value is not None else 0
+
+    def clear(self):
+        self.backend.clear()
+
+
+template_cache = ResponseCache(
+    create_backend(settings.cache_url, settings.template_cache_size),
+    ttl=settings.template_cache_ttl,
+)
+
+
+# ============================================================================
+# Template Keys And Invalidation
+# ============================================================================
+# Every template key embeds the id of the user whose templates it holds and
+# that user's current generation, so a write only invalidates the writer's
+# entries. A key is built before the database read it caches, so a response
+# read just before a write commits is stored under the old generation and can
+# never be served afterwards.
+TEMPLATES = "templates"
+
+
+def template_key(kind: str, user_id: int, *parts) -> str:
+    generation = template_cache.generation(f"{TEMPLATES}:{user_id}")
+    return f"{TEMPLATES}:{user_id}:{generation}:{kind}:" + ":".join(
+        str(p) for p in parts
+    )
+
+
+def invalidate_templates(user_id: int):
+    """Called by every workout and exercise template mutator after commit"""
+    template_cache.backend.incr(f"{TEMPLATES}:{user_id}:generation")
+
+
+# ============================================================================
+# Report Keys And Invalidation
+# ============================================================================
+# A requested report maps to the job building it, under a key embedding a
+# generation of the user's training data. Committing a change to the user's
+# sets bumps the generation, see app.analytics, so a finished report is reused
+# until then. Keys are built before the job reads anything, like template keys.
+#
+# The generation is bumped in the backend of the process that committed, which
+# with memory:// the other workers never see, so entries also expire after
+# REPORT_CACHE_TTL seconds.
+REPORTS = "reports"
+REPORT_CACHE_MAX = 10000
+
+report_cache = create_backend(settings.cache_url, REPORT_CACHE_MAX)
+
+
+def report_key(user_id: int, *parts) -> str:
+    generation = report_cache.get(f"{REPORTS}:{user_id}:generation")
+    generation = int(generation) if generation is not None else 0
+    return f"{REPORTS}:{user_id}:{generation}:" + ":".join(str(p) for p in parts)
+
+
+def invalidate_reports(user_id: int):
+    report_cache.incr(f"{REPORTS}:{user_id}:generation")
@@ -0,0 +1,152 @@
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# ============================================================================
+# Settings (Read From The Environment At Startup)
+# ============================================================================
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+
+def env_str(name: str, default: str) -> str:
+    return os.getenv(name, default)
+
+
+def env_list(name: str) -> Tuple[str, ...]:
+    """Comma separated values, empty when unset"""
+    value = os.getenv(name, "")
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+@dataclass(frozen=True)
+class Settings:
+    database_url: str = "sqlite:///./fitness.db"
+    # Databases holding each user's workouts and templates, picked by a hash of
+    # the user id. `database_url` keeps the users directory; empty = no shards
+    database_shards: Tuple[str, ...] = ()
+    # Read-only copies of `database_url` serving GET requests; SQLite files are
+    # opened with mode=ro. A client's reads stay on the primary for
+    # `read_your_writes_seconds` after it writes
+    database_replicas: Tuple[str, ...] = ()
+    read_your_writes_seconds: int = 5
+    # Serve the core CRUD routes with async handlers on an async engine
+    async_db: bool = False
+    # Run pending migrations at startup; disable to run `alembic upgrade head`
+    # as a separate deploy step
+    auto_migrate: bool = True
+    # Serve the hot read routes from plain rows encoded straight to JSON bytes
+    fast_json: bool = False
+
+    # Connection pool (ignored by pools that do not support the option)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = False
+    pool_recycle: int = -1
+
+    # SQLite pragmas applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64000  # negative values are KiB, so 64 MB
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout: int = 5000  # milliseconds
+    # Deletes rely on the ON DELETE actions of the foreign keys
+    sqlite_foreign_keys: str = "ON"
+
+    # Request metrics on /metrics, and the threshold above which a statement
+    # is logged with its route (0 disables the slow-query log)
+    metrics: bool = True
+    slow_query_ms: int = 100
+
+    # Request profiling, off unless a token is set. Requests carrying the
+    # token are profiled on demand; a fraction are also sampled continuously
+    profile_token: str = ""
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: int = 10
+
+    # Template response cache: memory:// per process, or redis://host/db shared
+    cache_url: str = "memory://"
+    template_cache_size: int = 1024
+    template_cache_ttl: int = 300  # seconds
+
+    # How long the response to a create request is replayed to retries that
+    # send the same Idempotency-Key
+    idempotency_ttl: int = 24 * 60 * 60  # seconds
+    # How long a key stays claimed by a request that has not stored its
+    # response, after which a retry may take it over
+    idempotency_lease: int = 30  # seconds
+
+    # Worker processes building training reports, started on the first request
+    report_workers: int = 2
+    # How long a finished report is reused. With memory:// only the worker a
+    # set was written to sees the change, so this bounds how stale the other
+    # workers' reports get
+    report_cache_ttl: int = 300  # seconds
+    # How long a running report job is left to its worker before a starting
+    # server runs it again
+    report_job_lease: int = 600  # seconds
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            database_url=env_str("DATABASE_URL", cls.database_url),
+            database_shards=env_list("DATABASE_SHARDS"),
+            database_replicas=env_list("DATABASE_REPLICAS"),
+            read_your_writes_seconds=env_int(
+                "READ_YOUR_WRITES_SECONDS", cls.read_your_writes_seconds
+            ),
+            async_db=env_bool("FITNESS_ASYNC_DB", cls.async_db),
+            auto_migrate=env_bool("FITNESS_AUTO_MIGRATE", cls.auto_migrate),
+            fast_json=env_bool("FITNESS_FAST_JSON", cls.fast_json),
+            pool_size=env_int("DB_POOL_SIZE", cls.pool_size),
+            max_overflow=env_int("DB_MAX_OVERFLOW", cls.max_overflow),
+            pool_pre_ping=env_bool("DB_POOL_PRE_PING", cls.pool_pre_ping),
+            pool_recycle=env_int("DB_POOL_RECYCLE", cls.pool_recycle),
+            sqlite_journal_mode=env_str("SQLITE_JOURNAL_MODE", cls.sqlite_journal_mode),
+            sqlite_synchronous=env_str("SQLITE_SYNCHRONOUS", cls.sqlite_synchronous),
+            sqlite_mmap_size=env_int("SQLITE_MMAP_SIZE", cls.sqlite_mmap_size),
+            sqlite_cache_size=env_int("SQLITE_CACHE_SIZE", cls.sqlite_cache_size),
+            sqlite_temp_store=env_str("SQLITE_TEMP_STORE", cls.sqlite_temp_store),
+            sqlite_busy_timeout=env_int("SQLITE_BUSY_TIMEOUT", cls.sqlite_busy_timeout),
+            sqlite_foreign_keys=env_str("SQLITE_FOREIGN_KEYS", cls.sqlite_foreign_keys),
+            cache_url=env_str("CACHE_URL", cls.cache_url),
+            template_cache_size=env_int("TEMPLATE_CACHE_SIZE", cls.template_cache_size),
+            template_cache_ttl=env_int("TEMPLATE_CACHE_TTL", cls.template_cache_ttl),
+            idempotency_ttl=env_int("IDEMPOTENCY_TTL", cls.idempotency_ttl),
+            idempotency_lease=env_int("IDEMPOTENCY_LEASE", cls.idempotency_lease),
+            report_workers=env_int("REPORT_WORKERS", cls.report_workers),
+            report_cache_ttl=env_int("REPORT_CACHE_TTL", cls.report_cache_ttl),
+            report_job_lease=env_int("REPORT_JOB_LEASE", cls.report_job_lease),
+            metrics=env_bool("FITNESS_METRICS", cls.metrics),
+            slow_query_ms=env_int("SLOW_QUERY_MS", cls.slow_query_ms),
+            profile_token=env_str("PROFILE_TOKEN", cls.profile_token),
+            profile_sample_rate=env_float(
+                "PROFILE_SAMPLE_RATE", cls.profile_sample_rate
+            ),
+            profile_interval_ms=env_int("PROFILE_INTERVAL_MS", cls.profile_interval_ms),
+        )
+
+
+settings = Settings.from_env()
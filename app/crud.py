@@ -1,55 +1,224 @@
-from sqlalchemy.orm import Session
-from app import models, schemas
+import sys
+from datetime import date
+from operator import itemgetter
+from typing import List, Optional
+from sqlalchemy import (
+    Date,
+    Integer,
+    String,
+    and_,
+    bindparam,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app import analytics, cache, models, schemas, units
+from app.pagination import paginate, seek
+
+# Loader options matching the graph each response schema serializes. Single-row
+# reads use a JOIN, list reads use one extra SELECT ... IN per relationship so
+# the number of statements does not grow with the page size.
+WORKOUT_TEMPLATE_LOAD = selectinload(models.WorkoutTemplate.exercise_templates)
+
+
+def exercise_load(user_id: int):
+    return selectinload(models.Exercise.sets).options(units.set_weight(user_id))
+
+
+# Updates are one UPDATE ... RETURNING statement each, setting only the fields
+# the request body sent. A row the user does not own is not updated and comes
+# back as None.
+def changed_fields(update_data, **kwargs) -> dict:
+    """Fields of an `*Update` body to write; fields left out, or sent as null,
+    keep their value"""
+    return update_data.model_dump(exclude_unset=True, exclude_none=True, **kwargs)
+
+
+def commit_returning(db: Session, instance):
+    """Commit and return `instance` as UPDATE ... RETURNING loaded it
+
+    It is expunged, with its loaded children, so the commit does not expire it
+    and serializing the response does not SELECT it again.
+    """
+    if instance is not None:
+        db.expunge(instance)
+    db.commit()
+    return instance
+
+
+# User CRUD
+def create_user(db: Session, user: schemas.UserCreate):
+    db_user = models.User(
+        name=user.name,
+        default_measurement=user.default_measurement or "lbs",
+        timezone=user.timezone,
+    )
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+
+def get_user(db: Session, user_id: int):
+    return db.get(models.User, user_id)
+
+
+def get_user_by_name(db: Session, name: str):
+    return db.query(models.User).filter(models.User.name == name).first()
+
+
+def user_exists(db: Session, user_id: int) -> bool:
+    return db.query(exists().where(models.User.id == user_id)).scalar()
+
+
+def update_user(db: Session, user_id: int, user: schemas.UserUpdate):
+    fields = changed_fields(user)
+    db_user = db.scalars(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(**fields)
+        .returning(models.User)
+    ).one_or_none()
+    if db_user is not None and "default_measurement" in fields:
+        # Reports are built in the user's unit
+        analytics.note_changed_users(db, [user_id])
+    return commit_returning(db, db_user)
 
 
 # Workout Template CRUD
+# Templates and workouts belong to a user and every query filters on it, through
+# the (user_id, id) and (user_id, date) indexes. Exercise templates, exercises
+# and sets are scoped by joining them to the template or workout they belong to.
 def create_workout_template(
-    db: Session, workout_template: schemas.WorkoutTemplateCreate
+    db: Session, user_id: int, workout_template: schemas.WorkoutTemplateCreate
 ):
-    db_workout_template = models.WorkoutTemplate(name=workout_template.name)
+    db_workout_template = models.WorkoutTemplate(
+        name=workout_template.name, user_id=user_id
+    )
     db.add(db_workout_template)
     db.commit()
+    cache.invalidate_templates(user_id)
     db.refresh(db_workout_template)
     return db_workout_template
 
 
-def get_workout_template(db: Session, workout_template_id: int):
+def get_workout_template(db: Session, user_id: int, workout_template_id: int):
     return (
         db.query(models.WorkoutTemplate)
-        .filter(models.WorkoutTemplate.id == workout_template_id)
+        .options(joinedload(models.WorkoutTemplate.exercise_templates))
+        .filter(
+            models.WorkoutTemplate.id == workout_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
         .first()
     )
 
 
-def get_workout_templates(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.WorkoutTemplate).offset(skip).limit(limit).all()
+def get_workout_templates(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    return (
+        db.query(models.WorkoutTemplate)
+        .options(WORKOUT_TEMPLATE_LOAD)
+        .filter(models.WorkoutTemplate.user_id == user_id)
+        .order_by(models.WorkoutTemplate.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_workout_templates_page(
+    db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100
+):
+    return paginate(
+        db.query(models.WorkoutTemplate)
+        .options(WORKOUT_TEMPLATE_LOAD)
+        .filter(models.WorkoutTemplate.user_id == user_id),
+        [models.WorkoutTemplate.id],
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+def update_workout_template_statement(
+    user_id: int,
+    workout_template_id: int,
+    workout_template: schemas.WorkoutTemplateUpdate,
+):
+    return (
+        update(models.WorkoutTemplate)
+        .where(
+            models.WorkoutTemplate.id == workout_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
+        .values(**changed_fields(workout_template))
+        .returning(models.WorkoutTemplate)
+        .options(WORKOUT_TEMPLATE_LOAD)
+    )
 
 
 def update_workout_template(
     db: Session,
+    user_id: int,
     workout_template_id: int,
     workout_template: schemas.WorkoutTemplateUpdate,
 ):
-    db_workout_template = get_workout_template(db, workout_template_id)
-    if db_workout_template:
-        if workout_template.date is not None:
-            db_workout_template.name = workout_template.name
-        db.commit()
-        db.refresh(db_workout_template)
+    db_workout_template = db.scalars(
+        update_workout_template_statement(
+            user_id, workout_template_id, workout_template
+        )
+    ).one_or_none()
+    db_workout_template = commit_returning(db, db_workout_template)
+    if db_workout_template is not None:
+        cache.invalidate_templates(user_id)
     return db_workout_template
 
 
-def delete_workout_template(db: Session, workout_template_id: int):
-    db_workout_template = get_workout_template(db, workout_template_id)
-    if db_workout_template:
-        db.delete(db_workout_template)
-        db.commit()
-    return db_workout_template
+# Deletes are one DELETE statement each. The database removes the children
+# through the ON DELETE CASCADE foreign keys, so nothing is loaded first; the
+# statement's RETURNING clause tells whether the user owned the row.
+def delete_workout_template_statement(user_id: int, workout_template_id: int):
+    return (
+        delete(models.WorkoutTemplate)
+        .where(
+            models.WorkoutTemplate.id == workout_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
+        .returning(models.WorkoutTemplate.id)
+    )
+
+
+def delete_workout_template(
+    db: Session, user_id: int, workout_template_id: int
+) -> bool:
+    deleted = db.scalar(delete_workout_template_statement(user_id, workout_template_id))
+    db.commit()
+    if deleted is None:
+        return False
+    cache.invalidate_templates(user_id)
+    return True
 
 
 # Exercise Template CRUD
+def workout_template_exists(
+    db: Session, user_id: int, workout_template_id: int
+) -> bool:
+    return db.query(
+        exists().where(
+            models.WorkoutTemplate.id == workout_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
+    ).scalar()
+
+
 def create_exercise_template(
     db: Session,
+    user_id: int,
     workout_template_id: int,
     exercise_template: schemas.ExerciseTemplateCreate,
 ):
@@ -58,79 +227,529 @@ def create_exercise_template(
     )
     db.add(db_exercise_template)
     db.commit()
+    cache.invalidate_templates(user_id)
     db.refresh(db_exercise_template)
     return db_exercise_template
 
 
-def get_exercise_template(db: Session, exercise_template_id: int):
+def get_exercise_template(db: Session, user_id: int, exercise_template_id: int):
     return (
         db.query(models.ExerciseTemplate)
-        .filter(models.ExerciseTemplate.id == exercise_template_id)
+        .join(models.ExerciseTemplate.workout_template)
+        .filter(
+            models.ExerciseTemplate.id == exercise_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
         .first()
     )
 
 
-def get_exercise_templates_by_workout_template(db: Session, workout_template_id: int):
+def get_exercise_templates_by_workout_template(
+    db: Session, user_id: int, workout_template_id: int
+):
     return (
         db.query(models.ExerciseTemplate)
-        .filter(models.ExerciseTemplate.workout_template_id == workout_template_id)
+        .join(models.ExerciseTemplate.workout_template)
+        .filter(
+            models.ExerciseTemplate.workout_template_id == workout_template_id,
+            models.WorkoutTemplate.user_id == user_id,
+        )
         .all()
     )
 
 
+def owned_exercise_template(user_id: int):
+    return exists().where(
+        models.WorkoutTemplate.id == models.ExerciseTemplate.workout_template_id,
+        models.WorkoutTemplate.user_id == user_id,
+    )
+
+
+def update_exercise_template_statement(
+    user_id: int,
+    exercise_template_id: int,
+    exercise_template: schemas.ExerciseTemplateUpdate,
+):
+    return (
+        update(models.ExerciseTemplate)
+        .where(
+            models.ExerciseTemplate.id == exercise_template_id,
+            owned_exercise_template(user_id),
+        )
+        .values(**changed_fields(exercise_template))
+        .returning(models.ExerciseTemplate)
+    )
+
+
 def update_exercise_template(
     db: Session,
+    user_id: int,
     exercise_template_id: int,
     exercise_template: schemas.ExerciseTemplateUpdate,
 ):
-    db_exercise_template = get_exercise_template(db, exercise_template_id)
-    if db_exercise_template:
-        if exercise_template.name is not None:
-            db_exercise_template.name = exercise_template.name
-        db.commit()
-        db.refresh(db_exercise_template)
+    db_exercise_template = db.scalars(
+        update_exercise_template_statement(
+            user_id, exercise_template_id, exercise_template
+        )
+    ).one_or_none()
+    db_exercise_template = commit_returning(db, db_exercise_template)
+    if db_exercise_template is not None:
+        cache.invalidate_templates(user_id)
     return db_exercise_template
 
 
-def delete_exercise_template(db: Session, exercise_template_id: int):
-    db_exercise_template = get_exercise_template(db, exercise_template_id)
-    if db_exercise_template:
-        db.delete(db_exercise_template)
-        db.commit()
-    return db_exercise_template
+def delete_exercise_template_statement(user_id: int, exercise_template_id: int):
+    return (
+        delete(models.ExerciseTemplate)
+        .where(
+            models.ExerciseTemplate.id == exercise_template_id,
+            owned_exercise_template(user_id),
+        )
+        .returning(models.ExerciseTemplate.id)
+    )
+
+
+def delete_exercise_template(
+    db: Session, user_id: int, exercise_template_id: int
+) -> bool:
+    deleted = db.scalar(
+        delete_exercise_template_statement(user_id, exercise_template_id)
+    )
+    db.commit()
+    if deleted is None:
+        return False
+    cache.invalidate_templates(user_id)
+    return True
 
 
 # Workout CRUD
-def create_workout(db: Session, workout: schemas.WorkoutCreate):
-    db_workout = models.Workout(name=workout.name, date=workout.date)
+def create_workout(db: Session, user_id: int, workout: schemas.WorkoutCreate):
+    db_workout = models.Workout(
+        name=workout.name,
+        date=workout.date,
+        workout_template_id=workout.workout_template_id,
+        user_id=user_id,
+    )
     db.add(db_workout)
     db.commit()
     db.refresh(db_workout)
     return db_workout
 
 
-def get_workout(db: Session, workout_id: int):
-    return db.query(models.Workout).filter(models.Workout.id == workout_id).first()
+def create_workout_log(
+    db: Session, user_id: int, workout_log: schemas.WorkoutLogCreate
+):
+    """Insert a workout with its exercises and sets in a single transaction
+
+    Each level is one multi-row INSERT ... RETURNING, so the statement count is
+    fixed at three however many exercises and sets were logged. The response
+    tree is assembled from the returned ids instead of being read back. The
+    workout is inserted by selecting the user's row, which doubles as the
+    check that the user exists: None is returned when it does not.
+
+    Integer primary keys are allocated in VALUES order within one statement, so
+    sorting the returned ids lines them up with the input rows. This is the same
+    assumption SQLAlchemy's own insertmanyvalues sentinel makes, without its
+    row-at-a-time fallback on SQLite.
+    """
+    w, u = models.Workout, models.User
+    workout = db.execute(
+        insert(w)
+        .from_select(
+            ["name", "date", "workout_template_id", "user_id"],
+            select(
+                literal(workout_log.name, String),
+                literal(workout_log.date, Date),
+                literal(workout_log.workout_template_id, Integer),
+                u.id,
+            ).where(u.id == user_id),
+        )
+        .returning(w.id, w.date)
+    ).one_or_none()
+    if workout is None:
+        db.rollback()
+        return None
+    workout_id, workout_date = workout
+
+    exercise_ids = []
+    if workout_log.exercises:
+        exercise_rows = [
+            {"name": exercise.name, "workout_id": workout_id}
+            for exercise in workout_log.exercises
+        ]
+        exercise_ids = sorted(
+            db.scalars(
+                insert(models.Exercise).returning(models.Exercise.id), exercise_rows
+            ).all()
+        )
+
+    set_rows = [
+        {"reps": s.reps, "weight": s.weight, "exercise_id": exercise_id}
+        for exercise_id, exercise in zip(exercise_ids, workout_log.exercises)
+        for s in exercise.sets
+    ]
+    set_ids = []
+    if set_rows:
+        set_ids = sorted(
+            db.scalars(
+                insert(models.Set)
+                .values(weight_kg=units.canonical_weight(bindparam("weight"), user_id))
+                .returning(models.Set.id),
+                set_rows,
+            ).all()
+        )
+        analytics.refresh_summaries(
+            db,
+            {(user_id, e.name, workout_date) for e in workout_log.exercises if e.sets},
+        )
+    db.commit()
+
+    sets_by_exercise = {exercise_id: [] for exercise_id in exercise_ids}
+    for set_id, row in zip(set_ids, set_rows):
+        sets_by_exercise[row["exercise_id"]].append({"id": set_id, **row})
+    return {
+        "id": workout_id,
+        "name": workout_log.name,
+        "date": workout_date,
+        "workout_template_id": workout_log.workout_template_id,
+        "exercises": [
+            {
+                "id": exercise_id,
+                "name": exercise.name,
+                "workout_id": workout_id,
+                "sets": sets_by_exercise[exercise_id],
+            }
+            for exercise_id, exercise in zip(exercise_ids, workout_log.exercises)
+        ],
+    }
+
+
+def start_workout(
+    db: Session,
+    user_id: int,
+    workout_template_id: int,
+    workout_start: schemas.WorkoutStart,
+):
+    """Create a workout with one exercise per exercise template
+
+    The workout and its exercises are each copied from the template tables
+    with one INSERT ... SELECT ... RETURNING, in a single transaction, and
+    the template's existence is checked by the first insert returning a row.
+    With `prefill`, the sets of the template's most recent earlier session
+    are read in one more query and returned as targets, matching exercises by
+    name and, for repeated names, by position. Targets are not stored as sets,
+    so they never count as lifted in analytics.
+
+    Returns None when the user has no such template.
+    """
+    w, e = models.Workout, models.Exercise
+    wt, et = models.WorkoutTemplate, models.ExerciseTemplate
+    targets = {}
+    if workout_start.prefill:
+        targets = get_last_session_sets(db, user_id, workout_template_id)
+
+    workout = db.execute(
+        insert(w)
+        .from_select(
+            ["name", "date", "workout_template_id", "user_id"],
+            select(
+                func.coalesce(literal(workout_start.name, String), wt.name),
+                literal(workout_start.date, Date),
+                wt.id,
+                wt.user_id,
+            ).where(wt.id == workout_template_id, wt.user_id == user_id),
+        )
+        .returning(w.id, w.name, w.date)
+    ).one_or_none()
+    if workout is None:
+        db.rollback()
+        return None
+    exercises = sorted(
+        db.execute(
+            insert(e)
+            .from_select(
+                ["name", "workout_id"],
+                select(et.name, literal(workout.id, Integer))
+                .where(et.workout_template_id == workout_template_id)
+                .order_by(et.id),
+            )
+            .returning(e.id, e.name)
+        ).all()
+    )
+    db.commit()
+
+    seen = {}
+    started = []
+    for exercise_id, name in exercises:
+        occurrence = seen[name] = seen.get(name, -1) + 1
+        started.append(
+            {
+                "id": exercise_id,
+                "name": name,
+                "workout_id": workout.id,
+                "sets": [],
+                "targets": targets.get((name, occurrence), []),
+            }
+        )
+    return {
+        "id": workout.id,
+        "name": workout.name,
+        "date": workout.date,
+        "workout_template_id": workout_template_id,
+        "exercises": started,
+    }
+
+
+def get_last_session_sets(db: Session, user_id: int, workout_template_id: int):
+    """Sets of the template's most recent workout, keyed by exercise name and
+    occurrence of that name within the workout
+
+    Exercises are outer joined so ones without sets still count as an
+    occurrence of their name.
+    """
+    w, e, s = models.Workout, models.Exercise, models.Set
+    last_session = (
+        select(w.id)
+        .where(w.workout_template_id == workout_template_id, w.user_id == user_id)
+        .order_by(w.date.desc(), w.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(
+            e.id,
+            e.name,
+            s.reps,
+            units.display_weight(s.weight_kg, user_id).label("weight"),
+        )
+        .outerjoin(s, s.exercise_id == e.id)
+        .where(e.workout_id == last_session)
+        .order_by(e.id, s.id)
+    )
+    targets, seen, current = {}, {}, None
+    for row in rows:
+        if row.id != current:
+            current = row.id
+            seen[row.name] = seen.get(row.name, -1) + 1
+        if row.reps is not None:
+            key = (row.name, seen[row.name])
+            targets.setdefault(key, []).append({"reps": row.reps, "weight": row.weight})
+    return targets
+
+
+def get_workout(db: Session, user_id: int, workout_id: int):
+    return (
+        db.query(models.Workout)
+        .filter(models.Workout.id == workout_id, models.Workout.user_id == user_id)
+        .first()
+    )
+
+
+def get_workouts_page(
+    db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100
+):
+    """Most recent workouts first, keyed on (date, id)"""
+    return paginate(
+        db.query(models.Workout).filter(models.Workout.user_id == user_id),
+        [models.Workout.date, models.Workout.id],
+        cursor=cursor,
+        limit=limit,
+        descending=True,
+    )
+
+
+def get_workout_trees(db: Session, user_id: int, workout_ids):
+    """Workouts with their exercises and sets as nested dicts, keyed by id
+
+    The whole tree is read with one outer joined query, so workouts without
+    exercises and exercises without sets are kept and missing ids are absent.
+    """
+    w, e, s = models.Workout, models.Exercise, models.Set
+    rows = db.execute(
+        select(
+            w.id,
+            w.name,
+            w.date,
+            w.workout_template_id,
+            e.id.label("exercise_id"),
+            e.name.label("exercise_name"),
+            s.id.label("set_id"),
+            s.reps,
+            units.display_weight(s.weight_kg, user_id).label("weight"),
+        )
+        .outerjoin(e, e.workout_id == w.id)
+        .outerjoin(s, s.exercise_id == e.id)
+        .where(w.id.in_(workout_ids), w.user_id == user_id)
+        .order_by(w.id, e.id, s.id)
+    )
+    trees = {}
+    for row in rows:
+        tree = trees.get(row.id)
+        if tree is None:
+            tree = trees[row.id] = {
+                "id": row.id,
+                "name": row.name,
+                "date": row.date,
+                "workout_template_id": row.workout_template_id,
+                "exercises": [],
+            }
+        if row.exercise_id is None:
+            continue
+        exercises = tree["exercises"]
+        if not exercises or exercises[-1]["id"] != row.exercise_id:
+            exercises.append(
+                {
+                    "id": row.exercise_id,
+                    "name": row.exercise_name,
+                    "workout_id": row.id,
+                    "sets": [],
+                }
+            )
+        if row.set_id is not None:
+            exercises[-1]["sets"].append(
+                {
+                    "id": row.set_id,
+                    "reps": row.reps,
+                    "weight": row.weight,
+                    "exercise_id": row.exercise_id,
+                }
+            )
+    return trees
+
+
+def get_workout_tree(db: Session, user_id: int, workout_id: int):
+    return get_workout_trees(db, user_id, [workout_id]).get(workout_id)
+
 
+def workout_exists(db: Session, user_id: int, workout_id: int) -> bool:
+    return db.query(
+        exists().where(
+            models.Workout.id == workout_id, models.Workout.user_id == user_id
+        )
+    ).scalar()
 
-def get_workouts_by_workout_template(db: Session, workout_template_id: int):
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """The least string greater than every string starting with `prefix`,
+    or None when there is none, e.g. for a prefix of U+10FFFF characters
+
+    Characters are compared by code point, as SQLite compares UTF-8 text, and
+    the surrogates, which cannot be encoded, are skipped.
+    """
+    stem = prefix.rstrip(chr(sys.maxunicode))
+    if not stem:
+        return None
+    following = ord(stem[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        following = 0xE000
+    return stem[:-1] + chr(following)
+
+
+def get_workouts(
+    db: Session,
+    user_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    name_prefix: Optional[str] = None,
+    workout_template_id: Optional[int] = None,
+    include_stats: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+):
+    """Filtered workouts, most recent first, keyed on (date, id)
+
+    Each filter is a range or equality on an indexed column: the (user_id,
+    date) index, the (user_id, name) index for the prefix and the
+    (workout_template_id, date) index for a template's sessions. With
+    `include_stats` every row also carries its exercise count, set count and
+    volume from correlated subqueries, so a page is still read with one
+    statement.
+    """
+    w, e, s = models.Workout, models.Exercise, models.Set
+    columns = [w.id, w.name, w.date, w.workout_template_id]
+    if include_stats:
+        columns += [
+            select(func.count(e.id))
+            .where(e.workout_id == w.id)
+            .scalar_subquery()
+            .label("exercise_count"),
+            select(func.count(s.id))
+            .join(e, s.exercise_id == e.id)
+            .where(e.workout_id == w.id)
+            .scalar_subquery()
+            .label("set_count"),
+            units.display_weight(
+                select(func.coalesce(func.sum(s.reps * s.weight_kg), 0.0))
+                .join(e, s.exercise_id == e.id)
+                .where(e.workout_id == w.id)
+                .scalar_subquery(),
+                user_id,
+            ).label("total_volume"),
+        ]
+    query = db.query(*columns).filter(w.user_id == user_id)
+    if start is not None:
+        query = query.filter(w.date >= start)
+    if end is not None:
+        query = query.filter(w.date <= end)
+    if name_prefix:
+        # A range instead of LIKE, which SQLite only runs on an index when
+        # the column is case insensitive
+        query = query.filter(w.name >= name_prefix)
+        upper = prefix_upper_bound(name_prefix)
+        if upper is not None:
+            query = query.filter(w.name < upper)
+    if workout_template_id is not None:
+        query = query.filter(w.workout_template_id == workout_template_id)
+    return paginate(query, [w.date, w.id], cursor=cursor, limit=limit, descending=True)
+
+
+def get_workouts_by_workout_template(
+    db: Session, user_id: int, workout_template_id: int
+):
     return (
         db.query(models.Workout)
-        .filter(models.Workout.workout_template_id == workout_template_id)
+        .filter(
+            models.Workout.workout_template_id == workout_template_id,
+            models.Workout.user_id == user_id,
+        )
+        .order_by(models.Workout.date.desc(), models.Workout.id.desc())
         .all()
     )
 
 
-def update_workout(db: Session, workout_id: int, workout: schemas.WorkoutUpdate):
-    db_workout = get_workout(db, workout_id)
-    if db_workout:
-        if workout.name is not None:
-            db_workout.name = workout.name
-        if workout.date is not None:
-            db_workout.date = workout.date
-        db.commit()
-        db.refresh(db_workout)
-    return db_workout
+def update_workout(
+    db: Session, user_id: int, workout_id: int, workout: schemas.WorkoutUpdate
+):
+    values = changed_fields(workout)
+    moved = "date" in values
+    stale_keys = analytics.keys_for_workout(db, workout_id) if moved else []
+    db_workout = db.scalars(
+        update(models.Workout)
+        .where(models.Workout.id == workout_id, models.Workout.user_id == user_id)
+        .values(**values)
+        .returning(models.Workout)
+    ).one_or_none()
+    if db_workout is not None and moved:
+        analytics.refresh_summaries(
+            db, stale_keys + analytics.keys_for_workout(db, workout_id)
+        )
+    return commit_returning(db, db_workout)
+
+
+def delete_workouts(db: Session, user_id: int, start: date, end: date) -> int:
+    """Delete a user's workouts dated `start` to `end` inclusive, with their
+    exercises and sets, and return how many were deleted"""
+    deleted = db.execute(
+        delete(models.Workout)
+        .where(
+            models.Workout.user_id == user_id, models.Workout.date.between(start, end)
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if deleted:
+        analytics.delete_summaries(db, user_id, start, end)
+    db.commit()
+    return deleted
 
 
 # Exercise CRUD
@@ -142,66 +761,367 @@ def create_exercise(db: Session, workout_id: int, exercise: schemas.ExerciseCrea
     return db_exercise
 
 
-def get_exercise(db: Session, exercise_id: int):
-    return db.query(models.Exercise).filter(models.Exercise.id == exercise_id).first()
+def get_exercise(db: Session, user_id: int, exercise_id: int):
+    return (
+        db.query(models.Exercise)
+        .join(models.Exercise.workout)
+        .options(joinedload(models.Exercise.sets).options(units.set_weight(user_id)))
+        .filter(models.Exercise.id == exercise_id, models.Workout.user_id == user_id)
+        .populate_existing()
+        .first()
+    )
 
 
-def get_exercises_by_workout(db: Session, workout_id: int):
+def exercise_exists(db: Session, user_id: int, exercise_id: int) -> bool:
+    return db.query(
+        exists().where(
+            models.Exercise.id == exercise_id,
+            models.Exercise.workout_id == models.Workout.id,
+            models.Workout.user_id == user_id,
+        )
+    ).scalar()
+
+
+def outer_joined_children(rows):
+    """Children read by outer joining them to their parent, or None when the
+    parent does not exist. Folding the existence check into the read saves a
+    round trip; a parent without children comes back as one row of None."""
+    if not rows:
+        return None
+    return [row for row in rows if row is not None]
+
+
+def get_exercises_by_workout(db: Session, user_id: int, workout_id: int):
+    return outer_joined_children(
+        db.scalars(
+            select(models.Exercise)
+            .select_from(models.Workout)
+            .outerjoin(models.Exercise)
+            .options(exercise_load(user_id))
+            .where(models.Workout.id == workout_id, models.Workout.user_id == user_id)
+            .order_by(models.Exercise.id)
+        ).all()
+    )
+
+
+def get_exercise_rows(db: Session, user_id: int, *criteria):
+    """A user's exercises matching `criteria` with their sets, as plain dicts
+
+    Columns are selected instead of entities, so no ORM objects are built for
+    rows that are only serialized on the fast JSON path.
+    """
+    exercises = db.execute(
+        select(models.Exercise.id, models.Exercise.name, models.Exercise.workout_id)
+        .join(models.Workout, models.Exercise.workout_id == models.Workout.id)
+        .where(models.Workout.user_id == user_id, *criteria)
+        .order_by(models.Exercise.id)
+    ).all()
+    if not exercises:
+        return []
+    sets = get_set_rows(
+        db,
+        user_id,
+        models.Set.exercise_id.in_([exercise.id for exercise in exercises]),
+    )
+    sets_by_exercise = {exercise.id: [] for exercise in exercises}
+    for row in sets:
+        sets_by_exercise[row["exercise_id"]].append(row)
+    return [
+        {**exercise._asdict(), "sets": sets_by_exercise[exercise.id]}
+        for exercise in exercises
+    ]
+
+
+def get_exercise_rows_by_workout(db: Session, user_id: int, workout_id: int):
+    tree = get_workout_tree(db, user_id, workout_id)
+    return None if tree is None else tree["exercises"]
+
+
+def get_exercise_row(db: Session, user_id: int, exercise_id: int):
+    rows = get_exercise_rows(db, user_id, models.Exercise.id == exercise_id)
+    return rows[0] if rows else None
+
+
+def get_exercises_page_by_workout(
+    db: Session,
+    user_id: int,
+    workout_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+):
+    """One page of a workout's exercises, or None when the user has no such
+    workout. The seek goes in the join so a page past the last exercise still
+    comes back as one row of None, see `outer_joined_children`."""
+    columns = [models.Exercise.id]
+    rows, next_cursor = paginate(
+        db.query(models.Exercise)
+        .select_from(models.Workout)
+        .outerjoin(
+            models.Exercise,
+            and_(
+                models.Exercise.workout_id == models.Workout.id,
+                seek(columns, cursor),
+            ),
+        )
+        .options(exercise_load(user_id))
+        .filter(models.Workout.id == workout_id, models.Workout.user_id == user_id),
+        columns,
+        limit=limit,
+    )
+    rows = outer_joined_children(rows)
+    return None if rows is None else (rows, next_cursor)
+
+
+def update_exercise_statement(user_id: int, exercise_id: int, values: dict):
     return (
-        db.query(models.Exercise).filter(models.Exercise.workout_id == workout_id).all()
+        update(models.Exercise)
+        .where(models.Exercise.id == exercise_id)
+        .values(**values)
+        .returning(models.Exercise)
+        .options(exercise_load(user_id))
     )
 
 
-def update_exercise(db: Session, exercise_id: int, exercise: schemas.ExerciseUpdate):
-    db_exercise = get_exercise(db, exercise_id)
-    if db_exercise:
-        if exercise.name is not None:
-            db_exercise.name = exercise.name
-        db.commit()
-        db.refresh(db_exercise)
-    return db_exercise
+def renamed_exercise_keys(stale_key: analytics.SummaryKey, values: dict):
+    """Summary keys a rename moves sets between"""
+    if "name" not in values:
+        return []
+    user_id, _, day = stale_key
+    return [stale_key, (user_id, values["name"], day)]
 
 
-def delete_exercise(db: Session, exercise_id: int):
-    db_exercise = get_exercise(db, exercise_id)
-    if db_exercise:
-        db.delete(db_exercise)
-        db.commit()
-    return db_exercise
+def update_exercise(
+    db: Session, user_id: int, exercise_id: int, exercise: schemas.ExerciseUpdate
+):
+    # The summary key also tells who owns the exercise
+    stale_key = analytics.key_for_exercise(db, exercise_id)
+    if stale_key is None or stale_key[0] != user_id:
+        return None
+    values = changed_fields(exercise)
+    db_exercise = db.scalars(
+        update_exercise_statement(user_id, exercise_id, values)
+    ).one()
+    analytics.refresh_summaries(db, renamed_exercise_keys(stale_key, values))
+    return commit_returning(db, db_exercise)
+
+
+def delete_exercise(db: Session, user_id: int, exercise_id: int) -> bool:
+    # The summary key also tells who owns the exercise
+    stale_key = analytics.key_for_exercise(db, exercise_id)
+    if stale_key is None or stale_key[0] != user_id:
+        return False
+    db.execute(delete(models.Exercise).where(models.Exercise.id == exercise_id))
+    analytics.refresh_summaries(db, [stale_key])
+    db.commit()
+    return True
 
 
 # Set CRUD
-def create_set(db: Session, exercise_id: int, set_data: schemas.SetCreate):
+def create_set(
+    db: Session, user_id: int, exercise_id: int, set_data: schemas.SetCreate
+):
     db_set = models.Set(
-        reps=set_data.reps, weight=set_data.weight, exercise_id=exercise_id
+        reps=set_data.reps,
+        weight_kg=units.canonical_weight(set_data.weight, user_id),
+        exercise_id=exercise_id,
     )
     db.add(db_set)
+    analytics.refresh_for_exercise(db, exercise_id)
     db.commit()
-    db.refresh(db_set)
-    return db_set
+    return get_set(db, user_id, db_set.id)
+
 
+def get_set(db: Session, user_id: int, set_id: int):
+    return (
+        db.query(models.Set)
+        .join(models.Set.exercise)
+        .join(models.Exercise.workout)
+        .options(units.set_weight(user_id))
+        .filter(models.Set.id == set_id, models.Workout.user_id == user_id)
+        .populate_existing()
+        .first()
+    )
 
-def get_set(db: Session, set_id: int):
-    return db.query(models.Set).filter(models.Set.id == set_id).first()
+
+def get_sets_by_exercise(db: Session, user_id: int, exercise_id: int):
+    return outer_joined_children(
+        db.scalars(
+            select(models.Set)
+            .select_from(models.Exercise)
+            .join(models.Exercise.workout)
+            .outerjoin(models.Exercise.sets)
+            .options(units.set_weight(user_id))
+            .where(models.Exercise.id == exercise_id, models.Workout.user_id == user_id)
+            .order_by(models.Set.id)
+        ).all()
+    )
+
+
+def set_columns(user_id: int):
+    """Columns of a SetResponse, with the weight in the user's unit"""
+    return (
+        models.Set.id,
+        models.Set.reps,
+        units.display_weight(models.Set.weight_kg, user_id).label("weight"),
+        models.Set.exercise_id,
+    )
 
 
-def get_sets_by_exercise(db: Session, exercise_id: int):
-    return db.query(models.Set).filter(models.Set.exercise_id == exercise_id).all()
+def get_set_rows(db: Session, user_id: int, *criteria):
+    """Sets matching `criteria` as plain dicts, see `get_exercise_rows`"""
+    rows = db.execute(
+        select(*set_columns(user_id))
+        .where(*criteria)
+        .order_by(models.Set.exercise_id, models.Set.id)
+    )
+    return [row._asdict() for row in rows]
+
+
+def get_set_rows_by_exercise(db: Session, user_id: int, exercise_id: int):
+    rows = db.execute(
+        select(
+            models.Set.id,
+            models.Set.reps,
+            units.display_weight(models.Set.weight_kg, user_id).label("weight"),
+            models.Set.exercise_id,
+        )
+        .select_from(models.Exercise)
+        .join(models.Exercise.workout)
+        .outerjoin(models.Exercise.sets)
+        .where(models.Exercise.id == exercise_id, models.Workout.user_id == user_id)
+        .order_by(models.Set.id)
+    ).all()
+    return outer_joined_children(
+        [row._asdict() if row.id is not None else None for row in rows]
+    )
+
+
+def get_sets_page_by_exercise(
+    db: Session,
+    user_id: int,
+    exercise_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+):
+    """One page of an exercise's sets, or None when the user has no such
+    exercise, see `get_exercises_page_by_workout`"""
+    columns = [models.Set.id]
+    rows, next_cursor = paginate(
+        db.query(models.Set)
+        .select_from(models.Exercise)
+        .join(models.Exercise.workout)
+        .outerjoin(
+            models.Set,
+            and_(models.Set.exercise_id == models.Exercise.id, seek(columns, cursor)),
+        )
+        .options(units.set_weight(user_id))
+        .filter(models.Exercise.id == exercise_id, models.Workout.user_id == user_id),
+        columns,
+        limit=limit,
+    )
+    rows = outer_joined_children(rows)
+    return None if rows is None else (rows, next_cursor)
+
+
+def owned_set(user_id: int):
+    return exists().where(
+        models.Exercise.id == models.Set.exercise_id,
+        models.Workout.id == models.Exercise.workout_id,
+        models.Workout.user_id == user_id,
+    )
 
 
-def update_set(db: Session, set_id: int, set_data: schemas.SetCreate):
-    db_set = get_set(db, set_id)
-    if db_set:
-        db_set.reps = set_data.reps
-        db_set.weight = set_data.weight
-        db.commit()
-        db.refresh(db_set)
-    return db_set
+def set_values(user_id: int, changes: dict) -> dict:
+    """Column values for the fields of a set update, in kilograms"""
+    if "weight" in changes:
+        changes["weight_kg"] = units.canonical_weight(changes.pop("weight"), user_id)
+    return changes
 
 
-def delete_set(db: Session, set_id: int):
-    db_set = get_set(db, set_id)
-    if db_set:
-        db.delete(db_set)
-        db.commit()
-    return db_set
+def update_set_statement(user_id: int, set_id: int, set_data: schemas.SetUpdate):
+    # Set rows rather than instances: the weight expression is not populated
+    # on instances an UPDATE returns
+    return (
+        update(models.Set)
+        .where(models.Set.id == set_id, owned_set(user_id))
+        .values(**set_values(user_id, changed_fields(set_data)))
+        .returning(*set_columns(user_id))
+    )
+
+
+def update_set(db: Session, user_id: int, set_id: int, set_data: schemas.SetUpdate):
+    row = db.execute(update_set_statement(user_id, set_id, set_data)).one_or_none()
+    if row is None:
+        return None
+    analytics.refresh_for_exercise(db, row.exercise_id)
+    db.commit()
+    return row._asdict()
+
+
+def update_sets_statement(
+    user_id: int, exercise_id: int, set_updates: List[schemas.SetBulkUpdate]
+):
+    """One UPDATE giving each set its own values through CASE on the set id"""
+    values_by_column = {}
+    for set_update in set_updates:
+        changes = changed_fields(set_update, exclude={"id"})
+        for column, value in set_values(user_id, changes).items():
+            values_by_column.setdefault(column, {})[set_update.id] = value
+    return (
+        update(models.Set)
+        .where(
+            models.Set.exercise_id == exercise_id,
+            models.Set.id.in_([set_update.id for set_update in set_updates]),
+            owned_set(user_id),
+        )
+        .values(
+            {
+                column: case(
+                    values, value=models.Set.id, else_=getattr(models.Set, column)
+                )
+                for column, values in values_by_column.items()
+            }
+        )
+        .returning(*set_columns(user_id))
+    )
+
+
+def updated_sets(rows, set_updates: List[schemas.SetBulkUpdate]):
+    """The updated set rows by id, or None unless every set was updated"""
+    if len(rows) != len(set_updates):
+        return None
+    return sorted((row._asdict() for row in rows), key=itemgetter("id"))
+
+
+def update_sets(
+    db: Session,
+    user_id: int,
+    exercise_id: int,
+    set_updates: List[schemas.SetBulkUpdate],
+):
+    """Update several sets of an exercise at once, all or none of them"""
+    rows = db.execute(update_sets_statement(user_id, exercise_id, set_updates)).all()
+    sets = updated_sets(rows, set_updates)
+    if sets is None:
+        db.rollback()
+        return None
+    analytics.refresh_for_exercise(db, exercise_id)
+    db.commit()
+    return sets
+
+
+def delete_set_statement(user_id: int, set_id: int):
+    return (
+        delete(models.Set)
+        .where(models.Set.id == set_id, owned_set(user_id))
+        .returning(models.Set.exercise_id)
+    )
+
+
+def delete_set(db: Session, user_id: int, set_id: int) -> bool:
+    exercise_id = db.scalar(delete_set_statement(user_id, set_id))
+    if exercise_id is None:
+        return False
+    analytics.refresh_for_exercise(db, exercise_id)
+    db.commit()
+    return True
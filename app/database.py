@@ -1,12 +1,135 @@
-from sqlalchemy import create_engine
+import logging
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from app.config import Settings, settings
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./fitness.db"
+# Shares uvicorn's handler so the line shows up next to its startup output
+logger = logging.getLogger("uvicorn.error")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+# asyncio drivers used in place of the sync ones when async mode is enabled
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+SQLITE_PRAGMAS = (
+    ("journal_mode", "sqlite_journal_mode"),
+    ("synchronous", "sqlite_synchronous"),
+    ("mmap_size", "sqlite_mmap_size"),
+    ("cache_size", "sqlite_cache_size"),
+    ("temp_store", "sqlite_temp_store"),
+    ("busy_timeout", "sqlite_busy_timeout"),
+    ("foreign_keys", "sqlite_foreign_keys"),
 )
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def connect_args_for(url: str) -> dict:
+    if is_sqlite(url):
+        return {"check_same_thread": False}
+    return {}
+
+
+def engine_options(url: str, config: Settings) -> dict:
+    """Pool keyword arguments for `create_engine`
+
+    Sizing options are only accepted by queue pools; the pool SQLAlchemy picks
+    for in-memory SQLite or for aiosqlite files rejects them, so they are only
+    passed when the dialect will use a QueuePool for `url`.
+    """
+    options = {
+        "connect_args": connect_args_for(url),
+        "pool_pre_ping": config.pool_pre_ping,
+        "pool_recycle": config.pool_recycle,
+    }
+    url = make_url(url)
+    if issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        options["pool_size"] = config.pool_size
+        options["max_overflow"] = config.max_overflow
+    return options
+
+
+def sqlite_pragmas(config: Settings) -> list:
+    return [(pragma, getattr(config, field)) for pragma, field in SQLITE_PRAGMAS]
+
+
+def apply_sqlite_pragmas(engine: Engine, config: Settings):
+    """Run the configured PRAGMAs on every new DBAPI connection of `engine`"""
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas:
+                cursor.execute(f"PRAGMA {pragma}={value}")
+        finally:
+            cursor.close()
+
+
+@contextmanager
+def foreign_keys_disabled(connection: Connection):
+    """Switch off SQLite foreign key enforcement on `connection` for the block
+
+    Batch migrations copy a table and drop the original, which would run the
+    ON DELETE actions of the rows referencing it. SQLite ignores the pragma
+    inside a transaction, so the block begins its own.
+    """
+    if connection.dialect.name != "sqlite":
+        yield
+        return
+    enabled = connection.exec_driver_sql("PRAGMA foreign_keys").scalar()
+    connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+    connection.commit()
+    try:
+        yield
+    finally:
+        connection.exec_driver_sql(f"PRAGMA foreign_keys={enabled}")
+        connection.commit()
+
+
+def create_db_engine(url: str, config: Settings) -> Engine:
+    db_engine = create_engine(url, **engine_options(url, config))
+    if is_sqlite(url):
+        apply_sqlite_pragmas(db_engine, config)
+    return db_engine
+
+
+def describe_engine(db_engine: Engine, config: Settings) -> str:
+    """One line summary of the pool and, for SQLite, the pragmas in effect"""
+    pool = db_engine.pool
+    parts = [
+        f"url={db_engine.url.render_as_string(hide_password=True)}",
+        f"pool={type(pool).__name__}",
+    ]
+    if isinstance(pool, QueuePool):
+        parts.append(f"pool_size={pool.size()}")
+        parts.append(f"max_overflow={config.max_overflow}")
+    parts.append(f"pre_ping={config.pool_pre_ping}")
+    parts.append(f"recycle={config.pool_recycle}")
+    if db_engine.dialect.name == "sqlite":
+        with db_engine.connect() as connection:
+            for pragma, _ in SQLITE_PRAGMAS:
+                value = connection.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                parts.append(f"{pragma}={value}")
+    return " ".join(parts)
+
+
+def log_database_settings(db_engine: Engine, config: Settings = settings):
+    logger.info("Database settings: %s", describe_engine(db_engine, config))
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, settings)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -19,3 +142,43 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ============================================================================
+# Async Engine (Opt-in With FITNESS_ASYNC_DB=1)
+# ============================================================================
+def async_database_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its asyncio counterpart"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def create_async_sessionmaker(url: str, config: Settings = settings):
+    """Build an async engine and session factory for a sync database URL
+
+    Sessions keep objects loaded after commit, since an expired attribute
+    cannot be lazily refreshed outside of an await.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    url_async = async_database_url(url)
+    async_engine = create_async_engine(url_async, **engine_options(url_async, config))
+    if is_sqlite(url):
+        apply_sqlite_pragmas(async_engine.sync_engine, config)
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+AsyncSessionLocal = None
+if settings.async_db:
+    AsyncSessionLocal = create_async_sessionmaker(SQLALCHEMY_DATABASE_URL)
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine, Row
+from app import models, units
+
+# ============================================================================
+# Training History Export
+# ============================================================================
+# Every set of one user is exported as one flat row joined to its exercise and
+# workout, in date order, with weights in the user's unit. Rows come from a
+# server-side cursor fetched `yield_per` at a time and are encoded into fixed
+# size chunks as they arrive, so memory use does not depend on how much history
+# is exported.
+
+EXPORT_COLUMNS = [
+    "workout_id",
+    "workout_name",
+    "workout_date",
+    "exercise_id",
+    "exercise_name",
+    "set_id",
+    "reps",
+    "weight",
+]
+EXPORT_BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_query(
+    user_id: int, start: Optional[date] = None, end: Optional[date] = None
+):
+    """A user's workouts outer joined to exercises and sets, so empty ones are
+    kept"""
+    w, e, s = models.Workout, models.Exercise, models.Set
+    query = (
+        select(
+            w.id.label("workout_id"),
+            w.name.label("workout_name"),
+            w.date.label("workout_date"),
+            e.id.label("exercise_id"),
+            e.name.label("exercise_name"),
+            s.id.label("set_id"),
+            s.reps,
+            units.display_weight(s.weight_kg, user_id).label("weight"),
+        )
+        .outerjoin(e, e.workout_id == w.id)
+        .outerjoin(s, s.exercise_id == e.id)
+        .where(w.user_id == user_id)
+        .order_by(w.date, w.id, e.id, s.id)
+    )
+    if start is not None:
+        query = query.where(w.date >= start)
+    if end is not None:
+        query = query.where(w.date <= end)
+    return query
+
+
+def export_rows(
+    engine: Engine,
+    user_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[Row]:
+    """Stream export rows on a connection of their own
+
+    The connection is opened when iteration starts and closed when it ends, so
+    the stream does not depend on the request's session outliving the handler.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(
+            export_query(user_id, start, end)
+        )
+        yield from result
+
+
+def ndjson_lines(rows: Iterable[Row]) -> Iterator[str]:
+    for row in rows:
+        record = row._asdict()
+        record["workout_date"] = record["workout_date"].isoformat()
+        yield json.dumps(record) + "\n"
+
+
+def csv_lines(rows: Iterable[Row]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+ENCODERS = {"ndjson": ndjson_lines, "csv": csv_lines}
+
+
+def chunked(lines: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Join lines into chunks of roughly `size` bytes"""
+    chunk, length = [], 0
+    for line in lines:
+        data = line.encode()
+        chunk.append(data)
+        length += len(data)
+        if length >= size:
+            yield b"".join(chunk)
+            chunk, length = [], 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(
+    engine: Engine,
+    user_id: int,
+    format: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    gzip: bool = False,
+) -> Iterator[bytes]:
+    chunks = chunked(ENCODERS[format](export_rows(engine, user_id, start, end)))
+    return gzip_chunks(chunks) if gzip else chunks
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00")
+    return False
@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Union
+
+from fastapi import Header, HTTPException, Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app import models
+from app.config import settings
+from app.serialization import json_response
+
+# ============================================================================
+# Idempotent Creates (Idempotency-Key)
+# ============================================================================
+# A create request may carry an Idempotency-Key header. The first request with
+# a key claims it by inserting an `idempotency_keys` row, runs, and stores its
+# status and JSON body in that row; a retry with the same key gets the stored
+# response replayed without running the create again. Rows hold digests of the
+# user and key and of the request, so they stay small whatever the client
+# sends, and expire after IDEMPOTENCY_TTL seconds. Each claim first deletes
+# the expired rows through the expires_at index.
+#
+# Requests with the same key are coalesced. Within a process they run one at
+# a time, so followers find the leader's stored response and replay it. A
+# request on another worker that finds a claim still running gets a 409. A
+# create that fails releases its claim, so the client may retry. Async
+# handlers use the same rows through `run_sync`.
+#
+# A claim is a lease: its row expires IDEMPOTENCY_LEASE seconds after it is
+# taken. The commit of the create extends it to IDEMPOTENCY_TTL in the same
+# transaction, and the response is stored after that. A claim left behind by a
+# worker that died before the create committed is evicted like any expired
+# row, and a retry takes the key over instead of getting a 409 until the TTL
+# runs out. A worker that died between the create and storing its response
+# leaves the key claimed for the TTL, as running the create again would
+# duplicate it.
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+KEY_MAX_LENGTH = 255
+
+# Keys being run by a request of this process, set when it finishes
+_running: Dict[bytes, threading.Event] = {}
+_running_lock = threading.Lock()
+# Session.info key of the claim the session's next commit completes
+CLAIM = "idempotency_claim"
+
+
+async def get_idempotency_key(
+    key: Optional[str] = Header(
+        None,
+        alias=IDEMPOTENCY_HEADER,
+        min_length=1,
+        max_length=KEY_MAX_LENGTH,
+        description="Client generated key; retries sending it are not applied twice",
+    )
+) -> Optional[str]:
+    """Dependency returning the request's idempotency key, if any"""
+    return key
+
+
+def digest(*parts) -> bytes:
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).digest()
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"A request with this {IDEMPOTENCY_HEADER} is in progress",
+    )
+
+
+class Idempotent:
+    """Context manager around one create request, `async with` on an
+    AsyncSession
+
+    Entering it with a key either sets `replay` to the stored response or
+    claims the key; `respond` then stores the response of a claimed key. A
+    claim left unstored when the block exits, because the create failed, is
+    deleted.
+    """
+
+    def __init__(
+        self,
+        db: Union[Session, AsyncSession],
+        request: Request,
+        body: Optional[BaseModel],
+        key: Optional[str],
+        user_id: Optional[int] = None,
+    ):
+        self.db = db
+        self.key = None if key is None else digest(user_id, key)
+        # Fields left out are not fingerprinted, as a default like the
+        # current time differs between a request and its retry
+        self.fingerprint = digest(
+            request.method,
+            request.url.path,
+            body.model_dump_json(exclude_unset=True) if body is not None else None,
+        )
+        self.replay: Optional[Response] = None
+        self.claimed = False
+        # Set once the create committed, with the claim extended to the TTL
+        self.completed = False
+        self.running: Optional[threading.Event] = None
+
+    def __enter__(self):
+        if self.key is not None:
+            self.running = self.wait_for_others()
+            try:
+                self.claim(self.db)
+            except BaseException:
+                self.release()
+                raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.discard(self.db)
+        finally:
+            self.release()
+
+    async def __aenter__(self):
+        if self.key is not None:
+            self.running = await asyncio.to_thread(self.wait_for_others)
+            try:
+                await self.db.run_sync(self.claim)
+            except BaseException:
+                self.release()
+                raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            await self.db.run_sync(self.discard)
+        finally:
+            self.release()
+
+    def wait_for_others(self) -> threading.Event:
+        """Wait until no other request of this process runs the key, then
+        mark it as running"""
+        while True:
+            with _running_lock:
+                other = _running.get(self.key)
+                if other is None:
+                    _running[self.key] = threading.Event()
+                    return _running[self.key]
+            other.wait()
+
+    def release(self):
+        if self.running is not None:
+            with _running_lock:
+                del _running[self.key]
+            self.running.set()
+            self.running = None
+
+    def claim(self, db: Session):
+        row = db.execute(
+            select(
+                models.IdempotencyKey.fingerprint,
+                models.IdempotencyKey.status_code,
+                models.IdempotencyKey.body,
+            ).where(
+                models.IdempotencyKey.key == self.key,
+                models.IdempotencyKey.expires_at > utcnow(),
+            )
+        ).first()
+        if row is not None:
+            if row.fingerprint != self.fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"{IDEMPOTENCY_HEADER} was used for a different request",
+                )
+            if row.status_code is None:
+                raise in_progress()
+            self.replay = Response(
+                content=row.body,
+                status_code=row.status_code,
+                media_type="application/json",
+                headers={REPLAYED_HEADER: "true"},
+            )
+            return
+
+        now = utcnow()
+        db.execute(
+            delete(models.IdempotencyKey).where(models.IdempotencyKey.expires_at <= now)
+        )
+        try:
+            db.execute(
+                insert(models.IdempotencyKey).values(
+                    key=self.key,
+                    fingerprint=self.fingerprint,
+                    expires_at=now + timedelta(seconds=settings.idempotency_lease),
+                )
+            )
+            db.commit()
+        except IntegrityError:
+            # Claimed by a request on another worker since the lookup
+            db.rollback()
+            raise in_progress()
+        self.claimed = True
+        db.info[CLAIM] = self
+
+    def complete(self, db: Session):
+        """Extend the claim to the TTL, in the transaction of the create"""
+        db.execute(
+            update(models.IdempotencyKey)
+            .where(models.IdempotencyKey.key == self.key)
+            .values(expires_at=utcnow() + timedelta(seconds=settings.idempotency_ttl))
+        )
+        self.completed = True
+
+    def store(self, db: Session, response: Response):
+        db.info.pop(CLAIM, None)
+        db.execute(
+            update(models.IdempotencyKey)
+            .where(models.IdempotencyKey.key == self.key)
+            .values(
+                status_code=response.status_code,
+                body=response.body,
+                expires_at=utcnow() + timedelta(seconds=settings.idempotency_ttl),
+            )
+        )
+        db.commit()
+        self.claimed = False
+
+    def discard(self, db: Session):
+        """Delete a claim whose create failed before committing"""
+        db.info.pop(CLAIM, None)
+        if self.claimed and not self.completed:
+            db.rollback()
+            db.execute(
+                delete(models.IdempotencyKey).where(
+                    models.IdempotencyKey.key == self.key
+                )
+            )
+            db.commit()
+            self.claimed = False
+
+    def respond(
+        self,
+        response_type,
+        value,
+        status_code: int = status.HTTP_200_OK,
+        encode: bool = False,
+    ):
+        """`value` for FastAPI to serialize, or its JSON response when the key
+        was claimed or `encode` is set; a claimed key stores the response"""
+        if not (self.claimed or encode):
+            return value
+        response = json_response(response_type, value, status_code=status_code)
+        if self.claimed:
+            self.store(self.db, response)
+        return response
+
+    async def respond_async(
+        self, response_type, value, status_code: int = status.HTTP_200_OK
+    ):
+        """`respond` on an AsyncSession"""
+        if not self.claimed:
+            return value
+        response = json_response(response_type, value, status_code=status_code)
+        await self.db.run_sync(self.store, response)
+        return response
+
+
+@event.listens_for(Session, "before_commit")
+def complete_claim(session: Session):
+    """Mark the claim of the request completed in the commit of its create"""
+    idempotent = session.info.pop(CLAIM, None)
+    if idempotent is not None:
+        idempotent.complete(session)
@@ -0,0 +1,315 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+import zlib
+from typing import AsyncIterable, BinaryIO, Iterator, List
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app import analytics, models, schemas, units
+from app.serialization import type_adapter
+
+# ============================================================================
+# Training History Import
+# ============================================================================
+# Accepts the flat one-row-per-set layout written by app.export, so exports can
+# be imported again, as can files converted from other trackers. The upload is
+# spooled to a temporary file and parsed one row at a time. Rows are validated
+# and written in batches of IMPORT_BATCH_SIZE, one transaction per batch, and
+# a progress event is streamed back after every commit. Consecutive rows that
+# share a workout (and exercise) key are grouped, so a workout may span batches.
+# Weights are read in the user's unit, as they are exported.
+
+IMPORT_BATCH_SIZE = 5000
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+# Raised while reading an upload that is not gzip or UTF-8 text as declared
+UNREADABLE_ERRORS = (OSError, EOFError, zlib.error, UnicodeDecodeError)
+
+
+async def spool(body: AsyncIterable[bytes]) -> BinaryIO:
+    """Buffer a request body, in memory up to SPOOL_MAX_SIZE and then on disk"""
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    async for chunk in body:
+        upload.write(chunk)
+    upload.seek(0)
+    return upload
+
+
+def read_rows(text: io.TextIOBase, format: str) -> Iterator[tuple]:
+    """Yield (row number, raw row, parse error) for each data row
+
+    An upload that cannot be decoded ends with a parse error for the row
+    that was being read, rather than an exception in the middle of the stream.
+    """
+    number = 0
+    try:
+        for number, raw, error in parse_rows(text, format):
+            yield number, raw, error
+    except UNREADABLE_ERRORS as exc:
+        yield number + 1, None, f"Unreadable file: {exc}"
+
+
+def parse_rows(text: io.TextIOBase, format: str) -> Iterator[tuple]:
+    if format == "csv":
+        for number, raw in enumerate(csv.DictReader(text), start=1):
+            # Empty CSV cells are missing values, as null is in NDJSON
+            yield number, {k: v or None for k, v in raw.items()}, None
+        return
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            raw = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(raw, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, raw, None
+
+
+def error_event(number: int, errors: List[dict]) -> dict:
+    return {"event": "error", "row": number, "errors": errors}
+
+
+def validate_values(schema, values: List[dict], prefix: str = ""):
+    """Validate `values` as a list of `schema` in one call
+
+    Returns the valid models and the errors of the invalid ones, both keyed by
+    index, with error fields named after the import columns.
+    """
+    adapter = type_adapter(List[schema])
+    try:
+        return dict(enumerate(adapter.validate_python(values))), {}
+    except ValidationError as exc:
+        failed = {}
+        for error in exc.errors():
+            index, *field = error["loc"]
+            failed.setdefault(index, []).append(
+                {
+                    "field": prefix + ".".join(str(part) for part in field),
+                    "message": error["msg"],
+                }
+            )
+    valid = [i for i in range(len(values)) if i not in failed]
+    validated = adapter.validate_python([values[i] for i in valid])
+    return dict(zip(valid, validated)), failed
+
+
+def nested_value_errors(raw: dict) -> List[dict]:
+    """Errors for the NDJSON fields holding an object or array, which would
+    fail validation but cannot be used as a grouping key first"""
+    return [
+        {"field": field, "message": "Expected a single value"}
+        for field, value in raw.items()
+        if isinstance(value, (dict, list))
+    ]
+
+
+def workout_value(raw: dict) -> dict:
+    day = raw.get("workout_date")
+    if isinstance(day, str) and len(day) == len("YYYY-MM-DD"):
+        day += "T00:00:00"
+    return {"name": raw.get("workout_name"), "date": day}
+
+
+def validate_batch(batch: List[tuple]):
+    """Validate a batch with one TypeAdapter call per schema
+
+    Every row repeats its workout and exercise, so each distinct workout and
+    exercise is validated once and shared by its rows. Returns
+    (raw, workout, exercise, set) tuples for the valid rows, with exercise and
+    set None when the row has none, and an error event per invalid row.
+    """
+    workout_index, exercise_index, nested = {}, {}, {}
+    workouts, exercises, sets, refs = [], [], [], []
+    for number, raw in batch:
+        nested[number] = nested_value_errors(raw)
+        if nested[number]:
+            refs.append(None)
+            continue
+        workout = workout_value(raw)
+        w = workout_index.setdefault((workout["name"], workout["date"]), len(workouts))
+        if w == len(workouts):
+            workouts.append(workout)
+        e = s = None
+        has_set = raw.get("reps") is not None or raw.get("weight") is not None
+        # A set without an exercise name fails validation on `exercise_name`
+        if has_set or raw.get("exercise_name") is not None:
+            e = exercise_index.setdefault(raw.get("exercise_name"), len(exercises))
+            if e == len(exercises):
+                exercises.append({"name": raw.get("exercise_name")})
+        if has_set:
+            s = len(sets)
+            sets.append({"reps": raw.get("reps"), "weight": raw.get("weight")})
+        refs.append((w, e, s))
+
+    valid_workouts, workout_errors = validate_values(
+        schemas.WorkoutImport, workouts, prefix="workout_"
+    )
+    valid_exercises, exercise_errors = validate_values(
+        schemas.ExerciseCreate, exercises, prefix="exercise_"
+    )
+    valid_sets, set_errors = validate_values(schemas.SetCreate, sets)
+
+    rows, errors = [], []
+    for (number, raw), ref in zip(batch, refs):
+        if ref is None:
+            errors.append(error_event(number, nested[number]))
+            continue
+        w, e, s = ref
+        row_errors = (
+            workout_errors.get(w, [])
+            + exercise_errors.get(e, [])
+            + set_errors.get(s, [])
+        )
+        if row_errors:
+            errors.append(error_event(number, row_errors))
+        else:
+            rows.append(
+                (raw, valid_workouts[w], valid_exercises.get(e), valid_sets.get(s))
+            )
+    return rows, errors
+
+
+class HistoryWriter:
+    """Writes validated rows, carrying the open workout and exercise between
+    batches so a group split across two batches is not duplicated"""
+
+    def __init__(self, db: Session, user_id: int):
+        self.db = db
+        self.user_id = user_id
+        self.workout_key = self.workout_id = self.workout_date = None
+        self.exercise_key = self.exercise_id = self.exercise_name = None
+        self.totals = {"workouts": 0, "exercises": 0, "sets": 0}
+
+    def write(self, rows) -> None:
+        # Rows reference the new workout or exercise at that index of this
+        # batch, or -1 for the one still open from the previous batch
+        workouts, exercises, sets, keys = [], [], [], set()
+        for raw, workout, exercise, set_data in rows:
+            workout_key = raw.get("workout_id") or (workout.name, workout.date)
+            if workout_key != self.workout_key:
+                workouts.append(
+                    {
+                        "name": workout.name,
+                        "date": workout.date,
+                        "user_id": self.user_id,
+                    }
+                )
+                self.workout_key, self.exercise_key = workout_key, None
+                self.workout_date = workout.date.date()
+            if exercise is None:
+                continue
+            exercise_key = raw.get("exercise_id") or exercise.name
+            if exercise_key != self.exercise_key:
+                exercises.append(
+                    {"name": exercise.name, "workout_ref": len(workouts) - 1}
+                )
+                self.exercise_key, self.exercise_name = exercise_key, exercise.name
+            if set_data is not None:
+                sets.append(
+                    {
+                        "reps": set_data.reps,
+                        "weight": set_data.weight,
+                        "exercise_ref": len(exercises) - 1,
+                    }
+                )
+                keys.add((self.user_id, self.exercise_name, self.workout_date))
+
+        workout_ids = self.insert_ids(models.Workout, workouts)
+        for exercise in exercises:
+            ref = exercise.pop("workout_ref")
+            exercise["workout_id"] = workout_ids[ref] if ref >= 0 else self.workout_id
+        exercise_ids = self.insert_ids(models.Exercise, exercises)
+        for set_row in sets:
+            ref = set_row.pop("exercise_ref")
+            set_row["exercise_id"] = exercise_ids[ref] if ref >= 0 else self.exercise_id
+        if sets:
+            weight_kg = units.canonical_weight(bindparam("weight"), self.user_id)
+            self.db.execute(
+                insert(models.Set.__table__).values(weight_kg=weight_kg), sets
+            )
+        analytics.refresh_summaries(self.db, keys)
+        self.db.commit()
+
+        if workout_ids:
+            self.workout_id = workout_ids[-1]
+        if exercise_ids:
+            self.exercise_id = exercise_ids[-1]
+        self.totals["workouts"] += len(workouts)
+        self.totals["exercises"] += len(exercises)
+        self.totals["sets"] += len(sets)
+
+    def insert_ids(self, model, rows: List[dict]) -> List[int]:
+        """Insert `rows` and return their ids in input order (see
+        `crud.create_workout_log` for why sorting the ids is enough)
+
+        Core table inserts skip the ORM's per-row bookkeeping for bulk rows.
+        """
+        if not rows:
+            return []
+        table = model.__table__
+        return sorted(self.db.scalars(insert(table).returning(table.c.id), rows).all())
+
+
+def import_history(
+    engine: Engine,
+    user_id: int,
+    upload: BinaryIO,
+    format: str,
+    compressed: bool = False,
+) -> Iterator[dict]:
+    """Import an uploaded history file for a user, yielding progress and error
+    events
+
+    Batches are committed as they are written, so when the stream stops early
+    the last progress event says how much of the file was imported.
+    """
+    source = gzip.GzipFile(fileobj=upload, mode="rb") if compressed else upload
+    text = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    rows_read = error_count = 0
+    try:
+        with Session(engine) as db:
+            writer = HistoryWriter(db, user_id)
+            batch = []
+            for number, raw, error in read_rows(text, format):
+                rows_read = number
+                if error is not None:
+                    error_count += 1
+                    yield error_event(number, [{"field": "", "message": error}])
+                    continue
+                batch.append((number, raw))
+                if len(batch) == IMPORT_BATCH_SIZE:
+                    error_count += yield from write_batch(writer, batch)
+                    batch = []
+                    yield progress_event(rows_read, writer.totals, error_count)
+            if batch:
+                error_count += yield from write_batch(writer, batch)
+            done = progress_event(rows_read, writer.totals, error_count)
+            yield dict(done, event="done")
+    finally:
+        upload.close()
+
+
+def write_batch(writer: HistoryWriter, batch: List[tuple]):
+    rows, errors = validate_batch(batch)
+    yield from errors
+    writer.write(rows)
+    return len(errors)
+
+
+def progress_event(rows: int, totals: dict, errors: int) -> dict:
+    return {"event": "progress", "rows": rows, **totals, "errors": errors}
+
+
+def ndjson_events(events: Iterator[dict]) -> Iterator[str]:
+    for event in events:
+        yield json.dumps(event) + "\n"
@@ -1,17 +1,149 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from contextlib import asynccontextmanager
+from datetime import date
+from fastapi import (
+    Body,
+    FastAPI,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
-from app import crud, schemas, models
-from app.database import engine, get_db
+from typing import List, Literal, Optional
+from app import (
+    analytics,
+    async_api,
+    crud,
+    export,
+    importer,
+    metrics,
+    profiling,
+    reports,
+    schemas,
+    search,
+)
+from app.cache import template_cache, template_key
+from app.config import settings
+from app.idempotency import Idempotent, get_idempotency_key
+from app.database import (
+    AsyncSessionLocal,
+    SessionLocal,
+    engine,
+    log_database_settings,
+)
+from app.migrations import upgrade_database
+from app.pagination import InvalidCursor
+from app.serialization import json_response
+from app.tenancy import get_routed_db, get_user_db, get_user_id, replicas, shards
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every shard carries the full schema, including its copies of user rows
+    sessionmakers = [SessionLocal, *shards.sessions]
+    if settings.auto_migrate:
+        for db_engine in [engine, *shards.engines]:
+            upgrade_database(db_engine)
+    log_database_settings(engine)
+    for make_session in sessionmakers:
+        with make_session() as db:
+            if analytics.summaries_need_rebuild(db):
+                analytics.rebuild_summaries(db)
+            reports.resume_report_jobs(db)
+    yield
+    reports.worker.shutdown()
+    shards.dispose()
+    replicas.dispose()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Fitness API",
     description="API for managing weightliftingworkouts",
     version="1.0.0",
+    lifespan=lifespan,
+)
+
+if settings.metrics:
+    app.add_middleware(metrics.MetricsMiddleware)
+    slow_query_seconds = settings.slow_query_ms / 1000 or None
+    for db_engine in [engine, *shards.engines, *replicas.engines]:
+        metrics.instrument_engine(db_engine, slow_query_seconds)
+    if AsyncSessionLocal is not None:
+        metrics.instrument_engine(
+            AsyncSessionLocal.kw["bind"].sync_engine, slow_query_seconds
+        )
+
+PageLimit = Query(100, gt=0, le=schemas.PAGE_LIMIT_MAX)
+
+
+def fetch_page(page_query, **kwargs):
+    """Run a keyset page query, turning a malformed cursor into a 400"""
+    try:
+        return page_query(**kwargs)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# User Endpoints
+@app.post(
+    "/users/", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED
 )
+def create_user(
+    user: schemas.UserCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    db: Session = Depends(get_routed_db),
+):
+    """Create a new user
+
+    Every other endpoint acts for the user whose id is sent in `X-User-Id`.
+    """
+    with Idempotent(db, request, user, idempotency_key) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        if crud.get_user_by_name(db=db, name=user.name) is not None:
+            raise HTTPException(status_code=409, detail="Username already taken")
+        db_user = crud.create_user(db=db, user=user)
+        if shards:
+            shards.copy_user(db_user)
+        return idempotent.respond(
+            schemas.UserResponse, db_user, status_code=status.HTTP_201_CREATED
+        )
+
+
+@app.get("/users/me", response_model=schemas.UserResponse)
+def read_current_user(
+    user_id: int = Depends(get_user_id), db: Session = Depends(get_routed_db)
+):
+    """Get the user named in `X-User-Id`"""
+    db_user = crud.get_user(db=db, user_id=user_id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+
+@app.put("/users/me", response_model=schemas.UserResponse)
+@app.patch("/users/me", response_model=schemas.UserResponse)
+def update_current_user(
+    user: schemas.UserUpdate,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_routed_db),
+):
+    """Update the user named in `X-User-Id`"""
+    if user.name is not None:
+        existing = crud.get_user_by_name(db=db, name=user.name)
+        if existing is not None and existing.id != user_id:
+            raise HTTPException(status_code=409, detail="Username already taken")
+    db_user = crud.update_user(db=db, user_id=user_id, user=user)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if shards:
+        shards.copy_user(db_user)
+    return db_user
 
 
 # Workout Template Endpoints
@@ -21,46 +153,142 @@ app = FastAPI(
     status_code=status.HTTP_201_CREATED,
 )
 def create_workout_template(
-    workout_template: schemas.WorkoutTemplateCreate, db: Session = Depends(get_db)
+    workout_template: schemas.WorkoutTemplateCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
 ):
     """Create a new workout template"""
-    return crud.create_workout_template(db=db, workout_template=workout_template)
+    with Idempotent(
+        db, request, workout_template, idempotency_key, user_id
+    ) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        if not crud.user_exists(db=db, user_id=user_id):
+            raise HTTPException(status_code=404, detail="User not found")
+        db_workout_template = crud.create_workout_template(
+            db=db, user_id=user_id, workout_template=workout_template
+        )
+        return idempotent.respond(
+            schemas.WorkoutTemplateResponse,
+            db_workout_template,
+            status_code=status.HTTP_201_CREATED,
+        )
 
 
 @app.get("/workout-templates/", response_model=List[schemas.WorkoutTemplateResponse])
 def read_workout_templates(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = PageLimit,
+    cursor: Optional[str] = None,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Get all workout templates
+
+    Passing `cursor` switches from offset to keyset pagination; the cursor for
+    the following page is returned in the `X-Next-Cursor` header.
+    """
+    if cursor is None:
+        key = template_key("workout_templates", user_id, skip, limit)
+        cached = template_cache.respond(request, key)
+        if cached is not None:
+            return cached
+        return template_cache.store(
+            request,
+            key,
+            List[schemas.WorkoutTemplateResponse],
+            crud.get_workout_templates(db=db, user_id=user_id, skip=skip, limit=limit),
+        )
+    items, next_cursor = fetch_page(
+        crud.get_workout_templates_page,
+        db=db,
+        user_id=user_id,
+        cursor=cursor,
+        limit=limit,
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@app.get(
+    "/workout-templates/page",
+    response_model=schemas.Page[schemas.WorkoutTemplateResponse],
+)
+def read_workout_templates_page(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
 ):
-    """Get all workout templates"""
-    return crud.get_workout_templates(db=db, skip=skip, limit=limit)
+    """Get one page of workout templates using keyset pagination"""
+    key = template_key("workout_templates_page", user_id, cursor, limit)
+    cached = template_cache.respond(request, key)
+    if cached is not None:
+        return cached
+    items, next_cursor = fetch_page(
+        crud.get_workout_templates_page,
+        db=db,
+        user_id=user_id,
+        cursor=cursor,
+        limit=limit,
+    )
+    return template_cache.store(
+        request,
+        key,
+        schemas.Page[schemas.WorkoutTemplateResponse],
+        {"items": items, "next_cursor": next_cursor},
+    )
 
 
 @app.get(
     "/workout-templates/{workout_template_id}",
     response_model=schemas.WorkoutTemplateResponse,
 )
-def read_workout_template(workout_template_id: int, db: Session = Depends(get_db)):
+def read_workout_template(
+    workout_template_id: int,
+    request: Request,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Get a specific workout template by ID"""
+    key = template_key("workout_template", user_id, workout_template_id)
+    cached = template_cache.respond(request, key)
+    if cached is not None:
+        return cached
     db_workout_template = crud.get_workout_template(
-        db=db, workout_template_id=workout_template_id
+        db=db, user_id=user_id, workout_template_id=workout_template_id
     )
     if db_workout_template is None:
         raise HTTPException(status_code=404, detail="Workout template not found")
-    return db_workout_template
+    return template_cache.store(
+        request, key, schemas.WorkoutTemplateResponse, db_workout_template
+    )
 
 
 @app.put(
     "/workout-templates/{workout_template_id}",
     response_model=schemas.WorkoutTemplateResponse,
 )
+@app.patch(
+    "/workout-templates/{workout_template_id}",
+    response_model=schemas.WorkoutTemplateResponse,
+)
 def update_workout_template(
     workout_template_id: int,
     workout_template: schemas.WorkoutTemplateUpdate,
-    db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
 ):
     """Update a workout template"""
     db_workout_template = crud.update_workout_template(
         db=db,
+        user_id=user_id,
         workout_template_id=workout_template_id,
         workout_template=workout_template,
     )
@@ -72,12 +300,15 @@ def update_workout_template(
 @app.delete(
     "/workout-templates/{workout_template_id}", status_code=status.HTTP_204_NO_CONTENT
 )
-def delete_workout_template(workout_template_id: int, db: Session = Depends(get_db)):
+def delete_workout_template(
+    workout_template_id: int,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Delete a workout template"""
-    db_workout_template = crud.delete_workout_template(
-        db=db, workout_template_id=workout_template_id
-    )
-    if db_workout_template is None:
+    if not crud.delete_workout_template(
+        db=db, user_id=user_id, workout_template_id=workout_template_id
+    ):
         raise HTTPException(status_code=404, detail="Workout template not found")
     return None
 
@@ -91,24 +322,57 @@ def delete_workout_template(workout_template_id: int, db: Session = Depends(get_
 def create_exercise_template(
     workout_template_id: int,
     exercise_template: schemas.ExerciseTemplateCreate,
-    db: Session = Depends(get_db),
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
 ):
     """Create a new exercise template within a workout template"""
-    return crud.create_exercise_template(
-        db=db,
-        workout_template_id=workout_template_id,
-        exercise_template=exercise_template,
-    )
+    with Idempotent(
+        db, request, exercise_template, idempotency_key, user_id
+    ) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        # Verify workout template exists
+        if not crud.workout_template_exists(
+            db=db, user_id=user_id, workout_template_id=workout_template_id
+        ):
+            raise HTTPException(status_code=404, detail="Workout template not found")
+        db_exercise_template = crud.create_exercise_template(
+            db=db,
+            user_id=user_id,
+            workout_template_id=workout_template_id,
+            exercise_template=exercise_template,
+        )
+        return idempotent.respond(
+            schemas.ExerciseTemplateResponse,
+            db_exercise_template,
+            status_code=status.HTTP_201_CREATED,
+        )
 
 
 @app.get(
     "/workout-templates/{workout_template_id}/exercise-templates/",
     response_model=List[schemas.ExerciseTemplateResponse],
 )
-def read_exercise_templates(workout_template_id: int, db: Session = Depends(get_db)):
+def read_exercise_templates(
+    workout_template_id: int,
+    request: Request,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Get all exercise templates for a workout template"""
-    return crud.get_exercise_templates_by_workout_template(
-        db=db, workout_template_id=workout_template_id
+    key = template_key("exercise_templates", user_id, workout_template_id)
+    cached = template_cache.respond(request, key)
+    if cached is not None:
+        return cached
+    return template_cache.store(
+        request,
+        key,
+        List[schemas.ExerciseTemplateResponse],
+        crud.get_exercise_templates_by_workout_template(
+            db=db, user_id=user_id, workout_template_id=workout_template_id
+        ),
     )
 
 
@@ -116,28 +380,45 @@ def read_exercise_templates(workout_template_id: int, db: Session = Depends(get_
     "/exercise-templates/{exercise_template_id}",
     response_model=schemas.ExerciseTemplateResponse,
 )
-def read_exercise_template(exercise_template_id: int, db: Session = Depends(get_db)):
+def read_exercise_template(
+    exercise_template_id: int,
+    request: Request,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Get a specific exercise template by ID"""
+    key = template_key("exercise_template", user_id, exercise_template_id)
+    cached = template_cache.respond(request, key)
+    if cached is not None:
+        return cached
     db_exercise_template = crud.get_exercise_template(
-        db=db, exercise_template_id=exercise_template_id
+        db=db, user_id=user_id, exercise_template_id=exercise_template_id
     )
     if db_exercise_template is None:
         raise HTTPException(status_code=404, detail="Exercise template not found")
-    return db_exercise_template
+    return template_cache.store(
+        request, key, schemas.ExerciseTemplateResponse, db_exercise_template
+    )
 
 
 @app.put(
     "/exercise-templates/{exercise_template_id}",
     response_model=schemas.ExerciseTemplateResponse,
 )
+@app.patch(
+    "/exercise-templates/{exercise_template_id}",
+    response_model=schemas.ExerciseTemplateResponse,
+)
 def update_exercise_template(
     exercise_template_id: int,
     exercise_template: schemas.ExerciseTemplateUpdate,
-    db: Session = Depends(get_db),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
 ):
     """Update an exercise template"""
     db_exercise_template = crud.update_exercise_template(
         db=db,
+        user_id=user_id,
         exercise_template_id=exercise_template_id,
         exercise_template=exercise_template,
     )
@@ -149,16 +430,204 @@ def update_exercise_template(
 @app.delete(
     "/exercise-templates/{exercise_template_id}", status_code=status.HTTP_204_NO_CONTENT
 )
-def delete_exercise_template(exercise_template_id: int, db: Session = Depends(get_db)):
+def delete_exercise_template(
+    exercise_template_id: int,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Delete an exercise template"""
-    db_exercise_template = crud.delete_exercise_template(
-        db=db, exercise_template_id=exercise_template_id
-    )
-    if db_exercise_template is None:
+    if not crud.delete_exercise_template(
+        db=db, user_id=user_id, exercise_template_id=exercise_template_id
+    ):
         raise HTTPException(status_code=404, detail="Exercise template not found")
     return None
 
 
+# Workout Endpoints
+@app.post(
+    "/workouts/log",
+    response_model=schemas.WorkoutResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def log_workout(
+    workout_log: schemas.WorkoutLogCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Log a full workout with its exercises and sets in one transaction"""
+    with Idempotent(db, request, workout_log, idempotency_key, user_id) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        template_id = workout_log.workout_template_id
+        if template_id is not None and not crud.workout_template_exists(
+            db, user_id, template_id
+        ):
+            raise HTTPException(status_code=404, detail="Workout template not found")
+        workout = crud.create_workout_log(
+            db=db, user_id=user_id, workout_log=workout_log
+        )
+        if workout is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return idempotent.respond(
+            schemas.WorkoutResponse,
+            workout,
+            status_code=status.HTTP_201_CREATED,
+            encode=settings.fast_json,
+        )
+
+
+@app.post(
+    "/workout-templates/{workout_template_id}/start",
+    response_model=schemas.StartedWorkoutResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def start_workout(
+    workout_template_id: int,
+    request: Request,
+    workout_start: Optional[schemas.WorkoutStart] = None,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Start a workout from a workout template, creating one exercise per
+    exercise template in a single transaction
+
+    With `prefill`, each exercise carries the sets of the template's last
+    session as `targets`.
+    """
+    workout_start = workout_start or schemas.WorkoutStart()
+    with Idempotent(db, request, workout_start, idempotency_key, user_id) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        workout = crud.start_workout(
+            db=db,
+            user_id=user_id,
+            workout_template_id=workout_template_id,
+            workout_start=workout_start,
+        )
+        if workout is None:
+            raise HTTPException(status_code=404, detail="Workout template not found")
+        return idempotent.respond(
+            schemas.StartedWorkoutResponse,
+            workout,
+            status_code=status.HTTP_201_CREATED,
+            encode=settings.fast_json,
+        )
+
+
+@app.get("/workouts/", response_model=schemas.Page[schemas.WorkoutListItemResponse])
+def read_workouts(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    name: Optional[str] = Query(None, min_length=1, description="Name prefix"),
+    workout_template_id: Optional[int] = None,
+    include_stats: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """List workouts, most recent first, filtered by date range, name prefix
+    and workout template
+
+    `include_stats` adds each workout's exercise count, set count and volume.
+    """
+    items, next_cursor = fetch_page(
+        crud.get_workouts,
+        db=db,
+        user_id=user_id,
+        start=start,
+        end=end,
+        name_prefix=name,
+        workout_template_id=workout_template_id,
+        include_stats=include_stats,
+        cursor=cursor,
+        limit=limit,
+    )
+    page = {"items": items, "next_cursor": next_cursor}
+    if settings.fast_json:
+        return json_response(schemas.Page[schemas.WorkoutListItemResponse], page)
+    return page
+
+
+@app.delete("/workouts/", response_model=schemas.WorkoutsDeleted)
+def delete_workouts(
+    start: date,
+    end: date,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Delete the workouts dated from `start` to `end` inclusive, with their
+    exercises and sets"""
+    if start > end:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+    return {"deleted": crud.delete_workouts(db, user_id, start, end)}
+
+
+@app.patch("/workouts/{workout_id}", response_model=schemas.WorkoutSummaryResponse)
+def update_workout(
+    workout_id: int,
+    workout: schemas.WorkoutUpdate,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Rename or move a workout; fields left out keep their value"""
+    db_workout = crud.update_workout(
+        db=db, user_id=user_id, workout_id=workout_id, workout=workout
+    )
+    if db_workout is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    return db_workout
+
+
+@app.get("/workouts/page", response_model=schemas.Page[schemas.WorkoutSummaryResponse])
+def read_workouts_page(
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Get one page of workouts, most recent first"""
+    items, next_cursor = fetch_page(
+        crud.get_workouts_page, db=db, user_id=user_id, cursor=cursor, limit=limit
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@app.get("/workouts/trees", response_model=List[schemas.WorkoutResponse])
+def read_workout_trees(
+    ids: List[int] = Query(max_length=schemas.PAGE_LIMIT_MAX),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Get many workouts with their exercises and sets in one query
+
+    Workouts are returned in the order requested; unknown ids are skipped.
+    """
+    trees = crud.get_workout_trees(db=db, user_id=user_id, workout_ids=ids)
+    found = [trees[i] for i in dict.fromkeys(ids) if i in trees]
+    if settings.fast_json:
+        return json_response(List[schemas.WorkoutResponse], found)
+    return found
+
+
+@app.get("/workouts/{workout_id}/tree", response_model=schemas.WorkoutResponse)
+def read_workout_tree(
+    workout_id: int,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Get a workout with its exercises and sets in one query"""
+    tree = crud.get_workout_tree(db=db, user_id=user_id, workout_id=workout_id)
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    if settings.fast_json:
+        return json_response(schemas.WorkoutResponse, tree)
+    return tree
+
+
 # Exercise Endpoints
 @app.post(
     "/workout/{workout_id}/exercises/",
@@ -166,44 +635,109 @@ def delete_exercise_template(exercise_template_id: int, db: Session = Depends(ge
     status_code=status.HTTP_201_CREATED,
 )
 def create_exercise(
-    workout_id: int, exercise: schemas.ExerciseCreate, db: Session = Depends(get_db)
+    workout_id: int,
+    exercise: schemas.ExerciseCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
 ):
     """Create a new exercise within a workout"""
-    # Verify workout template exists
-    workout = crud.get_workout(db=db, workout_id=workout_id)
-    if workout is None:
-        raise HTTPException(status_code=404, detail="Workout  not found")
-    return crud.create_exercise(db=db, workout_id=workout_id, exercise=exercise)
+    with Idempotent(db, request, exercise, idempotency_key, user_id) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        # Verify workout template exists
+        if not crud.workout_exists(db=db, user_id=user_id, workout_id=workout_id):
+            raise HTTPException(status_code=404, detail="Workout  not found")
+        db_exercise = crud.create_exercise(
+            db=db, workout_id=workout_id, exercise=exercise
+        )
+        return idempotent.respond(
+            schemas.ExerciseResponse,
+            db_exercise,
+            status_code=status.HTTP_201_CREATED,
+        )
 
 
 @app.get(
     "/workout/{workout_id}/exercises/", response_model=List[schemas.ExerciseResponse]
 )
-def read_exercises(workout_id: int, db: Session = Depends(get_db)):
+def read_exercises(
+    workout_id: int,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Get all exercises for a workout"""
-    # Verify workout template exists
-    workout = crud.get_workout(db=db, workout_id=workout_id)
-    if workout is None:
+    if settings.fast_json:
+        rows = crud.get_exercise_rows_by_workout(
+            db=db, user_id=user_id, workout_id=workout_id
+        )
+        if rows is None:
+            raise HTTPException(status_code=404, detail="Workout not found")
+        return json_response(List[schemas.ExerciseResponse], rows)
+    exercises = crud.get_exercises_by_workout(
+        db=db, user_id=user_id, workout_id=workout_id
+    )
+    if exercises is None:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    return exercises
+
+
+@app.get(
+    "/workout/{workout_id}/exercises/page",
+    response_model=schemas.Page[schemas.ExerciseResponse],
+)
+def read_exercises_page(
+    workout_id: int,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Get one page of exercises for a workout"""
+    page = fetch_page(
+        crud.get_exercises_page_by_workout,
+        db=db,
+        user_id=user_id,
+        workout_id=workout_id,
+        cursor=cursor,
+        limit=limit,
+    )
+    if page is None:
         raise HTTPException(status_code=404, detail="Workout not found")
-    return crud.get_exercises_by_workout(db=db, workout_id=workout_id)
+    items, next_cursor = page
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @app.get("/exercises/{exercise_id}", response_model=schemas.ExerciseResponse)
-def read_exercise(exercise_id: int, db: Session = Depends(get_db)):
+def read_exercise(
+    exercise_id: int,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Get a specific exercise by ID"""
-    db_exercise = crud.get_exercise(db=db, exercise_id=exercise_id)
+    if settings.fast_json:
+        row = crud.get_exercise_row(db=db, user_id=user_id, exercise_id=exercise_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        return json_response(schemas.ExerciseResponse, row)
+    db_exercise = crud.get_exercise(db=db, user_id=user_id, exercise_id=exercise_id)
     if db_exercise is None:
         raise HTTPException(status_code=404, detail="Exercise not found")
     return db_exercise
 
 
 @app.put("/exercises/{exercise_id}", response_model=schemas.ExerciseResponse)
+@app.patch("/exercises/{exercise_id}", response_model=schemas.ExerciseResponse)
 def update_exercise(
-    exercise_id: int, exercise: schemas.ExerciseUpdate, db: Session = Depends(get_db)
+    exercise_id: int,
+    exercise: schemas.ExerciseUpdate,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
 ):
     """Update an exercise"""
     db_exercise = crud.update_exercise(
-        db=db, exercise_id=exercise_id, exercise=exercise
+        db=db, user_id=user_id, exercise_id=exercise_id, exercise=exercise
     )
     if db_exercise is None:
         raise HTTPException(status_code=404, detail="Exercise not found")
@@ -211,10 +745,13 @@ def update_exercise(
 
 
 @app.delete("/exercises/{exercise_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_exercise(exercise_id: int, db: Session = Depends(get_db)):
+def delete_exercise(
+    exercise_id: int,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Delete an exercise"""
-    db_exercise = crud.delete_exercise(db=db, exercise_id=exercise_id)
-    if db_exercise is None:
+    if not crud.delete_exercise(db=db, user_id=user_id, exercise_id=exercise_id):
         raise HTTPException(status_code=404, detail="Exercise not found")
     return None
 
@@ -226,53 +763,294 @@ def delete_exercise(exercise_id: int, db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
 )
 def create_set(
-    exercise_id: int, set_data: schemas.SetCreate, db: Session = Depends(get_db)
+    exercise_id: int,
+    set_data: schemas.SetCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
 ):
-    """Create a new set for an exercise"""
-    # Verify exercise exists
-    exercise = crud.get_exercise(db=db, exercise_id=exercise_id)
-    if exercise is None:
-        raise HTTPException(status_code=404, detail="Exercise not found")
-    return crud.create_set(db=db, exercise_id=exercise_id, set_data=set_data)
+    """Create a new set for an exercise
+
+    Send an `Idempotency-Key` to make retries safe: a retry gets the first
+    response back instead of adding the set again.
+    """
+    with Idempotent(db, request, set_data, idempotency_key, user_id) as idempotent:
+        if idempotent.replay is not None:
+            return idempotent.replay
+        # Verify exercise exists
+        if not crud.exercise_exists(db=db, user_id=user_id, exercise_id=exercise_id):
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        db_set = crud.create_set(
+            db=db, user_id=user_id, exercise_id=exercise_id, set_data=set_data
+        )
+        return idempotent.respond(
+            schemas.SetResponse, db_set, status_code=status.HTTP_201_CREATED
+        )
+
+
+@app.patch("/exercises/{exercise_id}/sets/", response_model=List[schemas.SetResponse])
+def update_sets(
+    exercise_id: int,
+    set_updates: List[schemas.SetBulkUpdate] = Body(
+        min_length=1, max_length=schemas.SETS_UPDATE_MAX
+    ),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Update several sets of an exercise in one statement
+
+    Each item names a set by `id` and the fields to change. Either every set
+    is updated or, when one is not a set of the exercise, none is.
+    """
+    if len({set_update.id for set_update in set_updates}) != len(set_updates):
+        raise HTTPException(status_code=422, detail="Set ids must be unique")
+    sets = crud.update_sets(
+        db=db, user_id=user_id, exercise_id=exercise_id, set_updates=set_updates
+    )
+    if sets is None:
+        raise HTTPException(status_code=404, detail="Set not found")
+    return sets
 
 
 @app.get("/exercises/{exercise_id}/sets/", response_model=List[schemas.SetResponse])
-def read_sets(exercise_id: int, db: Session = Depends(get_db)):
+def read_sets(
+    exercise_id: int,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
     """Get all sets for an exercise"""
-    # Verify exercise exists
-    exercise = crud.get_exercise(db=db, exercise_id=exercise_id)
-    if exercise is None:
+    if settings.fast_json:
+        rows = crud.get_set_rows_by_exercise(
+            db=db, user_id=user_id, exercise_id=exercise_id
+        )
+        if rows is None:
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        return json_response(List[schemas.SetResponse], rows)
+    sets = crud.get_sets_by_exercise(db=db, user_id=user_id, exercise_id=exercise_id)
+    if sets is None:
+        raise HTTPException(status_code=404, detail="Exercise not found")
+    return sets
+
+
+@app.get(
+    "/exercises/{exercise_id}/sets/page",
+    response_model=schemas.Page[schemas.SetResponse],
+)
+def read_sets_page(
+    exercise_id: int,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Get one page of sets for an exercise"""
+    page = fetch_page(
+        crud.get_sets_page_by_exercise,
+        db=db,
+        user_id=user_id,
+        exercise_id=exercise_id,
+        cursor=cursor,
+        limit=limit,
+    )
+    if page is None:
         raise HTTPException(status_code=404, detail="Exercise not found")
-    return crud.get_sets_by_exercise(db=db, exercise_id=exercise_id)
+    items, next_cursor = page
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @app.get("/sets/{set_id}", response_model=schemas.SetResponse)
-def read_set(set_id: int, db: Session = Depends(get_db)):
+def read_set(
+    set_id: int, user_id: int = Depends(get_user_id), db: Session = Depends(get_user_db)
+):
     """Get a specific set by ID"""
-    db_set = crud.get_set(db=db, set_id=set_id)
+    db_set = crud.get_set(db=db, user_id=user_id, set_id=set_id)
     if db_set is None:
         raise HTTPException(status_code=404, detail="Set not found")
     return db_set
 
 
 @app.put("/sets/{set_id}", response_model=schemas.SetResponse)
-def update_set(set_id: int, set_data: schemas.SetCreate, db: Session = Depends(get_db)):
-    """Update a set"""
-    db_set = crud.update_set(db=db, set_id=set_id, set_data=set_data)
+@app.patch("/sets/{set_id}", response_model=schemas.SetResponse)
+def update_set(
+    set_id: int,
+    set_data: schemas.SetUpdate,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Update a set; fields left out keep their value"""
+    db_set = crud.update_set(db=db, user_id=user_id, set_id=set_id, set_data=set_data)
     if db_set is None:
         raise HTTPException(status_code=404, detail="Set not found")
     return db_set
 
 
 @app.delete("/sets/{set_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_set(set_id: int, db: Session = Depends(get_db)):
+def delete_set(
+    set_id: int, user_id: int = Depends(get_user_id), db: Session = Depends(get_user_db)
+):
     """Delete a set"""
-    db_set = crud.delete_set(db=db, set_id=set_id)
-    if db_set is None:
+    if not crud.delete_set(db=db, user_id=user_id, set_id=set_id):
         raise HTTPException(status_code=404, detail="Set not found")
     return None
 
 
+# Search Endpoints
+@app.get("/exercise-names/search", response_model=List[schemas.ExerciseNameResponse])
+def search_exercise_names(
+    q: str = Query(
+        min_length=1,
+        max_length=100,
+        description="Words the name contains a word starting with, as typed",
+    ),
+    limit: int = Query(10, ge=1, le=schemas.SEARCH_LIMIT_MAX),
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Autocomplete exercise names the user has logged or templated"""
+    return search.search_exercise_names(db=db, user_id=user_id, text=q, limit=limit)
+
+
+# Analytics Endpoints
+@app.get(
+    "/analytics/exercises/{exercise_name}/progression",
+    response_model=schemas.ProgressionResponse,
+)
+def read_exercise_progression(
+    exercise_name: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    bucket: Literal["day", "week", "month"] = "day",
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Get volume, best set, e1RM and PRs over time for an exercise name"""
+    progression = analytics.get_progression(
+        db=db,
+        user_id=user_id,
+        exercise_name=exercise_name,
+        start=start,
+        end=end,
+        bucket=bucket,
+    )
+    if settings.fast_json:
+        return json_response(schemas.ProgressionResponse, progression)
+    return progression
+
+
+# Report Endpoints
+@app.post(
+    "/reports/",
+    response_model=schemas.ReportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_report(
+    report: schemas.ReportCreate,
+    response: Response,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Start building a weekly or monthly training report
+
+    The report is built in the background: poll `/reports/{job_id}` until its
+    status is `done`. Requesting a report again before the user's sets change
+    returns the same job, with status 200 once it is done.
+    """
+    if not crud.user_exists(db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    job = reports.submit_report(db=db, user_id=user_id, report=report)
+    response.headers["Location"] = f"/reports/{job.id}"
+    if job.status == reports.DONE:
+        response.status_code = status.HTTP_200_OK
+    return reports.job_response(job)
+
+
+@app.get("/reports/{job_id}", response_model=schemas.ReportJobResponse)
+def read_report(
+    job_id: int,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Get the status of a report job, and the report once it is done"""
+    job = reports.get_report_job(db=db, user_id=user_id, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return reports.job_response(job)
+
+
+# Export Endpoints
+@app.get(
+    "/export/workouts",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type in export.MEDIA_TYPES.values()}}
+    },
+)
+def export_workouts(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Stream every workout, exercise and set of the user as NDJSON or CSV
+
+    One row is written per set, in workout date order. The body is gzip encoded
+    when the request sends `Accept-Encoding: gzip`.
+    """
+    gzip = export.accepts_gzip(request.headers.get("accept-encoding"))
+    headers = {
+        "Content-Disposition": f'attachment; filename="workouts.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export.export_stream(
+            db.get_bind(), user_id, format, start=start, end=end, gzip=gzip
+        ),
+        media_type=export.MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+# Import Endpoints
+@app.post(
+    "/import/workouts",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def import_workouts(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user_id: int = Depends(get_user_id),
+    db: Session = Depends(get_user_db),
+):
+    """Import workouts, exercises and sets from an NDJSON or CSV upload
+
+    The body uses the row layout of `/export/workouts` and may be gzip encoded.
+    The response streams one NDJSON event per invalid row, a progress event
+    after each committed batch and a final `done` event with the totals.
+    """
+    if not await run_in_threadpool(crud.user_exists, db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    upload = await importer.spool(request.stream())
+    compressed = request.headers.get("content-encoding", "").lower() == "gzip"
+    events = importer.import_history(db.get_bind(), user_id, upload, format, compressed)
+    return StreamingResponse(
+        importer.ndjson_events(events), media_type="application/x-ndjson"
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Request and SQL metrics of this process in the Prometheus text format"""
+    if not settings.metrics:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -281,3 +1059,12 @@ def root():
         "docs": "/docs",
         "version": "1.0.0",
     }
+
+
+# Swap in the async handlers last so they replace the sync routes above
+if settings.async_db:
+    async_api.install(app)
+
+# Without a token there is no profiling middleware, so no per request cost
+if settings.profile_token:
+    profiling.install(app, profiling.Profiler.from_settings(settings))
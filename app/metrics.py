@@ -0,0 +1,258 @@
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+# ============================================================================
+# Request Metrics
+# ============================================================================
+# MetricsMiddleware times every HTTP request and labels it with the route
+# template (`/workouts/{workout_id}/tree`, never the raw path) so the number of
+# series stays fixed. SQL statements are timed by cursor events on the engine
+# and charged to the request running them through a context variable, which
+# Starlette copies into the threadpool that runs sync handlers. Figures are
+# kept per process and rendered in the Prometheus text format by `/metrics`.
+
+logger = logging.getLogger("uvicorn.error")
+
+# Seconds, the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestStats:
+    """SQL work done on behalf of one request"""
+
+    __slots__ = ("method", "route", "started", "statements", "db_time")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+
+    def server_timing(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        return (
+            f'db;dur={self.db_time * 1000:.3f};desc="{self.statements} statements", '
+            f"app;dur={elapsed * 1000:.3f}"
+        )
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        # Buckets are stored non-cumulative and summed when rendered
+        index = bisect_left(LATENCY_BUCKETS, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Per route counters, updated and rendered on the event loop"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight: Dict[Tuple[str, str], int] = {}
+        self.statements: Dict[Tuple[str, str], int] = {}
+        self.db_time: Dict[Tuple[str, str], float] = {}
+
+    def started(self, stats: RequestStats):
+        key = (stats.method, stats.route)
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def finished(self, stats: RequestStats, status: int):
+        key = (stats.method, stats.route)
+        self.in_flight[key] -= 1
+        request_key = key + (status,)
+        self.requests[request_key] = self.requests.get(request_key, 0) + 1
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(time.perf_counter() - stats.started)
+        self.statements[key] = self.statements.get(key, 0) + stats.statements
+        self.db_time[key] = self.db_time.get(key, 0.0) + stats.db_time
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(samples.items()):
+                lines.append(f"{name}{labels(*key)} {value}")
+
+        family(
+            "fitness_http_requests_total",
+            "counter",
+            "HTTP requests handled, by route template and status",
+            {(m, r, ("status", s)): n for (m, r, s), n in self.requests.items()},
+        )
+        family(
+            "fitness_http_requests_in_flight",
+            "gauge",
+            "HTTP requests currently being handled",
+            self.in_flight,
+        )
+        name = "fitness_http_request_duration_seconds"
+        lines.append(f"# HELP {name} HTTP request latency")
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                cumulative += count
+                le = labels(method, route, ("le", f"{bound}"))
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            le = labels(method, route, ("le", "+Inf"))
+            lines.append(f"{name}_bucket{le} {histogram.count}")
+            lines.append(f"{name}_sum{labels(method, route)} {histogram.total}")
+            lines.append(f"{name}_count{labels(method, route)} {histogram.count}")
+        family(
+            "fitness_db_statements_total",
+            "counter",
+            "SQL statements executed while handling requests",
+            self.statements,
+        )
+        family(
+            "fitness_db_duration_seconds_total",
+            "counter",
+            "Time spent executing SQL statements while handling requests",
+            self.db_time,
+        )
+        return "\n".join(lines) + "\n"
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(method: str, route: str, *extra: Tuple[str, object]) -> str:
+    pairs = [("method", method), ("route", route), *extra]
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in pairs) + "}"
+
+
+registry = Metrics()
+
+
+class RouteTable:
+    """Resolves request paths to route templates ahead of the router
+
+    Requests are counted as in flight against their route for their whole
+    duration, so the route is resolved before the app runs. Only the path
+    regex and methods of each route are checked, which is all the label needs
+    and a fraction of the cost of `Route.matches`. The table is rebuilt if the
+    app's route list is replaced, as `async_api.install` does.
+    """
+
+    def __init__(self):
+        self.source = None
+        self.routes = []
+
+    def match(self, scope):
+        """The route `scope` will be dispatched to, or when the path is only
+        served with other methods (a 405) the first such route, or None"""
+        routes = scope["app"].router.routes
+        if routes is not self.source:
+            self.source = routes
+            self.routes = [
+                (route.path_regex.match, getattr(route, "methods", None), route)
+                for route in routes
+                if hasattr(route, "path_regex")
+            ]
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        method, allowed = scope["method"], None
+        for match, methods, route in self.routes:
+            if match(path):
+                if methods is None or method in methods:
+                    return route
+                allowed = allowed or route
+        return allowed
+
+    def resolve(self, scope) -> str:
+        route = self.match(scope)
+        return UNMATCHED_ROUTE if route is None else route.path
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses pass through unbuffered"""
+
+    def __init__(self, app, metrics: Metrics = registry):
+        self.app = app
+        self.metrics = metrics
+        self.route_table = RouteTable()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope["method"], self.route_table.resolve(scope))
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        token = current_request.set(stats)
+        self.metrics.started(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.metrics.finished(stats, status)
+            current_request.reset(token)
+
+
+def instrument_engine(engine: Engine, slow_query_seconds: Optional[float] = None):
+    """Charge statements on `engine` to the current request and log the ones
+    taking at least `slow_query_seconds` (never, when None)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+        if slow_query_seconds is not None and elapsed >= slow_query_seconds:
+            route = f"{stats.method} {stats.route}" if stats else "no request"
+            logger.warning(
+                "Slow query (%.1f ms, %s): %s", elapsed * 1000, route, statement
+            )
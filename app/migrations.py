@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from app.database import foreign_keys_disabled
+
+# ============================================================================
+# Schema Migrations (Alembic)
+# ============================================================================
+ROOT = Path(__file__).resolve().parent.parent
+
+# Revision matching the tables the app created with create_all before it had
+# migrations; such databases are stamped with it instead of being recreated
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection=None) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.attributes["connection"] = connection
+    # Keep the application's logging setup when migrating from inside it
+    config.attributes["configure_logger"] = connection is None
+    return config
+
+
+def upgrade_database(engine: Engine, revision: str = "head"):
+    """Bring the schema of `engine` up to `revision`"""
+    with engine.connect() as connection, foreign_keys_disabled(connection):
+        with connection.begin():
+            config = alembic_config(connection)
+            tables = inspect(connection).get_table_names()
+            if tables and "alembic_version" not in tables:
+                command.stamp(config, BASELINE_REVISION)
+            command.upgrade(config, revision)
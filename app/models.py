@@ -1,27 +1,70 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Date,
+    DateTime,
+    ForeignKey,
+    Float,
+    Index,
+    LargeBinary,
+    func,
+)
+from sqlalchemy.orm import query_expression, relationship, synonym
 from app.database import Base
 
 
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True, index=True)
+    # schemas.UserBase exposes the name as `username`
+    username = synonym("name")
+    default_measurement = Column(String, nullable=False, default="lbs")
+    timezone = Column(String)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
 class WorkoutTemplate(Base):
     __tablename__ = "workout_templates"
+    # Every read is scoped to one user, see app.crud
+    __table_args__ = (Index("ix_workout_templates_user_id_id", "user_id", "id"),)
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, index=True)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", name="fk_workout_templates_user_id"),
+        nullable=False,
+    )
+    # Children are deleted by the database, see crud.delete_workout_template
     exercise_templates = relationship(
         "ExerciseTemplate",
         back_populates="workout_template",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
 class ExerciseTemplate(Base):
     __tablename__ = "exercise_templates"
+    __table_args__ = (
+        Index(
+            "ix_exercise_templates_workout_template_id_id", "workout_template_id", "id"
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, index=True)
     workout_template_id = Column(
-        Integer, ForeignKey("workout_templates.id"), nullable=False
+        Integer,
+        ForeignKey(
+            "workout_templates.id",
+            name="fk_exercise_templates_workout_template_id",
+            ondelete="CASCADE",
+        ),
+        nullable=False,
     )
     workout_template = relationship(
         "WorkoutTemplate", back_populates="exercise_templates"
@@ -30,30 +73,149 @@ class ExerciseTemplate(Base):
 
 class Workout(Base):
     __tablename__ = "workout"
+    # Workouts are listed per user, or per template, most recent first, see
+    # crud.get_workouts
+    __table_args__ = (
+        Index("ix_workout_user_id_date", "user_id", "date"),
+        Index("ix_workout_user_id_name", "user_id", "name"),
+        Index("ix_workout_workout_template_id_date", "workout_template_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False, index=True)
-    date = Column(Date, nullable=False, index=True)
+    name = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    user_id = Column(
+        Integer, ForeignKey("users.id", name="fk_workout_user_id"), nullable=False
+    )
+    workout_template_id = Column(
+        Integer,
+        ForeignKey(
+            "workout_templates.id",
+            name="fk_workout_workout_template_id",
+            ondelete="SET NULL",
+        ),
+    )
     exercises = relationship(
-        "Exercise", back_populates="workout", cascade="all, delete-orphan"
+        "Exercise",
+        back_populates="workout",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
 class Exercise(Base):
     __tablename__ = "exercises"
+    __table_args__ = (Index("ix_exercises_workout_id_id", "workout_id", "id"),)
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, index=True)
-    workout_id = Column(Integer, ForeignKey("workout.id"), nullable=False)
+    workout_id = Column(
+        Integer,
+        ForeignKey("workout.id", name="fk_exercises_workout_id", ondelete="CASCADE"),
+        nullable=False,
+    )
     workout = relationship("Workout", back_populates="exercises")
-    sets = relationship("Set", back_populates="exercise", cascade="all, delete-orphan")
+    sets = relationship(
+        "Set",
+        back_populates="exercise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class Set(Base):
     __tablename__ = "sets"
+    __table_args__ = (Index("ix_sets_exercise_id_id", "exercise_id", "id"),)
 
     id = Column(Integer, primary_key=True)
     reps = Column(Integer, nullable=False)
-    weight = Column(Float, nullable=False)
-    exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
+    weight_kg = Column(Float, nullable=False)
+    # `weight_kg` in the user's unit, filled by the app.units.set_weight option
+    weight = query_expression()
+    exercise_id = Column(
+        Integer,
+        ForeignKey("exercises.id", name="fk_sets_exercise_id", ondelete="CASCADE"),
+        nullable=False,
+    )
     exercise = relationship("Exercise", back_populates="sets")
+
+
+class ExerciseDailySummary(Base):
+    """Per user, exercise name and day aggregates, maintained by app.analytics"""
+
+    __tablename__ = "exercise_daily_summaries"
+    # Refreshed a whole day of one user at a time, see
+    # app.analytics.refresh_summaries
+    __table_args__ = (
+        Index("ix_exercise_daily_summaries_user_id_date", "user_id", "date"),
+    )
+
+    user_id = Column(Integer, primary_key=True)
+    name = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    set_count = Column(Integer, nullable=False)
+    total_reps = Column(Integer, nullable=False)
+    total_volume = Column(Float, nullable=False)
+    max_weight = Column(Float, nullable=False)
+    best_e1rm_epley = Column(Float, nullable=False)
+    best_e1rm_brzycki = Column(Float)
+    best_set_reps = Column(Integer, nullable=False)
+    best_set_weight = Column(Float, nullable=False)
+
+
+class ExerciseName(Base):
+    """Per user exercise names and how often they are used, indexed for search
+    and kept up to date by the SQLite triggers in app.search"""
+
+    __tablename__ = "exercise_names"
+    __table_args__ = (
+        Index("ix_exercise_names_user_id_name", "user_id", "name", unique=True),
+    )
+
+    # Stable rowid of the full-text index entry
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    name = Column(String, nullable=False)
+    exercise_count = Column(Integer, nullable=False, default=0)
+    template_count = Column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKey(Base):
+    """Responses of create requests, replayed to retries by app.idempotency"""
+
+    __tablename__ = "idempotency_keys"
+
+    # SHA-256 digests of the user and key, and of the request they were sent with
+    key = Column(LargeBinary, primary_key=True)
+    fingerprint = Column(LargeBinary, nullable=False)
+    # Null while the first request with the key is running
+    status_code = Column(Integer)
+    body = Column(LargeBinary)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class ReportJob(Base):
+    """Training reports requested by a user, built in worker processes by
+    app.reports"""
+
+    __tablename__ = "report_jobs"
+    __table_args__ = (Index("ix_report_jobs_user_id_id", "user_id", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", name="fk_report_jobs_user_id"), nullable=False
+    )
+    # "weekly" or "monthly", over the workouts dated `start` to `end`
+    kind = Column(String, nullable=False)
+    start = Column(Date)
+    end = Column(Date)
+    # pending, running, done or failed; unfinished jobs are resumed at startup
+    status = Column(String, nullable=False, index=True)
+    # JSON of schemas.Report once done, the error message once failed
+    report = Column(LargeBinary)
+    error = Column(String)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    # When a worker claimed the job; a job running for longer than
+    # REPORT_JOB_LEASE is taken to have lost its worker
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
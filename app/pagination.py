@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Column, and_, or_, true
+from sqlalchemy.orm import Query
+
+# ============================================================================
+# Keyset (cursor) pagination
+# ============================================================================
+# A cursor is the sort key of the last row on a page, JSON encoded and then
+# base64url encoded so clients treat it as opaque. The next page is fetched
+# with a `WHERE (key) > (cursor)` seek on the index instead of an OFFSET that
+# scans and discards every earlier row.
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplied cursor cannot be decoded"""
+
+
+def _to_json(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(column: Column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Column]) -> List:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def _seek(columns: Sequence[Column], values: Sequence, descending: bool):
+    """Lexicographic `(a, b) > (x, y)` written out so every backend can use it"""
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, beyond))
+    return or_(*clauses)
+
+
+def seek(columns: Sequence[Column], cursor: Optional[str], descending: bool = False):
+    """The condition `paginate` filters on for `cursor`, for queries that need
+    it elsewhere, such as in the ON clause of an outer join"""
+    if cursor is None:
+        return true()
+    return _seek(columns, decode_cursor(cursor, columns), descending)
+
+
+def paginate(
+    query: Query,
+    columns: Sequence[Column],
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    descending: bool = False,
+):
+    """Return `(rows, next_cursor)` for one page of `query` ordered by `columns`
+
+    `columns` must end in a unique column (normally the primary key) so the
+    ordering is total. `next_cursor` is None on the last page.
+    """
+    if cursor is not None:
+        query = query.filter(seek(columns, cursor, descending))
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
@@ -0,0 +1,328 @@
+import functools
+import inspect
+import random
+import secrets
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import FrameType
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from app.config import Settings
+from app.metrics import RouteTable
+
+# ============================================================================
+# Request Profiling (Opt-in With PROFILE_TOKEN)
+# ============================================================================
+# A background thread samples the Python stack of the thread running a
+# request's endpoint, the event loop for async handlers and a threadpool
+# worker for sync ones, and counts them as collapsed stacks (`outer;inner
+# count` lines, the input format of flamegraph.pl and speedscope). Stacks are
+# rooted at the endpoint function, so the thread counts towards the request
+# only while it is inside that route's handler.
+#
+# Every endpoint is called through `sampled_call`, wrapped in once when the
+# middleware is installed, which registers the thread and frame of the call
+# with the request's sampler, found in a context variable that the threadpool
+# inherits. Other requests running at the same time, in other workers or
+# interleaved on the event loop, are left out.
+#
+# A request sending the token in the X-Profile-Token header or the `profile`
+# query parameter is sampled every millisecond and its profile stored under
+# the id returned in X-Profile-Id. A PROFILE_SAMPLE_RATE fraction of all other
+# requests is sampled every PROFILE_INTERVAL_MS and merged into a profile per
+# route. Without a token the middleware is not installed at all.
+
+TOKEN_HEADER = "X-Profile-Token"
+TOKEN_QUERY = "profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+ON_DEMAND_INTERVAL = 0.001  # seconds
+STORED_PROFILES = 100
+CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+def frame_name(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class StackSampler:
+    """Counts the stacks of the request's calls into `code`, sampled every
+    `interval` seconds from a daemon thread while the sampler is entered"""
+
+    def __init__(self, code, interval: float):
+        self.code = code
+        self.interval = interval
+        self.stacks = Counter()
+        # Frame calling the endpoint, by the id of the thread it runs on
+        self.calls: Dict[int, FrameType] = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name="profile-sampler", daemon=True
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    @contextmanager
+    def calling(self, caller: FrameType):
+        """Sample the current thread while `caller` runs the endpoint"""
+        thread_id = threading.get_ident()
+        self.calls[thread_id] = caller
+        try:
+            yield
+        finally:
+            del self.calls[thread_id]
+
+    def run(self):
+        # A random first delay samples requests shorter than the interval in
+        # proportion to their length, instead of never
+        delay = random.uniform(0, self.interval)
+        while not self.stopped.wait(delay):
+            frames = sys._current_frames()
+            for thread_id, caller in list(self.calls.items()):
+                leaf = frames.get(thread_id)
+                if leaf is not None:
+                    self.sample(leaf, caller)
+            delay = self.interval
+
+    def sample(self, leaf, caller):
+        frame = leaf
+        while frame is not None and frame.f_code is not self.code:
+            frame = frame.f_back
+        if frame is None:
+            return
+        # On the event loop the endpoint may be running for another request
+        outer = frame.f_back
+        while outer is not None and outer is not caller:
+            outer = outer.f_back
+        if outer is None:
+            return
+        names = []
+        while leaf is not frame:
+            names.append(frame_name(leaf))
+            leaf = leaf.f_back
+        names.append(frame_name(frame))
+        self.stacks[";".join(reversed(names))] += 1
+
+
+# Sampler of the request being run, if it is sampled
+current_sampler: ContextVar[Optional[StackSampler]] = ContextVar(
+    "current_sampler", default=None
+)
+
+
+def sampled_call(call):
+    """`call` registering the thread it runs on with the request's sampler"""
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def call_sampled(*args, **kwargs):
+            sampler = current_sampler.get()
+            if sampler is None:
+                return await call(*args, **kwargs)
+            with sampler.calling(sys._getframe()):
+                return await call(*args, **kwargs)
+
+    else:
+
+        @functools.wraps(call)
+        def call_sampled(*args, **kwargs):
+            sampler = current_sampler.get()
+            if sampler is None:
+                return call(*args, **kwargs)
+            with sampler.calling(sys._getframe()):
+                return call(*args, **kwargs)
+
+    call_sampled.sampled = True
+    return call_sampled
+
+
+class Profiler:
+    """Stored on-demand profiles and the per route continuous profiles"""
+
+    def __init__(self, token: str, sample_rate: float = 0.0, interval: float = 0.01):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.route_table = RouteTable()
+        self.clear()
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "Profiler":
+        return cls(
+            config.profile_token,
+            config.profile_sample_rate,
+            config.profile_interval_ms / 1000,
+        )
+
+    def clear(self):
+        self.profiles: "OrderedDict[str, str]" = OrderedDict()
+        self.routes: Dict[Tuple[str, str], Counter] = {}
+        self.route_requests: Dict[Tuple[str, str], int] = {}
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return token is not None and secrets.compare_digest(
+            token.encode(), self.token.encode()
+        )
+
+    def requested(self, scope) -> bool:
+        """Whether the request asks to be profiled with a valid token"""
+        for name, value in scope["headers"]:
+            if name == b"x-profile-token":
+                return self.authorized(value.decode("latin-1"))
+        query = scope.get("query_string", b"")
+        if b"profile=" in query:
+            values = parse_qs(query.decode("latin-1")).get(TOKEN_QUERY, [])
+            return any(self.authorized(value) for value in values)
+        return False
+
+    def store(self, profile_id: str, stacks: Counter):
+        self.profiles[profile_id] = collapsed(stacks)
+        while len(self.profiles) > STORED_PROFILES:
+            self.profiles.popitem(last=False)
+
+    def merge(self, method: str, route: str, stacks: Counter):
+        key = (method, route)
+        self.routes.setdefault(key, Counter()).update(stacks)
+        self.route_requests[key] = self.route_requests.get(key, 0) + 1
+
+
+class ProfilingMiddleware:
+    """Runs profiled and sampled requests under a StackSampler"""
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profiler = self.profiler
+        on_demand = profiler.requested(scope)
+        if not on_demand and not (
+            profiler.sample_rate and random.random() < profiler.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+        route = profiler.route_table.match(scope)
+        endpoint = inspect.unwrap(getattr(route, "endpoint", None))
+        code = getattr(endpoint, "__code__", None)
+        if code is None or not (isinstance(route, APIRoute) and sampled(route)):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex if on_demand else None
+
+        async def send_with_id(message):
+            if profile_id and message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        interval = ON_DEMAND_INTERVAL if on_demand else profiler.interval
+        with StackSampler(code, interval) as sampler:
+            token = current_sampler.set(sampler)
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                current_sampler.reset(token)
+        if on_demand:
+            profiler.store(profile_id, sampler.stacks)
+        else:
+            profiler.merge(scope["method"], route.path, sampler.stacks)
+
+
+# ============================================================================
+# Profile Endpoints (Require The Token)
+# ============================================================================
+router = APIRouter(prefix="/debug/profiles", include_in_schema=False)
+
+
+async def get_profiler(
+    request: Request, token: Optional[str] = Header(None, alias=TOKEN_HEADER)
+) -> Profiler:
+    profiler = request.app.state.profiler
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+    return profiler
+
+
+@router.get("")
+async def list_profiles(profiler: Profiler = Depends(get_profiler)):
+    """Stored profile ids, oldest first, and the routes sampled so far"""
+    return {
+        "profiles": list(profiler.profiles),
+        "routes": [
+            {
+                "method": method,
+                "route": route,
+                "requests": profiler.route_requests[(method, route)],
+                "samples": sum(stacks.values()),
+            }
+            for (method, route), stacks in sorted(profiler.routes.items())
+        ],
+    }
+
+
+@router.get("/route", response_class=PlainTextResponse)
+async def read_route_profile(
+    route: str, method: str = "GET", profiler: Profiler = Depends(get_profiler)
+):
+    """Collapsed stacks merged over every sampled request to a route"""
+    stacks = profiler.routes.get((method.upper(), route))
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="Route not sampled")
+    return PlainTextResponse(collapsed(stacks), media_type=CONTENT_TYPE)
+
+
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+async def read_profile(profile_id: str, profiler: Profiler = Depends(get_profiler)):
+    """Collapsed stacks of one on-demand profiled request"""
+    profile = profiler.profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile, media_type=CONTENT_TYPE)
+
+
+def sampled(route: APIRoute) -> bool:
+    return getattr(route.dependant.call, "sampled", False)
+
+
+def sample_endpoints(app: FastAPI):
+    """Call the endpoint of every route of `app` through `sampled_call`
+
+    FastAPI calls the endpoint through the route's dependant and caches what it
+    derives from the call, so it is wrapped before the first request.
+    """
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not sampled(route):
+            route.dependant.call = sampled_call(route.dependant.call)
+
+
+def install(app: FastAPI, profiler: Profiler):
+    """Add the profiling middleware and the /debug/profiles endpoints
+
+    Routes added to `app` afterwards are not profiled.
+    """
+    app.state.profiler = profiler
+    sample_endpoints(app)
+    app.include_router(router)
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
@@ -0,0 +1,341 @@
+import logging
+import multiprocessing
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app import analytics, cache, crud, models, schemas, units
+from app.config import settings
+from app.database import create_db_engine
+from app.serialization import dump_json
+
+logger = logging.getLogger("uvicorn.error")
+
+# ============================================================================
+# Training Reports (Built In Worker Processes)
+# ============================================================================
+# A weekly or monthly report sums every set of the requested range, which is
+# too much work for a request handler. Submitting one inserts a `report_jobs`
+# row and hands its id to a process pool; the worker claims the row, reads the
+# sets in two grouped queries and stores the report as JSON, and the client
+# polls the row. Jobs left pending by a stopped server are resumed when a
+# server starts, as are jobs running for longer than REPORT_JOB_LEASE seconds,
+# whose worker is taken to be gone; jobs other servers' live workers are still
+# building are left to them.
+#
+# The job of a report is remembered under a key of the user's data generation,
+# see app.cache, so the same report is served from its job until the user's
+# sets change. A failed job is not reused.
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+BUCKETS = {"weekly": "week", "monthly": "month"}
+
+# Exercises are grouped by the words of their names. The first group with a
+# matching word wins, so "Leg Curl" trains the legs and "Curl" the arms.
+MUSCLE_GROUPS = [
+    ("shoulders", ["overhead press", "shoulder press", "military press", "raise"]),
+    ("chest", ["bench", "chest", "fly", "flye", "dip", "push up", "pec"]),
+    ("legs", ["squat", "lunge", "leg", "calf", "hip thrust", "glute", "step up"]),
+    ("back", ["deadlift", "row", "pull", "pullover", "chin", "lat", "shrug"]),
+    ("arms", ["curl", "tricep", "extension", "pushdown", "skull crusher"]),
+    ("core", ["plank", "crunch", "sit up", "ab", "core"]),
+]
+OTHER_GROUP = "other"
+_MUSCLE_PATTERNS = [
+    (re.compile(r"\b(?:" + "|".join(words) + r")\b"), group)
+    for group, words in MUSCLE_GROUPS
+]
+
+
+def muscle_group(exercise_name: str) -> str:
+    name = re.sub(r"[\W_]+", " ", exercise_name.lower())
+    for pattern, group in _MUSCLE_PATTERNS:
+        if pattern.search(name):
+            return group
+    return OTHER_GROUP
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# ============================================================================
+# Report Queries (Run By The Workers)
+# ============================================================================
+def build_report(
+    db: Session,
+    user_id: int,
+    kind: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> dict:
+    """Volume per muscle group, tonnage and session frequency per week or month
+
+    Two statements read the range through the workout (user_id, date) index:
+    set totals per period and exercise name, and the workouts and days per
+    period. Exercise names are then folded into their muscle groups. Weights
+    are in the user's unit.
+    """
+    w, e, s = models.Workout, models.Exercise, models.Set
+    period = analytics.date_bucket(db, w.date, BUCKETS[kind]).label("period")
+    criteria = [w.user_id == user_id]
+    if start is not None:
+        criteria.append(w.date >= start)
+    if end is not None:
+        criteria.append(w.date <= end)
+
+    by_name = db.execute(
+        select(
+            period,
+            e.name,
+            func.count(s.id).label("set_count"),
+            func.sum(s.reps).label("total_reps"),
+            units.to_user_unit(func.sum(s.reps * s.weight_kg), user_id).label(
+                "total_volume"
+            ),
+        )
+        .join(e, e.workout_id == w.id)
+        .join(s, s.exercise_id == e.id)
+        .where(*criteria)
+        .group_by(period, e.name)
+    ).all()
+    frequency = db.execute(
+        select(
+            period,
+            func.count(w.id.distinct()).label("sessions"),
+            func.count(w.date.distinct()).label("training_days"),
+        )
+        .join(e, e.workout_id == w.id)
+        .where(*criteria, select(s.id).where(s.exercise_id == e.id).exists())
+        .group_by(period)
+    ).all()
+
+    periods = {
+        row.period: {
+            "period": row.period,
+            "sessions": row.sessions,
+            "training_days": row.training_days,
+            "set_count": 0,
+            "total_reps": 0,
+            "tonnage": 0.0,
+            "muscle_groups": {},
+        }
+        for row in frequency
+    }
+    for row in by_name:
+        point = periods[row.period]
+        point["set_count"] += row.set_count
+        point["total_reps"] += row.total_reps
+        point["tonnage"] += row.total_volume
+        group = point["muscle_groups"].setdefault(
+            muscle_group(row.name),
+            {"set_count": 0, "total_reps": 0, "total_volume": 0.0},
+        )
+        group["set_count"] += row.set_count
+        group["total_reps"] += row.total_reps
+        group["total_volume"] += row.total_volume
+
+    points = []
+    previous = None
+    for key in sorted(periods):
+        point = periods[key]
+        point["tonnage"] = round(point["tonnage"], units.WEIGHT_DECIMALS)
+        if previous:
+            point["tonnage_change"] = round(point["tonnage"] / previous - 1, 4)
+        previous = point["tonnage"]
+        groups = sorted(
+            point["muscle_groups"].items(), key=lambda item: -item[1]["total_volume"]
+        )
+        point["muscle_groups"] = [
+            {
+                "muscle_group": name,
+                **totals,
+                "total_volume": round(totals["total_volume"], units.WEIGHT_DECIMALS),
+            }
+            for name, totals in groups
+        ]
+        points.append(point)
+    return {"kind": kind, "periods": points}
+
+
+# Engines of the databases a worker process has built reports for
+_engines: Dict[str, Engine] = {}
+
+
+def worker_engine(url: str) -> Engine:
+    if url not in _engines:
+        _engines[url] = create_db_engine(url, settings)
+    return _engines[url]
+
+
+def run_job(url: str, job_id: int):
+    """Build the report of a pending job, in a worker process
+
+    The job is claimed by moving it to running, so a job submitted twice, e.g.
+    when resumed by two servers, is only built once.
+    """
+    job = models.ReportJob
+    with Session(worker_engine(url)) as db:
+        claimed = db.execute(
+            update(job)
+            .where(job.id == job_id, job.status == PENDING)
+            .values(status=RUNNING, started_at=utcnow())
+            .returning(job.user_id, job.kind, job.start, job.end)
+        ).one_or_none()
+        db.commit()
+        if claimed is None:
+            return
+        try:
+            report = build_report(db, *claimed)
+            values = {"status": DONE, "report": dump_json(schemas.Report, report)}
+        except Exception as exc:
+            logger.exception("Report job %s failed", job_id)
+            db.rollback()
+            values = {"status": FAILED, "error": str(exc) or type(exc).__name__}
+        db.execute(
+            update(job).where(job.id == job_id).values(finished_at=utcnow(), **values)
+        )
+        db.commit()
+
+
+# ============================================================================
+# Worker Pool
+# ============================================================================
+class ReportWorker:
+    """Process pool running `run_job`, started when the first job is submitted
+
+    Workers are spawned rather than forked, so they do not inherit the
+    server's threads, locks or open connections.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def submit(self, url: str, job_id: int) -> Future:
+        executor = self.executor()
+        try:
+            future = executor.submit(run_job, url, job_id)
+        except BrokenProcessPool:
+            # A worker died, e.g. killed for its memory; start a new pool
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            future = self.executor().submit(run_job, url, job_id)
+        future.add_done_callback(log_failure)
+        return future
+
+    def shutdown(self):
+        """Stop the workers; queued jobs stay pending and resume at startup"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def log_failure(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Report worker failed", exc_info=future.exception())
+
+
+worker = ReportWorker(settings.report_workers)
+
+
+# ============================================================================
+# Jobs (Run By The API)
+# ============================================================================
+def database_url(db: Session) -> str:
+    """URL for the workers to open the database `db` is bound to"""
+    return db.get_bind().url.render_as_string(hide_password=False)
+
+
+def get_report_job(db: Session, user_id: int, job_id: int):
+    return db.scalars(
+        select(models.ReportJob).where(
+            models.ReportJob.id == job_id, models.ReportJob.user_id == user_id
+        )
+    ).one_or_none()
+
+
+def submit_report(db: Session, user_id: int, report: schemas.ReportCreate):
+    """The job building `report`, reusing the job of the same report while
+    the user's data is unchanged and it has not failed"""
+    key = cache.report_key(user_id, report.kind, report.start, report.end)
+    job_id = cache.report_cache.get(key)
+    if job_id is not None:
+        job = get_report_job(db, user_id, int(job_id))
+        if job is not None and job.status != FAILED:
+            return job
+    job = db.scalars(
+        insert(models.ReportJob)
+        .values(
+            user_id=user_id,
+            kind=report.kind,
+            start=report.start,
+            end=report.end,
+            status=PENDING,
+        )
+        .returning(models.ReportJob)
+    ).one()
+    crud.commit_returning(db, job)
+    cache.report_cache.set(key, str(job.id).encode(), settings.report_cache_ttl)
+    worker.submit(database_url(db), job.id)
+    return job
+
+
+def resume_report_jobs(db: Session) -> int:
+    """Submit again the jobs a stopped server left unfinished
+
+    Pending jobs may also be queued by a live server; the worker that claims
+    one first builds it and the others find it claimed.
+    """
+    job = models.ReportJob
+    stale = utcnow() - timedelta(seconds=settings.report_job_lease)
+    db.execute(
+        update(job)
+        .where(
+            job.status == RUNNING,
+            # Jobs claimed before started_at was recorded
+            or_(job.started_at.is_(None), job.started_at < stale),
+        )
+        .values(status=PENDING)
+    )
+    db.commit()
+    job_ids = db.scalars(select(job.id).where(job.status == PENDING)).all()
+    for job_id in job_ids:
+        worker.submit(database_url(db), job_id)
+    return len(job_ids)
+
+
+def job_response(job: models.ReportJob) -> dict:
+    """`job` as a schemas.ReportJobResponse, with its stored report"""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "start": job.start,
+        "end": job.end,
+        "status": job.status,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "error": job.error,
+        "report": (
+            None
+            if job.report is None
+            else schemas.Report.model_validate_json(job.report)
+        ),
+    }
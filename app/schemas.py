@@ -1,22 +1,44 @@
 from pydantic import Field, BaseModel, model_validator
-from datetime import datetime
-from typing import List, Optional, Literal
+from datetime import date, datetime
+from typing import Generic, List, Optional, Literal, TypeVar
 
 # ============================================================================
 # Constants
 # ============================================================================
 
 USERNAME_MAX = 24
+PAGE_LIMIT_MAX = 500
+# Sets one bulk update may change, keeping its statement well under SQLite's
+# bound parameter limit
+SETS_UPDATE_MAX = 100
+SEARCH_LIMIT_MAX = 50
+REPORT_KINDS = Literal["weekly", "monthly"]
+REPORT_STATUSES = Literal["pending", "running", "done", "failed"]
+
+T = TypeVar("T")
 
 
 # TODO: Export to a seperate models folder when refactoring
 def validate_any_field(self):
-    """Reusable logic for Pydantic model_validators"""
-    if not self.model_dump(exclude_none=True):
+    """Reusable logic for Pydantic model_validators
+
+    An `id` names the row a bulk update changes, so it does not count.
+    """
+    if not self.model_dump(exclude_none=True, exclude={"id"}):
         raise ValueError("At least one field must be updated")
     return self
 
 
+# ============================================================================
+# Pagination Schemas
+# ============================================================================
+class Page(BaseModel, Generic[T]):
+    items: List[T] = Field(description="The rows on this page")
+    next_cursor: Optional[str] = Field(
+        None, description="Opaque cursor for the next page, null on the last page"
+    )
+
+
 # ============================================================================
 # User Schemas
 # ============================================================================
@@ -25,7 +47,7 @@ class UserBase(BaseModel):
         description="Name of the user", alias="username", max_length=USERNAME_MAX
     )
     default_measurement: Optional[Literal["lbs", "kgs"]] = Field(
-        "lbs", description="The default measurement unit for the user"
+        "lbs", description="The unit the user's set weights are entered and shown in"
     )
     timezone: Optional[str] = Field(
         None, description="IANA timezone name, e.g America/Los_Angeles"
@@ -47,8 +69,10 @@ class UserResponse(UserBase):
 
 
 class UserUpdate(BaseModel):
-    name: Optional[str] = Field(None, description="The name of the user to update")
-    default_measurement: Optional[Literal["lbs", "kg"]] = Field(
+    name: Optional[str] = Field(
+        None, description="The name of the user to update", max_length=USERNAME_MAX
+    )
+    default_measurement: Optional[Literal["lbs", "kgs"]] = Field(
         None, description="The default measurement unit of the user to update to"
     )
     timezone: Optional[str] = Field(
@@ -71,7 +95,9 @@ class UserUpdate(BaseModel):
 # ============================================================================
 class SetBase(BaseModel):
     reps: int = Field(gt=0, description="The number of reps in the set")
-    weight: float = Field(ge=0, description="The weight of each rep")
+    weight: float = Field(
+        ge=0, description="The weight of each rep, in the user's default_measurement"
+    )
 
 
 class SetCreate(SetBase):
@@ -97,6 +123,10 @@ class SetUpdate(BaseModel):
     _validate = model_validator(mode="after")(validate_any_field)
 
 
+class SetBulkUpdate(SetUpdate):
+    id: int = Field(description="The ID of the set to update")
+
+
 # ============================================================================
 # Exercise Schemas (Exercises in Workouts - Has Sets)
 # ============================================================================
@@ -133,6 +163,9 @@ class WorkoutBase(BaseModel):
     date: Optional[datetime] = Field(
         datetime.now(), decription="Date and time of the workout"
     )
+    workout_template_id: Optional[int] = Field(
+        None, description="ID of the workout template the workout was started from"
+    )
 
 
 class WorkoutCreate(WorkoutBase):
@@ -147,6 +180,27 @@ class WorkoutResponse(WorkoutBase):
         from_attributes = True
 
 
+class WorkoutSummaryResponse(WorkoutBase):
+    id: int = Field(description="The ID of the workout being returned")
+
+    class Config:
+        from_attributes = True
+
+
+class WorkoutListItemResponse(WorkoutSummaryResponse):
+    exercise_count: Optional[int] = Field(
+        None, description="Number of exercises, null unless stats were requested"
+    )
+    set_count: Optional[int] = Field(
+        None, description="Number of sets, null unless stats were requested"
+    )
+    total_volume: Optional[float] = Field(
+        None,
+        description="Sum of reps x weight over all sets, null unless stats were "
+        "requested",
+    )
+
+
 class WorkoutUpdate(BaseModel):
     name: Optional[str] = Field(None, description="Name of the workout to update")
     date: Optional[datetime] = Field(
@@ -156,6 +210,64 @@ class WorkoutUpdate(BaseModel):
     _validate = model_validator(mode="after")(validate_any_field)
 
 
+class WorkoutsDeleted(BaseModel):
+    deleted: int = Field(description="Number of workouts deleted")
+
+
+# ============================================================================
+# Workout Log Schemas (A Full Workout Tree Written In One Request)
+# ============================================================================
+class ExerciseLogCreate(ExerciseCreate):
+    sets: List[SetCreate] = Field(
+        default_factory=list, description="Sets performed for this exercise"
+    )
+
+
+class WorkoutLogCreate(WorkoutCreate):
+    date: datetime = Field(
+        default_factory=datetime.now, description="Date and time of the workout"
+    )
+    exercises: List[ExerciseLogCreate] = Field(
+        default_factory=list, description="Exercises performed in this workout"
+    )
+
+
+# ============================================================================
+# Workout Start Schemas (A Workout Created From A Workout Template)
+# ============================================================================
+class WorkoutStart(BaseModel):
+    name: Optional[str] = Field(
+        None, description="Name of the workout, defaults to the template's name"
+    )
+    date: datetime = Field(
+        default_factory=datetime.now, description="Date and time of the workout"
+    )
+    prefill: bool = Field(
+        False,
+        description="Return the sets of the template's last session as targets",
+    )
+
+
+class StartedExerciseResponse(ExerciseResponse):
+    targets: List[SetBase] = Field(
+        default_factory=list,
+        description="Sets logged for this exercise in the template's last session",
+    )
+
+
+class StartedWorkoutResponse(WorkoutResponse):
+    exercises: List[StartedExerciseResponse] = Field(
+        default_factory=list, description="One exercise per exercise template"
+    )
+
+
+# ============================================================================
+# Workout Import Schemas (Imported History Must Be Dated)
+# ============================================================================
+class WorkoutImport(WorkoutCreate):
+    date: datetime = Field(description="Date and time of the workout")
+
+
 # ============================================================================
 # Exercise Template Schemas (Exercise Templates in Workout Templates)
 # ============================================================================
@@ -205,3 +317,105 @@ class WorkoutTemplateResponse(WorkoutTemplateBase):
 
 class WorkoutTemplateUpdate(BaseModel):
     name: str = Field(description="Name of the workout template to update")
+
+
+# ============================================================================
+# Exercise Name Search Schemas (Autocomplete)
+# ============================================================================
+class ExerciseNameResponse(BaseModel):
+    name: str = Field(description="Name of the exercise or exercise template")
+    exercise_count: int = Field(description="Number of exercises with the name")
+    template_count: int = Field(
+        description="Number of exercise templates with the name"
+    )
+
+    class Config:
+        from_attributes = True
+
+
+# ============================================================================
+# Analytics Schemas (Exercise Progression Over Time)
+# ============================================================================
+class BestSet(BaseModel):
+    reps: int = Field(description="Reps of the set with the highest e1RM")
+    weight: float = Field(description="Weight of the set with the highest e1RM")
+
+
+class ProgressionPoint(BaseModel):
+    period: date = Field(description="First day of the day, week or month bucket")
+    set_count: int = Field(description="Number of sets logged in the bucket")
+    total_reps: int = Field(description="Sum of reps over all sets")
+    total_volume: float = Field(description="Sum of reps x weight over all sets")
+    max_weight: float = Field(description="Heaviest weight lifted")
+    e1rm_epley: float = Field(description="Best estimated 1RM using Epley")
+    e1rm_brzycki: Optional[float] = Field(
+        None, description="Best estimated 1RM using Brzycki, null above 36 reps"
+    )
+    best_set: BestSet = Field(description="The set with the highest Epley e1RM")
+    is_pr: bool = Field(description="Whether the e1RM beats every earlier bucket")
+
+
+class ProgressionResponse(BaseModel):
+    exercise_name: str = Field(description="Name of the exercise")
+    bucket: Literal["day", "week", "month"] = Field(
+        description="Size of each time bucket"
+    )
+    points: List[ProgressionPoint] = Field(
+        default_factory=list, description="One point per bucket, oldest first"
+    )
+
+
+# ============================================================================
+# Report Schemas (Training Reports Built In The Background)
+# ============================================================================
+class ReportCreate(BaseModel):
+    kind: REPORT_KINDS = Field(description="Summarize each week or each month")
+    start: Optional[date] = Field(None, description="First workout date included")
+    end: Optional[date] = Field(None, description="Last workout date included")
+
+    @model_validator(mode="after")
+    def validate_range(self):
+        if self.start is not None and self.end is not None and self.start > self.end:
+            raise ValueError("start must not be after end")
+        return self
+
+
+class MuscleGroupVolume(BaseModel):
+    muscle_group: str = Field(description="Muscle group the exercise names train")
+    set_count: int = Field(description="Number of sets logged for the group")
+    total_reps: int = Field(description="Sum of reps over the group's sets")
+    total_volume: float = Field(description="Sum of reps x weight over its sets")
+
+
+class ReportPeriod(BaseModel):
+    period: date = Field(description="First day of the week or month")
+    sessions: int = Field(description="Workouts with at least one set logged")
+    training_days: int = Field(description="Days with at least one set logged")
+    set_count: int = Field(description="Number of sets logged")
+    total_reps: int = Field(description="Sum of reps over all sets")
+    tonnage: float = Field(description="Sum of reps x weight over all sets")
+    tonnage_change: Optional[float] = Field(
+        None, description="Tonnage relative to the previous period, e.g. 0.1 for +10%"
+    )
+    muscle_groups: List[MuscleGroupVolume] = Field(
+        default_factory=list, description="Volume per muscle group, largest first"
+    )
+
+
+class Report(BaseModel):
+    kind: REPORT_KINDS = Field(description="Size of each period")
+    periods: List[ReportPeriod] = Field(
+        default_factory=list, description="Periods with sets logged, oldest first"
+    )
+
+
+class ReportJobResponse(BaseModel):
+    id: int
+    kind: REPORT_KINDS
+    start: Optional[date] = None
+    end: Optional[date] = None
+    status: REPORT_STATUSES = Field(description="The report is set once done")
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = Field(None, description="Why the job failed")
+    report: Optional[Report] = None
@@ -0,0 +1,223 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import column, event, func, literal, literal_column, select, table
+from sqlalchemy import union_all
+from sqlalchemy.orm import Session
+from app import models
+from app.database import Base
+
+# ============================================================================
+# Exercise Name Search (SQLite FTS5)
+# ============================================================================
+# Every name a user has given an exercise or exercise template is one
+# `exercise_names` row, counting how often it is used. Triggers on the exercise
+# and template tables keep the counts as rows are inserted, renamed and
+# deleted, and a contentless FTS5 table indexes the names, so a prefix query
+# reads a few index pages instead of every exercise the lifter has logged.
+#
+# Each word is indexed prefixed with its user, "Bench Press" of user 7 as
+# "u7xbench u7xpress", so a query only merges the entries of that user's
+# names rather than those of every user with a word of the same prefix.
+#
+# SQLite runs ON DELETE CASCADE after the parent row is gone, so the children
+# of a deleted workout or template are counted off by a BEFORE DELETE trigger
+# on the parent; the child's own trigger no longer finds its user and does
+# nothing. Batch migrations that recreate one of these tables drop its
+# triggers, and have to create them again.
+#
+# Other databases have no FTS5: the name index is not maintained there and the
+# search falls back to matching the exercise tables directly.
+#
+# Trigger and FTS5 DDL takes no bound parameters, so it is formatted, but only
+# from the table and column names of this module; those statements are marked
+# `nosec B608`. The text a user searches for is always bound, see
+# `search_exercise_names`.
+
+SEARCH_TABLE = "exercise_names_fts"
+# Punctuation between the words of a name, indexed as a space
+SEPARATORS = "-/().,'&+:_"
+TOKEN = re.compile(r"[^\W_]+")
+
+# (table, parent table, foreign key to the parent, counter of exercise_names)
+NAMED_TABLES = [
+    ("exercises", "workout", "workout_id", "exercise_count"),
+    (
+        "exercise_templates",
+        "workout_templates",
+        "workout_template_id",
+        "template_count",
+    ),
+]
+
+
+def user_prefix(user_id: int) -> str:
+    return f"u{user_id}x"
+
+
+def indexed_terms(row: str) -> str:
+    """SQL expression for the indexed text of the exercise_names `row`"""
+    name = f"{row}.name"
+    for separator in SEPARATORS:
+        quoted = separator.replace("'", "''")
+        name = f"replace({name}, '{quoted}', ' ')"
+    prefix = f"'u' || {row}.user_id || 'x'"
+    return f"{prefix} || replace({name}, ' ', ' ' || {prefix})"
+
+
+def name_count_triggers(name_table, parent, parent_key, counter) -> List[str]:
+    """Triggers adding and removing the names of `name_table` rows"""
+    owner = (
+        f"(SELECT user_id FROM {parent} "
+        f"WHERE id = OLD.{parent_key})"  # nosec B608
+    )
+    counts = {"exercise_count": 0, "template_count": 0, counter: 1}
+    add = f"""
+        INSERT INTO exercise_names (user_id, name, exercise_count, template_count)
+        SELECT user_id, NEW.name, {counts["exercise_count"]},
+            {counts["template_count"]}
+        FROM {parent} WHERE id = NEW.{parent_key}
+        ON CONFLICT (user_id, name) DO UPDATE SET {counter} = {counter} + 1;
+    """  # nosec B608
+    remove = f"""
+        UPDATE exercise_names SET {counter} = {counter} - 1
+        WHERE user_id = {owner} AND name = OLD.name;
+        DELETE FROM exercise_names
+        WHERE user_id = {owner} AND name = OLD.name
+            AND exercise_count = 0 AND template_count = 0;
+    """  # nosec B608
+    children = f"FROM {name_table} WHERE {parent_key} = OLD.id"
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {name_table}_names_insert
+        AFTER INSERT ON {name_table} BEGIN {add} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {name_table}_names_update
+        AFTER UPDATE OF name, {parent_key} ON {name_table}
+        WHEN OLD.name IS NOT NEW.name OR OLD.{parent_key} IS NOT NEW.{parent_key}
+        BEGIN {remove} {add} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {name_table}_names_delete
+        AFTER DELETE ON {name_table} BEGIN {remove} END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {parent}_names_delete
+        BEFORE DELETE ON {parent} BEGIN
+            UPDATE exercise_names SET {counter} = {counter} - (
+                SELECT count(*) {children} AND name = exercise_names.name
+            )
+            WHERE user_id = OLD.user_id AND name IN (SELECT name {children});
+            DELETE FROM exercise_names
+            WHERE user_id = OLD.user_id AND name IN (SELECT name {children})
+                AND exercise_count = 0 AND template_count = 0;
+        END
+        """,  # nosec B608
+    ]
+
+
+INDEX_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE}
+    USING fts5(terms, content='')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS exercise_names_fts_insert
+    AFTER INSERT ON exercise_names BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, terms)
+        VALUES (NEW.id, {indexed_terms("NEW")});
+    END
+    """,  # nosec B608
+    f"""
+    CREATE TRIGGER IF NOT EXISTS exercise_names_fts_delete
+    AFTER DELETE ON exercise_names BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, terms)
+        VALUES ('delete', OLD.id, {indexed_terms("OLD")});
+    END
+    """,  # nosec B608
+]
+SEARCH_DDL = INDEX_DDL + [
+    statement for named in NAMED_TABLES for statement in name_count_triggers(*named)
+]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw):
+    """Build the index and its triggers along with the tables of create_all"""
+    if connection.dialect.name == "sqlite":
+        for statement in SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Alembic filter leaving out the FTS5 table and its shadow tables, which
+    migrations create by hand"""
+    return not (type_ == "table" and name.startswith(SEARCH_TABLE))
+
+
+# ============================================================================
+# Search Queries
+# ============================================================================
+def match_query(user_id: int, text: str) -> Optional[str]:
+    """FTS5 query for the user's names with a word starting with each word of
+    `text`, or None when it has no words
+
+    Words are quoted, so FTS5 operators in `text` are matched literally.
+    """
+    words = TOKEN.findall(text.lower())
+    if not words:
+        return None
+    prefix = user_prefix(user_id)
+    return " AND ".join(f'"{prefix}{word}"*' for word in words)
+
+
+def search_exercise_names(db: Session, user_id: int, text: str, limit: int = 10):
+    """The user's exercise names matching `text` as you type, most used first
+
+    Each word of `text` must start a word of the name, so "be pr" finds "Bench
+    Press". Names used equally often are ordered by their bm25 relevance.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return search_exercise_tables(db, user_id, text, limit)
+    query = match_query(user_id, text)
+    if query is None:
+        return []
+    names = models.ExerciseName
+    index = table(SEARCH_TABLE, column("rowid"), column("rank"))
+    return db.execute(
+        select(names.name, names.exercise_count, names.template_count)
+        .join(index, index.c.rowid == names.id)
+        .where(literal_column(SEARCH_TABLE).op("MATCH")(query))
+        .order_by((names.exercise_count + names.template_count).desc(), index.c.rank)
+        .limit(limit)
+    ).all()
+
+
+def search_exercise_tables(db: Session, user_id: int, text: str, limit: int):
+    """`search_exercise_names` without the index: names containing each word"""
+    words = TOKEN.findall(text.lower())
+    if not words:
+        return []
+    e, w = models.Exercise, models.Workout
+    et, wt = models.ExerciseTemplate, models.WorkoutTemplate
+    uses = union_all(
+        select(
+            e.name.label("name"),
+            literal(1).label("exercise"),
+            literal(0).label("template"),
+        )
+        .join(w, e.workout_id == w.id)
+        .where(w.user_id == user_id, *[e.name.icontains(word) for word in words]),
+        select(et.name, literal(0), literal(1))
+        .join(wt, et.workout_template_id == wt.id)
+        .where(wt.user_id == user_id, *[et.name.icontains(word) for word in words]),
+    ).subquery()
+    exercise_count = func.sum(uses.c.exercise).label("exercise_count")
+    template_count = func.sum(uses.c.template).label("template_count")
+    return db.execute(
+        select(uses.c.name, exercise_count, template_count)
+        .group_by(uses.c.name)
+        .order_by((exercise_count + template_count).desc(), uses.c.name)
+        .limit(limit)
+    ).all()
@@ -0,0 +1,205 @@
+import itertools
+import zlib
+from typing import Optional, Sequence
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+from app import models
+from app.cache import create_backend
+from app.config import Settings, settings
+from app.database import create_db_engine, get_db
+
+# ============================================================================
+# Users And Data Partitioning
+# ============================================================================
+# Requests name their user in the X-User-Id header, which stands in for an
+# authenticated identity, and every crud function is scoped to that user.
+#
+# With DATABASE_SHARDS set, each user's templates and workouts live in one of
+# several databases picked by a hash of the user id, so a user's writes only
+# lock their own shard. The users table of DATABASE_URL stays the directory
+# that allocates ids and keeps names unique; each user row is copied into the
+# user's shard so foreign keys and existence checks resolve there.
+#
+# With DATABASE_REPLICAS set, GET requests read DATABASE_URL through read-only
+# sessions on the replicas, taken in turn, so heavy reads do not wait for the
+# primary's pool. A SQLite replica may name the primary's own file: its
+# connections are opened with mode=ro and read the WAL alongside the writer.
+# Replicas may lag, so for READ_YOUR_WRITES_SECONDS after a client writes, its
+# reads go to the primary. Clients are told apart by their X-User-Id, and the
+# writes are remembered in the CACHE_URL backend, which redis:// shares
+# between workers. Sharded data is always read from its shard.
+#
+# The dependencies choosing a session are `async def`, so a request that needs
+# no replica or shard does not pay a threadpool hop for each of them; the
+# backend calls and session closes that may block are run in the threadpool.
+
+USER_HEADER = "X-User-Id"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+RECENT_WRITERS_MAX = 10000
+
+
+async def get_user_id(
+    user_id: Optional[int] = Header(
+        None, alias=USER_HEADER, gt=0, description="ID of the user making the request"
+    )
+) -> int:
+    """Dependency returning the id of the user the request acts for"""
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Missing {USER_HEADER} header",
+        )
+    return user_id
+
+
+def shard_index(user_id: int, shard_count: int) -> int:
+    # crc32 rather than hash(), which is salted per process for strings
+    return zlib.crc32(str(user_id).encode()) % shard_count
+
+
+class ShardRouter:
+    """Engines and session factories of the shards, empty when unsharded"""
+
+    def __init__(self, urls: Sequence[str], config: Settings = settings):
+        self.engines = [create_db_engine(url, config) for url in urls]
+        self.sessions = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            for engine in self.engines
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def session(self, user_id: int) -> Session:
+        return self.sessions[shard_index(user_id, len(self.sessions))]()
+
+    def copy_user(self, user: models.User):
+        """Insert or update the shard's copy of a directory user row"""
+        with self.session(user.id) as db:
+            db.merge(
+                models.User(
+                    id=user.id,
+                    name=user.name,
+                    default_measurement=user.default_measurement,
+                    timezone=user.timezone,
+                    created_at=user.created_at,
+                )
+            )
+            db.commit()
+
+    def dispose(self):
+        for engine in self.engines:
+            engine.dispose()
+
+
+def read_only_url(url: str) -> str:
+    """`url` with SQLite files opened read-only; other databases are expected
+    to give the replica's user read access alone"""
+    parsed = make_url(url)
+    if (
+        parsed.get_backend_name() != "sqlite"
+        or parsed.database in (None, "", ":memory:")
+        or "mode" in parsed.query
+    ):
+        return url
+    database = parsed.database
+    if not database.startswith("file:"):
+        database = f"file:{database}"
+    return parsed.set(
+        database=database, query={**parsed.query, "mode": "ro", "uri": "true"}
+    ).render_as_string(hide_password=False)
+
+
+class ReplicaRouter:
+    """Engines and session factories of the read replicas, empty when none"""
+
+    def __init__(self, urls: Sequence[str], config: Settings = settings):
+        self.engines = [create_db_engine(read_only_url(url), config) for url in urls]
+        self.sessions = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            for engine in self.engines
+        ]
+        self._turns = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def session(self) -> Session:
+        return self.sessions[next(self._turns) % len(self.sessions)]()
+
+    def dispose(self):
+        for engine in self.engines:
+            engine.dispose()
+
+
+for name, urls in [
+    ("DATABASE_SHARDS", settings.database_shards),
+    ("DATABASE_REPLICAS", settings.database_replicas),
+]:
+    if settings.async_db and urls:
+        raise ValueError(f"{name} is not supported with FITNESS_ASYNC_DB")
+
+shards = ShardRouter(settings.database_shards)
+replicas = ReplicaRouter(settings.database_replicas)
+# Clients that wrote within the read-your-writes window
+recent_writers = create_backend(settings.cache_url, RECENT_WRITERS_MAX)
+
+
+def writer_key(request: Request) -> Optional[str]:
+    user_id = request.headers.get(USER_HEADER)
+    return None if user_id is None else f"wrote:{user_id}"
+
+
+def note_write(request: Request):
+    key = writer_key(request)
+    if key is not None and settings.read_your_writes_seconds > 0:
+        recent_writers.set(key, b"1", settings.read_your_writes_seconds)
+
+
+def wrote_recently(request: Request) -> bool:
+    key = writer_key(request)
+    return key is not None and recent_writers.get(key) is not None
+
+
+async def get_routed_db(request: Request, db: Session = Depends(get_db)):
+    """Dependency to get a replica session for reads, else a primary session
+
+    A write starts the client's read-your-writes window, and restarts it once
+    the request is done, so the window runs from the commit. Without replicas
+    there is no window to keep.
+    """
+    if not replicas:
+        yield db
+        return
+    if request.method not in SAFE_METHODS:
+        await run_in_threadpool(note_write, request)
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(note_write, request)
+        return
+    if await run_in_threadpool(wrote_recently, request):
+        yield db
+        return
+    replica_db = replicas.session()
+    try:
+        yield replica_db
+    finally:
+        await run_in_threadpool(replica_db.close)
+
+
+async def get_user_db(
+    user_id: int = Depends(get_user_id), db: Session = Depends(get_routed_db)
+):
+    """Dependency to get a session on the database holding the user's data"""
+    if not shards:
+        yield db
+        return
+    shard_db = shards.session(user_id)
+    try:
+        yield shard_db
+    finally:
+        await run_in_threadpool(shard_db.close)
@@ -0,0 +1,54 @@
+from sqlalchemy import Float, case, func, select, type_coerce
+from sqlalchemy.orm import with_expression
+from app import models
+
+# ============================================================================
+# Weight Units
+# ============================================================================
+# Set weights are stored in kilograms and shown in the user's
+# `default_measurement`. The conversion is SQL arithmetic against a factor read
+# from the users table in an uncorrelated scalar subquery, which the database
+# evaluates once per statement: a list, tree, export or progression query
+# converts every row it returns without a round trip for the user's unit and
+# without touching the rows one by one in Python. Writes divide by the same
+# factor.
+
+KG_PER_LB = 0.45359237
+# Multiplier from kilograms to each unit a user can choose
+UNIT_FACTORS = {"kgs": 1.0, "lbs": 1 / KG_PER_LB}
+# Converted weights are rounded so 135 lbs reads back as 135, not 134.99999
+WEIGHT_DECIMALS = 2
+
+
+def unit_factor(user_id: int):
+    """Scalar subquery of the factor from kilograms to the user's unit"""
+    return (
+        select(case(UNIT_FACTORS, value=models.User.default_measurement))
+        .where(models.User.id == user_id)
+        .scalar_subquery()
+    )
+
+
+def to_user_unit(kilograms, user_id: int):
+    """SQL expression converting `kilograms` to the user's unit"""
+    return kilograms * unit_factor(user_id)
+
+
+def display_weight(kilograms, user_id: int):
+    """`to_user_unit`, rounded for display"""
+    return func.round(to_user_unit(kilograms, user_id), WEIGHT_DECIMALS)
+
+
+def canonical_weight(weight, user_id: int):
+    """SQL expression converting a weight in the user's unit to kilograms
+
+    `weight` is a value or the bind parameter of an executemany insert.
+    """
+    return type_coerce(weight, Float) / unit_factor(user_id)
+
+
+def set_weight(user_id: int):
+    """Loader option filling `Set.weight` in the user's unit"""
+    return with_expression(
+        models.Set.weight, display_weight(models.Set.weight_kg, user_id)
+    )
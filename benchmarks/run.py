@@ -0,0 +1,314 @@
+"""Benchmark the API hot paths in-process and compare against a baseline
+
+    python -m benchmarks.run --users 10 --output results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Sequence
+
+import httpx
+from app import database, metrics
+from app.cache import template_cache
+from app.config import settings
+from app.database import create_db_engine
+from app.main import app
+from app.migrations import upgrade_database
+from app.tenancy import USER_HEADER
+from benchmarks.seed import EXERCISE_NAMES, DatasetSize, owner, seed
+
+# ============================================================================
+# Scenarios
+# ============================================================================
+# Each scenario builds one request from a seeded random generator, so every
+# run issues the same sequence of requests against the same dataset. Requests
+# act for the user owning the rows they touch.
+
+BULK_LOG_EXERCISES = 6
+BULK_LOG_SETS = 4
+
+
+def as_user(user_id: int) -> dict:
+    return {USER_HEADER: str(user_id)}
+
+
+def template_list(rng, size):
+    headers = as_user(rng.randint(1, size.users))
+    return "GET", "/workout-templates/", {"params": {"limit": 50}, "headers": headers}
+
+
+def workout_tree(rng, size):
+    workout_id = rng.randint(1, size.workouts)
+    headers = as_user(owner(workout_id - 1, size))
+    return "GET", f"/workouts/{workout_id}/tree", {"headers": headers}
+
+
+def set_create(rng, size):
+    body = {"reps": rng.randint(1, 12), "weight": float(rng.randrange(20, 200, 5))}
+    exercise_id = rng.randint(1, size.exercises)
+    workout_index = (exercise_id - 1) // size.exercises_per_workout
+    kwargs = {"json": body, "headers": as_user(owner(workout_index, size))}
+    return "POST", f"/exercises/{exercise_id}/sets/", kwargs
+
+
+def bulk_log(rng, size):
+    body = {
+        "name": "Benchmark Session",
+        "date": "2026-01-15T18:00:00",
+        "exercises": [
+            {
+                "name": rng.choice(EXERCISE_NAMES),
+                "sets": [
+                    {"reps": rng.randint(1, 12), "weight": 100.0}
+                    for _ in range(BULK_LOG_SETS)
+                ],
+            }
+            for _ in range(BULK_LOG_EXERCISES)
+        ],
+    }
+    headers = as_user(rng.randint(1, size.users))
+    return "POST", "/workouts/log", {"json": body, "headers": headers}
+
+
+SCENARIOS = {
+    "template_list": template_list,
+    "workout_tree": workout_tree,
+    "set_create": set_create,
+    "bulk_log": bulk_log,
+}
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, elapsed):
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(ms),
+        "throughput_rps": round(len(ms) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(percentile(ms, 0.50), 3),
+        "p95_ms": round(percentile(ms, 0.95), 3),
+        "p99_ms": round(percentile(ms, 0.99), 3),
+    }
+
+
+async def run_scenario(client, scenario, size, requests, concurrency, warmup, seed):
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        method, url, kwargs = scenario(rng, size)
+        (await client.request(method, url, **kwargs)).raise_for_status()
+
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            method, url, kwargs = scenario(rng, size)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+@contextmanager
+def seeded_database(
+    size: DatasetSize, seed_value: int = 0, names: Sequence[str] = EXERCISE_NAMES
+):
+    """Engine of a fresh temporary database seeded with `size`"""
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{Path(directory) / 'benchmark.db'}"
+        engine = create_db_engine(url, settings)
+        try:
+            upgrade_database(engine)
+            seed(engine, size, seed_value, names)
+            yield engine
+        finally:
+            engine.dispose()
+
+
+@contextmanager
+def serving(engine):
+    """Point `app` at `engine`
+
+    The app's own session factory is bound to `engine` rather than `get_db`
+    being overridden, as FastAPI analyses the dependencies of an override on
+    every request, which the served app never does.
+    """
+    if settings.metrics:
+        # Measure the statement timing hooks the app installs on its engine
+        metrics.instrument_engine(engine, settings.slow_query_ms / 1000 or None)
+    previous = database.SessionLocal.kw["bind"]
+    database.SessionLocal.configure(bind=engine)
+    template_cache.clear()
+    try:
+        yield app
+    finally:
+        database.SessionLocal.configure(bind=previous)
+
+
+@contextmanager
+def seeded_app(
+    size: DatasetSize, seed_value: int = 0, names: Sequence[str] = EXERCISE_NAMES
+):
+    """Point `app` at a fresh temporary database seeded with `size`"""
+    with seeded_database(size, seed_value, names) as engine, serving(
+        engine
+    ) as asgi_app:
+        yield asgi_app
+
+
+def asgi_client(asgi_app) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=asgi_app)
+    return httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+
+
+async def run_benchmarks(
+    size: DatasetSize,
+    scenarios=tuple(SCENARIOS),
+    requests: int = 500,
+    concurrency: int = 1,
+    warmup: int = 20,
+    seed_value: int = 0,
+):
+    """Seed a fresh database, drive `app` over ASGI and return the report"""
+    results = {}
+    with seeded_app(size, seed_value) as asgi_app:
+        async with asgi_client(asgi_app) as client:
+            for name in scenarios:
+                results[name] = await run_scenario(
+                    client,
+                    SCENARIOS[name],
+                    size,
+                    requests,
+                    concurrency,
+                    warmup,
+                    seed_value,
+                )
+
+    return {
+        "dataset": asdict(size),
+        "requests": requests,
+        "concurrency": concurrency,
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+# ============================================================================
+# Baseline Comparison
+# ============================================================================
+def compare(report, baseline, threshold):
+    """Return a message for every endpoint that regressed beyond `threshold`
+
+    Latency regresses when p95 grows by more than `threshold` (0.2 = 20%) and
+    throughput regresses when it drops by more than `threshold`.
+    """
+    regressions = []
+    for name, current in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"
+            )
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']}rps -> "
+                f"{current['throughput_rps']}rps"
+            )
+    return regressions
+
+
+def print_report(report):
+    header = f"{'endpoint':<16}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    for name, result in report["results"].items():
+        print(
+            f"{name:<16}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p95_ms']:>10}{result['p99_ms']:>10}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=DatasetSize.users)
+    parser.add_argument("--workouts", type=int, default=DatasetSize.workouts_per_user)
+    parser.add_argument(
+        "--exercises", type=int, default=DatasetSize.exercises_per_workout
+    )
+    parser.add_argument("--sets", type=int, default=DatasetSize.sets_per_exercise)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Run only this scenario (repeatable)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Baseline report to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed regression as a fraction of the baseline (default 0.2)",
+    )
+    args = parser.parse_args(argv)
+
+    size = DatasetSize(
+        users=args.users,
+        workouts_per_user=args.workouts,
+        exercises_per_workout=args.exercises,
+        sets_per_exercise=args.sets,
+    )
+    report = asyncio.run(
+        run_benchmarks(
+            size,
+            scenarios=args.scenario or tuple(SCENARIOS),
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            seed_value=args.seed,
+        )
+    )
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        regressions = compare(
+            report, json.loads(args.baseline.read_text()), args.threshold
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Measure exercise name autocomplete over a million exercises
+
+    python -m benchmarks.search --users 100 --exercises 1000000 --requests 1000
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import sys
+import time
+
+from sqlalchemy.orm import Session
+from app import search
+from benchmarks.run import (
+    as_user,
+    asgi_client,
+    print_report,
+    run_scenario,
+    seeded_database,
+    serving,
+    summarize,
+)
+from benchmarks.seed import DatasetSize
+
+# ============================================================================
+# Exercise Name Search Benchmark
+# ============================================================================
+# Seeds up to `--names` exercise names per user, spread over `--exercises`
+# exercises, then searches with the prefixes a user types: one to four letters
+# of a word of a name, sometimes followed by the start of a second word. Each
+# search is timed as the query alone, which the budget applies to, and as a
+# GET /exercise-names/search request, which adds routing and serialization.
+
+MODIFIERS = [
+    "Incline",
+    "Decline",
+    "Seated",
+    "Standing",
+    "Paused",
+    "Close Grip",
+    "Wide Grip",
+    "Single Arm",
+    "Tempo",
+    "Deficit",
+    "Banded",
+    "Kneeling",
+]
+EQUIPMENT = [
+    "Barbell",
+    "Dumbbell",
+    "Cable",
+    "Machine",
+    "Kettlebell",
+    "Smith Machine",
+    "Landmine",
+    "Trap Bar",
+]
+MOVEMENTS = [
+    "Bench Press",
+    "Squat",
+    "Deadlift",
+    "Overhead Press",
+    "Row",
+    "Curl",
+    "Lunge",
+    "Fly",
+    "Shrug",
+    "Extension",
+    "Pullover",
+    "Raise",
+]
+# A prime, so that each user's exercises, handed out in turn, cycle through
+# every name whatever the number of users and exercises per workout
+DEFAULT_NAMES = 1009
+EXERCISES_PER_WORKOUT = 10
+SEARCH_LIMIT = 10
+
+
+def vocabulary(count: int):
+    names = [
+        " ".join(parts) for parts in itertools.product(MODIFIERS, EQUIPMENT, MOVEMENTS)
+    ]
+    if count > len(names):
+        raise ValueError(f"At most {len(names)} names can be generated")
+    return names[:count]
+
+
+def typed_search(rng, names, size):
+    """A random user and the start of one of the names, as they type it"""
+    words = rng.choice(names).split()
+    typed = [rng.choice(words)[: rng.randint(1, 4)]]
+    if rng.random() < 0.3:
+        typed.append(rng.choice(words)[: rng.randint(1, 3)])
+    return rng.randint(1, size.users), " ".join(typed).lower()
+
+
+def prefix_search(names):
+    """Scenario requesting the names matching a typed prefix"""
+
+    def scenario(rng, size):
+        user_id, text = typed_search(rng, names, size)
+        params = {"q": text, "limit": SEARCH_LIMIT}
+        return (
+            "GET",
+            "/exercise-names/search",
+            {"params": params, "headers": as_user(user_id)},
+        )
+
+    return scenario
+
+
+def time_queries(engine, names, size, requests, warmup, seed_value):
+    """Latency of the search query alone, without the request around it"""
+    rng = random.Random(seed_value)
+    with Session(engine) as db:
+        for _ in range(warmup):
+            search.search_exercise_names(db, *typed_search(rng, names, size))
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(requests):
+            user_id, text = typed_search(rng, names, size)
+            query_started = time.perf_counter()
+            search.search_exercise_names(db, user_id, text, SEARCH_LIMIT)
+            latencies.append(time.perf_counter() - query_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def run_search(
+    users: int,
+    exercises: int,
+    names: int = DEFAULT_NAMES,
+    requests: int = 1000,
+    warmup: int = 50,
+    seed_value: int = 0,
+):
+    """Seed `exercises` exercises, then time searches as queries and requests"""
+    size = DatasetSize(
+        users=users,
+        workouts_per_user=max(1, exercises // (users * EXERCISES_PER_WORKOUT)),
+        exercises_per_workout=EXERCISES_PER_WORKOUT,
+        sets_per_exercise=0,
+        templates=users,
+    )
+    vocabulary_names = vocabulary(names)
+    started = time.perf_counter()
+    with seeded_database(size, seed_value, vocabulary_names) as engine:
+        seconds = time.perf_counter() - started
+        results = {
+            "query": time_queries(
+                engine, vocabulary_names, size, requests, warmup, seed_value
+            )
+        }
+        with serving(engine) as asgi_app:
+            async with asgi_client(asgi_app) as client:
+                results["request"] = await run_scenario(
+                    client,
+                    prefix_search(vocabulary_names),
+                    size,
+                    requests,
+                    1,
+                    warmup,
+                    seed_value,
+                )
+    return {
+        "exercises": size.exercises,
+        "seed_seconds": round(seconds, 1),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--exercises", type=int, default=1_000_000)
+    parser.add_argument("--names", type=int, default=DEFAULT_NAMES)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=5.0,
+        help="Exit non-zero when the query p95 latency exceeds this (default 5)",
+    )
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(
+        run_search(
+            args.users,
+            args.exercises,
+            args.names,
+            args.requests,
+            args.warmup,
+            args.seed,
+        )
+    )
+    print(
+        f"{result['exercises']} exercises seeded in {result['seed_seconds']}s, "
+        f"{args.requests} searches"
+    )
+    print_report(result)
+    p95_ms = result["results"]["query"]["p95_ms"]
+    if p95_ms > args.budget_ms:
+        print(f"Query p95 {p95_ms}ms exceeds {args.budget_ms}ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app import analytics, models
+
+# ============================================================================
+# Synthetic Dataset
+# ============================================================================
+EXERCISE_NAMES = [
+    "Squat",
+    "Bench Press",
+    "Deadlift",
+    "Overhead Press",
+    "Barbell Row",
+    "Pull Up",
+    "Dip",
+    "Lunge",
+]
+START_DATE = date(2020, 1, 1)
+BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    users: int = 10
+    workouts_per_user: int = 50
+    exercises_per_workout: int = 6
+    sets_per_exercise: int = 4
+    templates: int = 100
+    exercises_per_template: int = 6
+
+    @property
+    def workouts(self) -> int:
+        return self.users * self.workouts_per_user
+
+    @property
+    def exercises(self) -> int:
+        return self.workouts * self.exercises_per_workout
+
+    @property
+    def sets(self) -> int:
+        return self.exercises * self.sets_per_exercise
+
+
+def insert_batches(db: Session, model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            db.execute(insert(model), batch)
+            batch = []
+    if batch:
+        db.execute(insert(model), batch)
+
+
+def owner(index: int, size: DatasetSize) -> int:
+    """Id of the user owning the workout or template at 0-based `index`"""
+    return index % size.users + 1
+
+
+def seed(
+    engine: Engine,
+    size: DatasetSize,
+    seed: int = 0,
+    names: Sequence[str] = EXERCISE_NAMES,
+):
+    """Fill an empty, migrated database with a reproducible dataset
+
+    Exercises and exercise templates are named in turn from `names`.
+    """
+    rng = random.Random(seed)
+    with Session(engine) as db:
+        insert_batches(
+            db,
+            models.User,
+            ({"id": i + 1, "name": f"user{i}"} for i in range(size.users)),
+        )
+        insert_batches(
+            db,
+            models.WorkoutTemplate,
+            (
+                {"id": i + 1, "name": f"Template {i}", "user_id": owner(i, size)}
+                for i in range(size.templates)
+            ),
+        )
+        insert_batches(
+            db,
+            models.ExerciseTemplate,
+            (
+                {
+                    "name": names[j % len(names)],
+                    "workout_template_id": i + 1,
+                }
+                for i in range(size.templates)
+                for j in range(size.exercises_per_template)
+            ),
+        )
+        # Users are interleaved so each one trains every few days
+        insert_batches(
+            db,
+            models.Workout,
+            (
+                {
+                    "id": i + 1,
+                    "name": f"Workout {i}",
+                    "date": START_DATE + timedelta(days=i // size.users),
+                    "user_id": owner(i, size),
+                }
+                for i in range(size.workouts)
+            ),
+        )
+        insert_batches(
+            db,
+            models.Exercise,
+            (
+                {
+                    "id": i + 1,
+                    "name": names[i % len(names)],
+                    "workout_id": i // size.exercises_per_workout + 1,
+                }
+                for i in range(size.exercises)
+            ),
+        )
+        insert_batches(
+            db,
+            models.Set,
+            (
+                {
+                    "reps": rng.randint(1, 12),
+                    "weight_kg": float(rng.randrange(20, 200, 5)),
+                    "exercise_id": i // size.sets_per_exercise + 1,
+                }
+                for i in range(size.sets)
+            ),
+        )
+        db.commit()
+        analytics.rebuild_summaries(db)
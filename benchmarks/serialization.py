@@ -0,0 +1,80 @@
+"""Compare per-request CPU of the default and fast JSON paths
+
+    python -m benchmarks.serialization --exercises 50 --sets 5 --requests 500
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import replace
+
+from app import main as api
+from benchmarks.run import as_user, asgi_client, seeded_app
+from benchmarks.seed import DatasetSize
+
+# ============================================================================
+# Fast JSON Benchmark
+# ============================================================================
+# Reads one large workout tree (GET /workout/{id}/exercises/) with
+# FITNESS_FAST_JSON off and on. CPU time is measured for the whole process, so
+# it covers routing, the database driver and serialization alike.
+
+
+async def cpu_per_request(client, url, requests, warmup):
+    for _ in range(warmup):
+        (await client.get(url)).raise_for_status()
+    started_cpu, started_wall = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        (await client.get(url)).raise_for_status()
+    return (
+        (time.process_time() - started_cpu) * 1000 / requests,
+        (time.perf_counter() - started_wall) * 1000 / requests,
+    )
+
+
+async def compare_paths(exercises: int, sets: int, requests: int, warmup: int):
+    size = DatasetSize(
+        users=1,
+        workouts_per_user=1,
+        exercises_per_workout=exercises,
+        sets_per_exercise=sets,
+        templates=0,
+    )
+    default_settings = api.settings
+    results = {}
+    with seeded_app(size) as asgi_app:
+        async with asgi_client(asgi_app) as client:
+            client.headers.update(as_user(1))
+            try:
+                for name, fast_json in [("default", False), ("fast_json", True)]:
+                    api.settings = replace(default_settings, fast_json=fast_json)
+                    results[name] = await cpu_per_request(
+                        client, "/workout/1/exercises/", requests, warmup
+                    )
+            finally:
+                api.settings = default_settings
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--exercises", type=int, default=50)
+    parser.add_argument("--sets", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(
+        compare_paths(args.exercises, args.sets, args.requests, args.warmup)
+    )
+    print(f"{'path':<12}{'cpu ms/req':>12}{'wall ms/req':>13}")
+    for name, (cpu_ms, wall_ms) in results.items():
+        print(f"{name:<12}{cpu_ms:>12.3f}{wall_ms:>13.3f}")
+    default_cpu, fast_cpu = results["default"][0], results["fast_json"][0]
+    print(f"CPU per request reduced by {1 - fast_cpu / default_cpu:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
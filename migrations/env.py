@@ -0,0 +1,63 @@
+from logging.config import fileConfig
+
+from alembic import context
+from app import models, search
+from app.database import (
+    SQLALCHEMY_DATABASE_URL,
+    create_db_engine,
+    foreign_keys_disabled,
+)
+from app.config import settings
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get(
+    "configure_logger", True
+):
+    fileConfig(config.config_file_name)
+
+target_metadata = models.Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_name=search.include_name,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_with_connection(connection):
+    # Batch mode lets ALTER TABLE style operations work on SQLite
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_name=search.include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # app.migrations passes in the application's own connection
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_with_connection(connection)
+        return
+
+    engine = create_db_engine(SQLALCHEMY_DATABASE_URL, settings)
+    with engine.connect() as connection, foreign_keys_disabled(connection):
+        run_with_connection(connection)
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,74 @@
+"""Baseline schema as originally created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "workout_templates",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+    )
+    op.create_index("ix_workout_templates_name", "workout_templates", ["name"])
+
+    op.create_table(
+        "exercise_templates",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column(
+            "workout_template_id",
+            sa.Integer(),
+            sa.ForeignKey("workout_templates.id"),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_exercise_templates_name", "exercise_templates", ["name"])
+
+    op.create_table(
+        "workout",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+    )
+    op.create_index("ix_workout_name", "workout", ["name"])
+    op.create_index("ix_workout_date", "workout", ["date"])
+
+    op.create_table(
+        "exercises",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column(
+            "workout_id", sa.Integer(), sa.ForeignKey("workout.id"), nullable=False
+        ),
+    )
+    op.create_index("ix_exercises_name", "exercises", ["name"])
+
+    op.create_table(
+        "sets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("reps", sa.Integer(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column(
+            "exercise_id", sa.Integer(), sa.ForeignKey("exercises.id"), nullable=False
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("sets")
+    op.drop_table("exercises")
+    op.drop_table("workout")
+    op.drop_table("exercise_templates")
+    op.drop_table("workout_templates")
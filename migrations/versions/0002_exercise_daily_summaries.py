@@ -0,0 +1,38 @@
+"""Add the exercise progression summary table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases built with create_all before migrations existed may have it
+    if sa.inspect(op.get_bind()).has_table("exercise_daily_summaries"):
+        return
+    op.create_table(
+        "exercise_daily_summaries",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("set_count", sa.Integer(), nullable=False),
+        sa.Column("total_reps", sa.Integer(), nullable=False),
+        sa.Column("total_volume", sa.Float(), nullable=False),
+        sa.Column("max_weight", sa.Float(), nullable=False),
+        sa.Column("best_e1rm_epley", sa.Float(), nullable=False),
+        sa.Column("best_e1rm_brzycki", sa.Float()),
+        sa.Column("best_set_reps", sa.Integer(), nullable=False),
+        sa.Column("best_set_weight", sa.Float(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("exercise_daily_summaries")
@@ -0,0 +1,37 @@
+"""Index every foreign key, leading composite indexes on (parent id, id)
+
+Child rows are always fetched by parent and ordered or paged by id, so one
+composite index per foreign key serves both the lookup and the ordering.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    (
+        "ix_exercise_templates_workout_template_id_id",
+        "exercise_templates",
+        ["workout_template_id", "id"],
+    ),
+    ("ix_exercises_workout_id_id", "exercises", ["workout_id", "id"]),
+    ("ix_sets_exercise_id_id", "sets", ["exercise_id", "id"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,26 @@
+"""Index exercise_daily_summaries.date for whole day summary refreshes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_exercise_daily_summaries_date", "exercise_daily_summaries", ["date"]
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_exercise_daily_summaries_date", table_name="exercise_daily_summaries"
+    )
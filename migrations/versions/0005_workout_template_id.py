@@ -0,0 +1,45 @@
+"""Link workouts to the workout template they were started from
+
+Sessions of a template are listed newest first, so the foreign key is indexed
+together with the date.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+FOREIGN_KEY = "fk_workout_workout_template_id"
+
+
+def upgrade():
+    # SQLite cannot add a constraint in place, so batch mode copies the table
+    with op.batch_alter_table("workout") as batch_op:
+        batch_op.add_column(sa.Column("workout_template_id", sa.Integer()))
+        batch_op.create_foreign_key(
+            FOREIGN_KEY,
+            "workout_templates",
+            ["workout_template_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+    op.create_index(
+        "ix_workout_workout_template_id_date",
+        "workout",
+        ["workout_template_id", "date"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_workout_workout_template_id_date", table_name="workout")
+    with op.batch_alter_table("workout") as batch_op:
+        batch_op.drop_constraint(FOREIGN_KEY, type_="foreignkey")
+        batch_op.drop_column("workout_template_id")
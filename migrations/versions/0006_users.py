@@ -0,0 +1,127 @@
+"""Add users and scope workout templates and workouts to a user
+
+Existing templates and workouts are assigned to a `default` user created for
+them. The summary table is keyed by user from now on; it is recreated empty
+and refilled by the rebuild the app runs at startup when sets have no
+summaries.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+DEFAULT_USER = "default"
+# (table, foreign key, composite index, indexed columns)
+OWNED_TABLES = [
+    (
+        "workout_templates",
+        "fk_workout_templates_user_id",
+        "ix_workout_templates_user_id_id",
+        ["user_id", "id"],
+    ),
+    ("workout", "fk_workout_user_id", "ix_workout_user_id_date", ["user_id", "date"]),
+]
+SUMMARY_COLUMNS = [
+    ("set_count", sa.Integer(), False),
+    ("total_reps", sa.Integer(), False),
+    ("total_volume", sa.Float(), False),
+    ("max_weight", sa.Float(), False),
+    ("best_e1rm_epley", sa.Float(), False),
+    ("best_e1rm_brzycki", sa.Float(), True),
+    ("best_set_reps", sa.Integer(), False),
+    ("best_set_weight", sa.Float(), False),
+]
+
+
+def summary_columns():
+    return [
+        sa.Column(name, column_type, nullable=nullable)
+        for name, column_type, nullable in SUMMARY_COLUMNS
+    ]
+
+
+def upgrade():
+    users = op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("default_measurement", sa.String(), nullable=False),
+        sa.Column("timezone", sa.String()),
+        sa.Column(
+            "created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()
+        ),
+    )
+    op.create_index("ix_users_name", "users", ["name"], unique=True)
+
+    bind = op.get_bind()
+    owner_id = None
+    for table, _, _, _ in OWNED_TABLES:
+        if bind.execute(sa.select(sa.table(table, sa.column("id"))).limit(1)).first():
+            owner_id = bind.execute(
+                users.insert()
+                .values(name=DEFAULT_USER, default_measurement="lbs")
+                .returning(users.c.id)
+            ).scalar_one()
+            break
+
+    op.drop_index("ix_workout_date", table_name="workout")
+    op.drop_index("ix_workout_name", table_name="workout")
+    for table, foreign_key, index, columns in OWNED_TABLES:
+        op.add_column(table, sa.Column("user_id", sa.Integer()))
+        if owner_id is not None:
+            op.execute(
+                sa.table(table, sa.column("user_id")).update().values(user_id=owner_id)
+            )
+        # SQLite cannot add a constraint in place, so batch mode copies the table
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("user_id", existing_type=sa.Integer(), nullable=False)
+            batch_op.create_foreign_key(foreign_key, "users", ["user_id"], ["id"])
+        op.create_index(index, table, columns)
+    op.create_index("ix_workout_user_id_name", "workout", ["user_id", "name"])
+
+    op.drop_table("exercise_daily_summaries")
+    op.create_table(
+        "exercise_daily_summaries",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        *summary_columns(),
+    )
+    op.create_index(
+        "ix_exercise_daily_summaries_user_id_date",
+        "exercise_daily_summaries",
+        ["user_id", "date"],
+    )
+
+
+def downgrade():
+    op.drop_table("exercise_daily_summaries")
+    op.create_table(
+        "exercise_daily_summaries",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        *summary_columns(),
+    )
+    op.create_index(
+        "ix_exercise_daily_summaries_date", "exercise_daily_summaries", ["date"]
+    )
+
+    op.drop_index("ix_workout_user_id_name", table_name="workout")
+    for table, foreign_key, index, _ in OWNED_TABLES:
+        op.drop_index(index, table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(foreign_key, type_="foreignkey")
+            batch_op.drop_column("user_id")
+    op.create_index("ix_workout_name", "workout", ["name"])
+    op.create_index("ix_workout_date", "workout", ["date"])
+    op.drop_index("ix_users_name", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,54 @@
+"""Store set weights in kilograms
+
+Weights were entered in whatever unit the client used; they are taken to be in
+the owning user's `default_measurement` and converted. Summaries are emptied
+and refilled in kilograms by the rebuild the app runs at startup.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+KG_PER_LB = 0.45359237
+
+sets = sa.table("sets", sa.column("weight_kg"), sa.column("exercise_id"))
+exercises = sa.table("exercises", sa.column("id"), sa.column("workout_id"))
+workout = sa.table("workout", sa.column("id"), sa.column("user_id"))
+users = sa.table("users", sa.column("id"), sa.column("default_measurement"))
+LBS_SETS = sets.c.exercise_id.in_(
+    sa.select(exercises.c.id)
+    .join(workout, workout.c.id == exercises.c.workout_id)
+    .join(users, users.c.id == workout.c.user_id)
+    .where(users.c.default_measurement == "lbs")
+)
+
+
+def upgrade():
+    with op.batch_alter_table("sets") as batch_op:
+        batch_op.alter_column(
+            "weight", new_column_name="weight_kg", existing_type=sa.Float()
+        )
+    op.execute(
+        sets.update().where(LBS_SETS).values(weight_kg=sets.c.weight_kg * KG_PER_LB)
+    )
+    op.execute(sa.text("DELETE FROM exercise_daily_summaries"))
+
+
+def downgrade():
+    op.execute(
+        sets.update().where(LBS_SETS).values(weight_kg=sets.c.weight_kg / KG_PER_LB)
+    )
+    with op.batch_alter_table("sets") as batch_op:
+        batch_op.alter_column(
+            "weight_kg", new_column_name="weight", existing_type=sa.Float()
+        )
+    op.execute(sa.text("DELETE FROM exercise_daily_summaries"))
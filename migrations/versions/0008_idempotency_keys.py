@@ -0,0 +1,33 @@
+"""Store the responses of create requests sent with an Idempotency-Key
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.LargeBinary(), primary_key=True),
+        sa.Column("fingerprint", sa.LargeBinary(), nullable=False),
+        sa.Column("status_code", sa.Integer()),
+        sa.Column("body", sa.LargeBinary()),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"]
+    )
+
+
+def downgrade():
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,54 @@
+"""Delete children with their parent through ON DELETE CASCADE
+
+Exercise templates, exercises and sets are removed by the database when the
+row they belong to is deleted, instead of being loaded and deleted one by one.
+The foreign keys were created unnamed; they are recreated with names.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table)
+CASCADES = [
+    ("exercise_templates", "workout_template_id", "workout_templates"),
+    ("exercises", "workout_id", "workout"),
+    ("sets", "exercise_id", "exercises"),
+]
+# Names the unnamed constraints SQLite reflects, so batch mode can drop them
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s"}
+
+
+def existing_foreign_key(table, column):
+    for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        if foreign_key["constrained_columns"] == [column]:
+            return foreign_key["name"] or f"fk_{table}_{column}"
+
+
+def recreate_foreign_keys(ondelete):
+    for table, column, referred in CASCADES:
+        name = existing_foreign_key(table, column)
+        with op.batch_alter_table(
+            table, naming_convention=NAMING_CONVENTION
+        ) as batch_op:
+            batch_op.drop_constraint(name, type_="foreignkey")
+            batch_op.create_foreign_key(
+                f"fk_{table}_{column}", referred, [column], ["id"], ondelete=ondelete
+            )
+
+
+def upgrade():
+    recreate_foreign_keys("CASCADE")
+
+
+def downgrade():
+    recreate_foreign_keys(None)
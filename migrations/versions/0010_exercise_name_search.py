@@ -0,0 +1,158 @@
+"""Index exercise names for search
+
+Names of exercises and exercise templates are counted per user in
+`exercise_names`, which an FTS5 table indexes. On SQLite the counts are
+backfilled and kept up to date by triggers; other databases get the table
+alone, as the search queries the exercise tables there.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+SEARCH_TABLE = "exercise_names_fts"
+SEPARATORS = "-/().,'&+:_"
+# (table, parent table, foreign key to the parent, counter of exercise_names)
+NAMED_TABLES = [
+    ("exercises", "workout", "workout_id", "exercise_count"),
+    (
+        "exercise_templates",
+        "workout_templates",
+        "workout_template_id",
+        "template_count",
+    ),
+]
+BACKFILL = """
+    INSERT INTO exercise_names (user_id, name, exercise_count, template_count)
+    SELECT user_id, name, sum(exercise_count), sum(template_count) FROM (
+        SELECT workout.user_id, exercises.name,
+            1 AS exercise_count, 0 AS template_count
+        FROM exercises JOIN workout ON workout.id = exercises.workout_id
+        UNION ALL
+        SELECT workout_templates.user_id, exercise_templates.name, 0, 1
+        FROM exercise_templates JOIN workout_templates
+            ON workout_templates.id = exercise_templates.workout_template_id
+    ) AS uses
+    GROUP BY user_id, name
+"""
+
+
+def indexed_terms(row):
+    name = f"{row}.name"
+    for separator in SEPARATORS:
+        quoted = separator.replace("'", "''")
+        name = f"replace({name}, '{quoted}', ' ')"
+    prefix = f"'u' || {row}.user_id || 'x'"
+    return f"{prefix} || replace({name}, ' ', ' ' || {prefix})"
+
+
+# The DDL below is formatted from the constants of this module only, as
+# trigger bodies take no bound parameters, hence its `nosec B608` marks
+def name_count_triggers(name_table, parent, parent_key, counter):
+    owner = (
+        f"(SELECT user_id FROM {parent} "
+        f"WHERE id = OLD.{parent_key})"  # nosec B608
+    )
+    counts = {"exercise_count": 0, "template_count": 0, counter: 1}
+    add = f"""
+        INSERT INTO exercise_names (user_id, name, exercise_count, template_count)
+        SELECT user_id, NEW.name, {counts["exercise_count"]},
+            {counts["template_count"]}
+        FROM {parent} WHERE id = NEW.{parent_key}
+        ON CONFLICT (user_id, name) DO UPDATE SET {counter} = {counter} + 1;
+    """  # nosec B608
+    remove = f"""
+        UPDATE exercise_names SET {counter} = {counter} - 1
+        WHERE user_id = {owner} AND name = OLD.name;
+        DELETE FROM exercise_names
+        WHERE user_id = {owner} AND name = OLD.name
+            AND exercise_count = 0 AND template_count = 0;
+    """  # nosec B608
+    children = f"FROM {name_table} WHERE {parent_key} = OLD.id"
+    return {
+        f"{name_table}_names_insert": f"""
+            AFTER INSERT ON {name_table} BEGIN {add} END
+        """,
+        f"{name_table}_names_update": f"""
+            AFTER UPDATE OF name, {parent_key} ON {name_table}
+            WHEN OLD.name IS NOT NEW.name OR OLD.{parent_key} IS NOT NEW.{parent_key}
+            BEGIN {remove} {add} END
+        """,
+        f"{name_table}_names_delete": f"""
+            AFTER DELETE ON {name_table} BEGIN {remove} END
+        """,
+        f"{parent}_names_delete": f"""
+            BEFORE DELETE ON {parent} BEGIN
+                UPDATE exercise_names SET {counter} = {counter} - (
+                    SELECT count(*) {children} AND name = exercise_names.name
+                )
+                WHERE user_id = OLD.user_id AND name IN (SELECT name {children});
+                DELETE FROM exercise_names
+                WHERE user_id = OLD.user_id AND name IN (SELECT name {children})
+                    AND exercise_count = 0 AND template_count = 0;
+            END
+        """,  # nosec B608
+    }
+
+
+TRIGGERS = {
+    "exercise_names_fts_insert": f"""
+        AFTER INSERT ON exercise_names BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, terms)
+            VALUES (NEW.id, {indexed_terms("NEW")});
+        END
+    """,  # nosec B608
+    "exercise_names_fts_delete": f"""
+        AFTER DELETE ON exercise_names BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, terms)
+            VALUES ('delete', OLD.id, {indexed_terms("OLD")});
+        END
+    """,  # nosec B608
+}
+for named in NAMED_TABLES:
+    TRIGGERS.update(name_count_triggers(*named))
+
+
+def upgrade():
+    op.create_table(
+        "exercise_names",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("exercise_count", sa.Integer(), nullable=False),
+        sa.Column("template_count", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_exercise_names_user_id_name",
+        "exercise_names",
+        ["user_id", "name"],
+        unique=True,
+    )
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(BACKFILL)
+    op.execute(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(terms, content='')")
+    terms = indexed_terms("exercise_names")
+    op.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, terms) "
+        f"SELECT id, {terms} FROM exercise_names"  # nosec B608
+    )
+    for name, body in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for name in TRIGGERS:
+            op.execute(f"DROP TRIGGER {name}")
+        op.execute(f"DROP TABLE {SEARCH_TABLE}")
+    op.drop_table("exercise_names")
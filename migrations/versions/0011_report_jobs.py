@@ -0,0 +1,47 @@
+"""Store training report jobs
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "report_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", name="fk_report_jobs_user_id"),
+            nullable=False,
+        ),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("start", sa.Date()),
+        sa.Column("end", sa.Date()),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("report", sa.LargeBinary()),
+        sa.Column("error", sa.String()),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_report_jobs_user_id_id", "report_jobs", ["user_id", "id"])
+    op.create_index("ix_report_jobs_status", "report_jobs", ["status"])
+
+
+def downgrade():
+    op.drop_table("report_jobs")
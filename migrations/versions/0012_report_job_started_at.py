@@ -0,0 +1,25 @@
+"""Record when a report job started running
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("report_jobs") as batch_op:
+        batch_op.add_column(sa.Column("started_at", sa.DateTime()))
+
+
+def downgrade():
+    with op.batch_alter_table("report_jobs") as batch_op:
+        batch_op.drop_column("started_at")
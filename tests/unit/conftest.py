@@ -0,0 +1,205 @@
+import pytest
+import re
+
+from contextlib import contextmanager
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import async_api, models
+from app.cache import template_cache
+from app.config import settings
+from app.database import (
+    Base,
+    apply_sqlite_pragmas,
+    create_async_sessionmaker,
+    get_async_db,
+    get_db,
+)
+from app.main import app
+from app.tenancy import USER_HEADER
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+# Created in every test database; `client` sends its requests as this user.
+# Weighing in kilograms, so seeded `weight_kg` values read back unchanged.
+TEST_USER = {"id": 1, "name": "test", "default_measurement": "kgs"}
+TEST_USER_ID = TEST_USER["id"]
+
+
+# -------------------------------------------------------------------
+# Database fixtures
+# -------------------------------------------------------------------
+@pytest.fixture
+def engine():
+    """Fresh in-memory database shared by every session in a test.
+
+    It runs the app's SQLite pragmas, so foreign keys are enforced. Every
+    statement the app issues is checked with EXPLAIN QUERY PLAN, and the test
+    fails if any of them scans a whole table.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    apply_sqlite_pragmas(engine, settings)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(models.User), TEST_USER)
+    checker = QueryPlanChecker()
+    event.listen(engine, "before_cursor_execute", checker)
+    yield engine
+    event.remove(engine, "before_cursor_execute", checker)
+    engine.dispose()
+    assert not checker.full_scans, "Full table scans:\n" + "\n\n".join(
+        checker.full_scans
+    )
+
+
+@pytest.fixture
+def db(engine):
+    """Session for seeding and inspecting data, exempt from the plan check."""
+    unchecked = engine.execution_options(skip_plan_check=True)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=unchecked)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(engine):
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    template_cache.clear()
+    # Not entered as a context manager, so the lifespan hooks that migrate and
+    # inspect the configured database never run against a real file
+    yield TestClient(app, headers={USER_HEADER: str(TEST_USER_ID)})
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    """Client of an app serving the async routes of app.async_api from a
+    file database, which aiosqlite connections share"""
+    pytest.importorskip("aiosqlite")
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as connection:
+        connection.execute(insert(models.User), TEST_USER)
+    sync_engine.dispose()
+
+    AsyncTestingSessionLocal = create_async_sessionmaker(url)
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_api.install(async_app)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    template_cache.clear()
+    with TestClient(async_app, headers={USER_HEADER: str(TEST_USER_ID)}) as test_client:
+        yield test_client
+
+
+# -------------------------------------------------------------------
+# Query plans
+# -------------------------------------------------------------------
+FULL_SCAN = re.compile(r"^SCAN (\w+)")
+CHECKED_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
+class QueryPlanChecker:
+    """Runs EXPLAIN QUERY PLAN ahead of each statement and records full scans.
+
+    A scan of a limited query that needs no temporary sort only reads the
+    first page of rows in key order, so it is not reported. Neither is a
+    streamed (`yield_per`) statement, which reads every row by design.
+    """
+
+    def __init__(self):
+        self.tables = set(Base.metadata.tables)
+        self.full_scans = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany or conn.get_execution_options().get("skip_plan_check"):
+            return
+        if context is not None and context.execution_options.get("stream_results"):
+            return
+        if not statement.lstrip().upper().startswith(CHECKED_STATEMENTS):
+            return
+        plan = [
+            row[3]
+            for row in cursor.connection.execute(
+                "EXPLAIN QUERY PLAN " + statement, parameters
+            )
+        ]
+        if LIMIT.search(statement) and not any("TEMP B-TREE" in p for p in plan):
+            return
+        for detail in plan:
+            match = FULL_SCAN.match(detail)
+            if match and match.group(1) in self.tables:
+                self.full_scans.append(f"{detail}\n{statement}")
+
+
+# -------------------------------------------------------------------
+# Query counting
+# -------------------------------------------------------------------
+class QueryCounter:
+    """Records every SQL statement executed on an engine."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine):
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(engine, limit):
+    """Fail if the wrapped block issues more than `limit` SQL statements."""
+    with count_queries(engine) as counter:
+        yield counter
+    assert (
+        counter.count <= limit
+    ), f"Expected at most {limit} queries, got {counter.count}:\n" + "\n".join(
+        counter.statements
+    )
+
+
+@pytest.fixture
+def max_queries(engine):
+    """Fixture form of `assert_max_queries` bound to the test engine."""
+
+    def _max_queries(limit):
+        return assert_max_queries(engine, limit)
+
+    return _max_queries
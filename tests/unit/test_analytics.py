@@ -0,0 +1,100 @@
+import pytest
+
+from app import analytics, models
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+URL = "/analytics/exercises/Squat/progression"
+
+# (Date, [(reps, weight), ...]) for each logged squat session
+SESSIONS = [
+    ("2026-01-05", [(5, 100.0), (5, 100.0)]),
+    ("2026-01-07", [(3, 110.0), (8, 90.0)]),
+    ("2026-01-14", [(5, 95.0)]),
+]
+
+
+def log_session(client, day, sets, name="Squat"):
+    payload = {
+        "name": "Legs",
+        "date": f"{day}T18:00:00",
+        "exercises": [
+            {"name": name, "sets": [{"reps": r, "weight": w} for r, w in sets]}
+        ],
+    }
+    return client.post("/workouts/log", json=payload).json()
+
+
+def summary_rows(db):
+    return sorted(tuple(row) for row in db.query(analytics.summary).all())
+
+
+@pytest.fixture
+def logged(client):
+    return [log_session(client, day, sets) for day, sets in SESSIONS]
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_daily_progression(client, logged):
+    points = client.get(URL).json()["points"]
+
+    assert [p["period"] for p in points] == [day for day, _ in SESSIONS]
+    first = points[0]
+    assert first["set_count"] == 2
+    assert first["total_volume"] == 1000.0
+    assert first["e1rm_epley"] == pytest.approx(100 * (1 + 5 / 30))
+    assert first["e1rm_brzycki"] == pytest.approx(100 * 36 / 32)
+    assert points[1]["best_set"] == {"reps": 3, "weight": 110.0}
+    assert [p["is_pr"] for p in points] == [True, True, False]
+
+
+def test_date_range_keeps_earlier_prs(client, logged):
+    points = client.get(URL, params={"start": "2026-01-14"}).json()["points"]
+    assert len(points) == 1
+    assert points[0]["is_pr"] is False
+
+
+def test_weekly_buckets(client, logged):
+    points = client.get(URL, params={"bucket": "week"}).json()["points"]
+
+    assert [p["period"] for p in points] == ["2026-01-05", "2026-01-12"]
+    assert points[0]["set_count"] == 4
+    assert points[0]["best_set"] == {"reps": 3, "weight": 110.0}
+
+
+def test_set_writes_update_summaries(client, db, logged):
+    set_id = logged[0]["exercises"][0]["sets"][0]["id"]
+    exercise_id = logged[0]["exercises"][0]["id"]
+
+    client.put(f"/sets/{set_id}", json={"reps": 5, "weight": 140.0})
+    client.post(f"/exercises/{exercise_id}/sets/", json={"reps": 1, "weight": 60.0})
+    client.delete(f"/sets/{logged[2]['exercises'][0]['sets'][0]['id']}")
+
+    points = client.get(URL).json()["points"]
+    assert points[0]["max_weight"] == 140.0
+    assert points[0]["set_count"] == 3
+    assert len(points) == 2
+
+    incremental = summary_rows(db)
+    analytics.rebuild_summaries(db)
+    assert summary_rows(db) == incremental
+
+
+def test_exercise_rename_moves_summary(client, db, logged):
+    client.put(f"/exercises/{logged[0]['exercises'][0]['id']}", json={"name": "Dip"})
+
+    assert len(client.get(URL).json()["points"]) == 2
+    dip = client.get("/analytics/exercises/Dip/progression").json()["points"]
+    assert dip[0]["set_count"] == 2
+
+
+def test_rebuild_backfills_existing_sets(db, client, logged):
+    db.query(models.ExerciseDailySummary).delete()
+    db.commit()
+    assert analytics.summaries_need_rebuild(db)
+
+    analytics.rebuild_summaries(db)
+    assert len(client.get(URL).json()["points"]) == len(SESSIONS)
@@ -0,0 +1,151 @@
+import pytest
+
+from dataclasses import replace
+from datetime import date
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert
+from app import async_api, models
+from app.database import async_database_url
+from app.idempotency import IDEMPOTENCY_HEADER, REPLAYED_HEADER
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+ASYNC_URLS = [
+    ("sqlite:///./fitness.db", "sqlite+aiosqlite:///./fitness.db"),
+    (
+        "postgresql://user:pw@db:5432/fitness",
+        "postgresql+asyncpg://user:pw@db:5432/fitness",
+    ),
+    (
+        "postgresql+psycopg2://user:pw@db/fitness",
+        "postgresql+asyncpg://user:pw@db/fitness",
+    ),
+]
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize("url, expected", ASYNC_URLS)
+def test_async_database_url(url, expected):
+    assert async_database_url(url) == expected
+
+
+def test_async_database_url_unsupported():
+    with pytest.raises(ValueError):
+        async_database_url("oracle://scott:tiger@db/fitness")
+
+
+def test_install_replaces_sync_routes():
+    app = FastAPI()
+
+    @app.get("/sets/{set_id}")
+    def read_set(set_id: int):
+        return {}
+
+    @app.get("/")
+    def root():
+        return {}
+
+    async_api.install(app)
+    handlers = {
+        (route.path, method): route.endpoint
+        for route in app.routes
+        if hasattr(route, "methods")
+        for method in route.methods
+    }
+    assert handlers[("/sets/{set_id}", "GET")] is async_api.read_set
+    assert handlers[("/", "GET")] is root
+
+
+def test_async_crud_round_trip(async_client):
+    template = async_client.post("/workout-templates/", json={"name": "Push"}).json()
+    assert template["exercise_templates"] == []
+
+    url = f"/workout-templates/{template['id']}/exercise-templates/"
+    async_client.post(url, json={"name": "Bench Press"})
+    response = async_client.get(f"/workout-templates/{template['id']}")
+    assert [e["name"] for e in response.json()["exercise_templates"]] == ["Bench Press"]
+
+    response = async_client.put(
+        f"/workout-templates/{template['id']}", json={"name": "Push A"}
+    )
+    assert response.json()["name"] == "Push A"
+
+    assert (
+        async_client.delete(f"/workout-templates/{template['id']}").status_code == 204
+    )
+    assert async_client.get(f"/workout-templates/{template['id']}").status_code == 404
+
+
+def test_async_sets_require_exercise(async_client):
+    response = async_client.post("/exercises/1/sets/", json={"reps": 5, "weight": 1})
+    assert response.status_code == 404
+
+
+def test_async_fast_json_reads(async_client, tmp_path, monkeypatch):
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    with sync_engine.begin() as connection:
+        connection.execute(
+            insert(models.Workout),
+            {"id": 1, "name": "Push", "date": date(2026, 1, 15), "user_id": USER_ID},
+        )
+        connection.execute(
+            insert(models.Exercise), {"id": 1, "name": "Dip", "workout_id": 1}
+        )
+        connection.execute(
+            insert(models.Set), {"reps": 5, "weight_kg": 20.0, "exercise_id": 1}
+        )
+    sync_engine.dispose()
+
+    default = async_client.get("/workout/1/exercises/").json()
+    fast_settings = replace(async_api.settings, fast_json=True)
+    monkeypatch.setattr(async_api, "settings", fast_settings)
+    assert async_client.get("/workout/1/exercises/").json() == default
+    assert async_client.get("/exercises/1").json() == default[0]
+    assert async_client.get("/exercises/1/sets/").json() == default[0]["sets"]
+
+
+def test_async_idempotent_create(async_client):
+    headers = {IDEMPOTENCY_HEADER: "a"}
+
+    def post(name):
+        return async_client.post(
+            "/workout-templates/", json={"name": name}, headers=headers
+        )
+
+    first, retry = post("Push"), post("Push")
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert len(async_client.get("/workout-templates/").json()) == 1
+    assert post("Pull").status_code == 422
+
+
+def test_async_updates(async_client, tmp_path):
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    with sync_engine.begin() as connection:
+        connection.execute(
+            insert(models.Workout),
+            {"id": 1, "name": "Push", "date": date(2026, 1, 15), "user_id": USER_ID},
+        )
+        connection.execute(
+            insert(models.Exercise), {"id": 1, "name": "Dip", "workout_id": 1}
+        )
+        connection.execute(
+            insert(models.Set),
+            [{"id": i, "reps": 5, "weight_kg": 20.0, "exercise_id": 1} for i in (1, 2)],
+        )
+    sync_engine.dispose()
+
+    weight = async_client.get("/sets/1").json()["weight"]
+    assert async_client.patch("/sets/1", json={"reps": 8}).json()["weight"] == weight
+    renamed = async_client.patch("/exercises/1", json={"name": "Ring Dip"}).json()
+    assert [s["reps"] for s in renamed["sets"]] == [8, 5]
+    sets = async_client.patch(
+        "/exercises/1/sets/", json=[{"id": 1, "weight": 25.0}, {"id": 2, "reps": 3}]
+    ).json()
+    assert [(s["reps"], s["weight"]) for s in sets] == [(8, 25.0), (3, weight)]
+    assert async_client.patch("/sets/9", json={"reps": 1}).status_code == 404
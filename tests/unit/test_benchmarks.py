@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from benchmarks.run import SCENARIOS, compare, percentile, run_benchmarks
+from benchmarks.search import run_search
+from benchmarks.seed import DatasetSize
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+TINY_DATASET = DatasetSize(
+    users=1,
+    workouts_per_user=3,
+    exercises_per_workout=2,
+    sets_per_exercise=2,
+    templates=2,
+    exercises_per_template=2,
+)
+BASELINE = {"results": {"template_list": {"p95_ms": 10.0, "throughput_rps": 100.0}}}
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_run_benchmarks_reports_every_scenario():
+    report = asyncio.run(run_benchmarks(TINY_DATASET, requests=5, warmup=1))
+    assert set(report["results"]) == set(SCENARIOS)
+    for result in report["results"].values():
+        assert result["requests"] == 5
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+
+
+def test_run_search_times_queries_and_requests():
+    report = asyncio.run(run_search(users=2, exercises=200, requests=5, warmup=1))
+    assert report["exercises"] == 200
+    for result in report["results"].values():
+        assert result["requests"] == 5
+
+
+@pytest.mark.parametrize(
+    "p95_ms, throughput_rps, regressions",
+    [
+        (11.9, 81.0, 0),
+        (12.1, 100.0, 1),
+        (10.0, 79.0, 1),
+        (12.1, 79.0, 2),
+    ],
+)
+def test_compare_flags_regressions_beyond_threshold(
+    p95_ms, throughput_rps, regressions
+):
+    report = {
+        "results": {
+            "template_list": {"p95_ms": p95_ms, "throughput_rps": throughput_rps},
+            "new_endpoint": {"p95_ms": 1000.0, "throughput_rps": 1.0},
+        }
+    }
+    assert len(compare(report, BASELINE, threshold=0.2)) == regressions
+
+
+def test_percentile():
+    assert percentile(range(1, 101), 0.95) == 95
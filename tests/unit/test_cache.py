@@ -0,0 +1,124 @@
+import pytest
+
+from app import cache
+from app.cache import MemoryBackend, ResponseCache
+from app.tenancy import USER_HEADER
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+CACHED_URLS = [
+    "/workout-templates/",
+    "/workout-templates/page",
+    "/workout-templates/1",
+    "/workout-templates/1/exercise-templates/",
+    "/exercise-templates/1",
+]
+
+
+@pytest.fixture
+def template(client):
+    template = client.post("/workout-templates/", json={"name": "Push"}).json()
+    client.post(
+        f"/workout-templates/{template['id']}/exercise-templates/",
+        json={"name": "Bench Press"},
+    )
+    return template
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize("url", CACHED_URLS)
+def test_second_read_skips_database(client, max_queries, template, url):
+    first = client.get(url)
+
+    with max_queries(0):
+        second = client.get(url)
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+@pytest.mark.parametrize("url", CACHED_URLS)
+def test_if_none_match_returns_304(client, template, url):
+    etag = client.get(url).headers["ETag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get(url, headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+
+def test_exercise_template_write_invalidates_parent(client, template):
+    before = client.get("/workout-templates/1").json()
+
+    client.put("/exercise-templates/1", json={"name": "Incline Press"})
+    after = client.get("/workout-templates/1").json()
+    assert before["exercise_templates"][0]["name"] == "Bench Press"
+    assert after["exercise_templates"][0]["name"] == "Incline Press"
+
+    client.delete("/exercise-templates/1")
+    assert client.get("/workout-templates/1/exercise-templates/").json() == []
+    assert client.get("/exercise-templates/1").status_code == 404
+
+
+def test_template_write_invalidates_list(client, template):
+    assert len(client.get("/workout-templates/").json()) == 1
+
+    client.post("/workout-templates/", json={"name": "Pull"})
+    assert len(client.get("/workout-templates/").json()) == 2
+
+    client.delete("/workout-templates/1")
+    assert [t["name"] for t in client.get("/workout-templates/").json()] == ["Pull"]
+
+
+def test_memory_backend_lru_eviction():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+
+    assert backend.get("a") == b"1"
+    assert backend.get("b") is None
+    assert backend.get("c") == b"3"
+
+
+def test_memory_backend_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    backend = MemoryBackend()
+    backend.set("a", b"1", ttl=10)
+
+    now[0] += 9
+    assert backend.get("a") == b"1"
+    now[0] += 2
+    assert backend.get("a") is None
+
+
+def test_shared_backend_invalidates_every_worker():
+    """Two workers sharing one backend see each other's invalidations"""
+    shared = MemoryBackend()
+    worker_a, worker_b = ResponseCache(shared), ResponseCache(shared)
+
+    generation = worker_b.generation("templates:1")
+    shared.incr("templates:1:generation")
+    assert worker_a.generation("templates:1") == generation + 1
+
+
+def test_template_write_keeps_other_users_entries(client, max_queries, template):
+    """A template write only invalidates the writer's cached templates"""
+    other = {
+        USER_HEADER: str(client.post("/users/", json={"username": "b"}).json()["id"])
+    }
+    client.get("/workout-templates/")
+    client.post("/workout-templates/", json={"name": "Pull"}, headers=other)
+
+    with max_queries(0):
+        assert client.get("/workout-templates/").status_code == 200
+    listed = client.get("/workout-templates/", headers=other).json()
+    assert [t["name"] for t in listed] == ["Pull"]
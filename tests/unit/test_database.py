@@ -0,0 +1,76 @@
+import pytest
+
+from app.config import Settings
+from app.database import create_db_engine, describe_engine, engine_options
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+CONFIG = Settings(
+    pool_size=3,
+    max_overflow=2,
+    pool_pre_ping=True,
+    sqlite_mmap_size=1024 * 1024,
+    sqlite_cache_size=-2000,
+    sqlite_busy_timeout=1234,
+)
+
+# (PRAGMA, Expected value read back from the connection)
+EXPECTED_PRAGMAS = [
+    ("journal_mode", "wal"),
+    ("synchronous", 1),  # NORMAL
+    ("mmap_size", 1024 * 1024),
+    ("cache_size", -2000),
+    ("temp_store", 2),  # MEMORY
+    ("busy_timeout", 1234),
+    ("foreign_keys", 1),
+]
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", CONFIG)
+    yield engine
+    engine.dispose()
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://db/fitness")
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "FULL")
+
+    config = Settings.from_env()
+    assert config.database_url == "postgresql://db/fitness"
+    assert config.pool_size == 20
+    assert config.pool_pre_ping is True
+    assert config.sqlite_synchronous == "FULL"
+    assert config.max_overflow == Settings.max_overflow
+
+
+def test_engine_options_memory_sqlite_skips_pool_sizing():
+    options = engine_options("sqlite://", CONFIG)
+    assert "pool_size" not in options
+    assert options["pool_pre_ping"] is True
+
+
+def test_engine_options_file_sqlite_sets_pool_sizing():
+    options = engine_options("sqlite:///./fitness.db", CONFIG)
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 2
+
+
+@pytest.mark.parametrize("pragma, expected", EXPECTED_PRAGMAS)
+def test_sqlite_pragmas_applied(file_engine, pragma, expected):
+    with file_engine.connect() as connection:
+        assert connection.exec_driver_sql(f"PRAGMA {pragma}").scalar() == expected
+
+
+def test_describe_engine(file_engine):
+    description = describe_engine(file_engine, CONFIG)
+    assert "pool=QueuePool" in description
+    assert "pool_size=3" in description
+    assert "journal_mode=wal" in description
@@ -0,0 +1,150 @@
+import pytest
+
+from datetime import date
+from app import analytics, models
+from app.tenancy import USER_HEADER
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+CHILD_COUNTS = [1, 50]
+# Statements per delete, independent of the number of children
+TEMPLATE_DELETE_QUERIES = 1
+# Summary key, DELETE, and the summary refresh (DELETE and INSERT)
+EXERCISE_DELETE_QUERIES = 4
+SET_DELETE_QUERIES = 4
+WORKOUT_DAYS = [date(2026, 1, day) for day in (1, 2, 3, 4)]
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def seed_template(db, exercises):
+    template = models.WorkoutTemplate(
+        name="Push",
+        exercise_templates=[
+            models.ExerciseTemplate(name=f"Exercise {i}") for i in range(exercises)
+        ],
+        user_id=USER_ID,
+    )
+    db.add(template)
+    db.commit()
+    return template.id
+
+
+def seed_workout(db, day, sets=2, user_id=USER_ID, workout_template_id=None):
+    workout = models.Workout(
+        name="Push",
+        date=day,
+        exercises=[
+            models.Exercise(
+                name="Bench Press",
+                sets=[models.Set(reps=5, weight_kg=100.0) for _ in range(sets)],
+            )
+        ],
+        user_id=user_id,
+        workout_template_id=workout_template_id,
+    )
+    db.add(workout)
+    db.commit()
+    return workout.id
+
+
+def count(db, model):
+    return db.query(model).count()
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize("children", CHILD_COUNTS)
+def test_delete_workout_template_cascades(client, db, max_queries, children):
+    template_id = seed_template(db, children)
+    workout_id = seed_workout(db, WORKOUT_DAYS[0], workout_template_id=template_id)
+
+    with max_queries(TEMPLATE_DELETE_QUERIES):
+        response = client.delete(f"/workout-templates/{template_id}")
+
+    assert response.status_code == 204
+    assert count(db, models.ExerciseTemplate) == 0
+    assert db.get(models.Workout, workout_id).workout_template_id is None
+
+
+def test_delete_exercise_template(client, db):
+    template_id = seed_template(db, 2)
+    exercise_template_id = (
+        db.get(models.WorkoutTemplate, template_id).exercise_templates[0].id
+    )
+    response = client.delete(f"/exercise-templates/{exercise_template_id}")
+    assert response.status_code == 204
+    assert count(db, models.ExerciseTemplate) == 1
+
+
+@pytest.mark.parametrize("children", CHILD_COUNTS)
+def test_delete_exercise_cascades(client, db, max_queries, children):
+    seed_workout(db, WORKOUT_DAYS[0], sets=children)
+
+    with max_queries(EXERCISE_DELETE_QUERIES):
+        response = client.delete("/exercises/1")
+
+    assert response.status_code == 204
+    assert count(db, models.Set) == 0
+    assert count(db, models.ExerciseDailySummary) == 0
+
+
+def test_delete_set_refreshes_summary(client, db, max_queries):
+    seed_workout(db, WORKOUT_DAYS[0], sets=2)
+
+    with max_queries(SET_DELETE_QUERIES):
+        response = client.delete("/sets/1")
+
+    assert response.status_code == 204
+    progression = client.get("/analytics/exercises/Bench Press/progression").json()
+    assert progression["points"][0]["set_count"] == 1
+
+
+@pytest.mark.parametrize(
+    "path", ["/workout-templates/{id}", "/exercise-templates/{id}", "/exercises/{id}"]
+)
+def test_delete_of_other_user_not_found(client, db, path):
+    other = client.post("/users/", json={"username": "other"}).json()["id"]
+    headers = {USER_HEADER: str(other)}
+    seed_template(db, 1)
+    seed_workout(db, WORKOUT_DAYS[0])
+
+    assert client.delete(path.format(id=1), headers=headers).status_code == 404
+    assert client.delete("/sets/1", headers=headers).status_code == 404
+    assert count(db, models.ExerciseTemplate) == count(db, models.Exercise) == 1
+    assert count(db, models.Set) == 2
+
+
+def test_bulk_delete_workouts_by_date(client, db):
+    other = client.post("/users/", json={"username": "other"}).json()["id"]
+    for day in WORKOUT_DAYS:
+        seed_workout(db, day)
+    seed_workout(db, WORKOUT_DAYS[1], user_id=other)
+    analytics.rebuild_summaries(db)
+
+    response = client.delete(
+        "/workouts/", params={"start": "2026-01-02", "end": "2026-01-03"}
+    )
+
+    assert response.json() == {"deleted": 2}
+    remaining = db.query(models.Workout).filter_by(user_id=USER_ID).all()
+    assert [w.date for w in remaining] == [WORKOUT_DAYS[0], WORKOUT_DAYS[3]]
+    assert count(db, models.Exercise) == 3
+    assert count(db, models.Set) == 3 * 2
+    summaries = db.query(models.ExerciseDailySummary).order_by("user_id", "date")
+    assert [(s.user_id, s.date) for s in summaries] == [
+        (USER_ID, WORKOUT_DAYS[0]),
+        (USER_ID, WORKOUT_DAYS[3]),
+        (other, WORKOUT_DAYS[1]),
+    ]
+
+
+def test_bulk_delete_workouts_rejects_reversed_range(client):
+    response = client.delete(
+        "/workouts/", params={"start": "2026-01-03", "end": "2026-01-02"}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,133 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from datetime import date
+from app import models
+from app.export import EXPORT_COLUMNS, accepts_gzip, chunked
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+PLAIN = {"Accept-Encoding": "identity"}
+DATE_RANGES = [
+    ({}, ["Push", "Pull", "Legs", "Rest"]),
+    ({"start": "2026-01-02"}, ["Pull", "Legs", "Rest"]),
+    ({"end": "2026-01-02"}, ["Push", "Pull"]),
+    ({"start": "2026-01-02", "end": "2026-01-02"}, ["Pull"]),
+]
+ACCEPT_ENCODINGS = [
+    (None, False),
+    ("identity", False),
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, GZIP;q=0.5", True),
+    ("gzip;q=0", False),
+]
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def seed_history(db):
+    for day, name in enumerate(["Push", "Pull", "Legs"], start=1):
+        db.add(
+            models.Workout(
+                name=name,
+                date=date(2026, 1, day),
+                exercises=[
+                    models.Exercise(
+                        name=f"{name} {i}",
+                        sets=[
+                            models.Set(reps=5, weight_kg=100.0 + j) for j in range(2)
+                        ],
+                    )
+                    for i in range(2)
+                ],
+                user_id=USER_ID,
+            )
+        )
+    db.add(models.Workout(name="Rest", date=date(2026, 1, 4), user_id=USER_ID))
+    db.commit()
+
+
+def read_ndjson(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def workout_names(rows):
+    return list(dict.fromkeys(row["workout_name"] for row in rows))
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_export_ndjson(client, db):
+    seed_history(db)
+    response = client.get("/export/workouts", headers=PLAIN)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+
+    rows = read_ndjson(response.text)
+    assert len(rows) == 3 * 2 * 2 + 1
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert rows[0]["workout_date"] == "2026-01-01"
+    assert rows[-1] | {"workout_id": None} == dict.fromkeys(EXPORT_COLUMNS) | {
+        "workout_name": "Rest",
+        "workout_date": "2026-01-04",
+    }
+
+
+def test_export_csv(client, db):
+    seed_history(db)
+    response = client.get("/export/workouts?format=csv", headers=PLAIN)
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="workouts.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 13
+    assert rows[0]["exercise_name"] == "Push 0"
+    assert rows[0]["weight"] == "100.0"
+
+
+@pytest.mark.parametrize("params, expected", DATE_RANGES)
+def test_export_date_range(client, db, params, expected):
+    seed_history(db)
+    response = client.get("/export/workouts", params=params, headers=PLAIN)
+    assert workout_names(read_ndjson(response.text)) == expected
+
+
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+def test_export_gzip(client, db, format):
+    seed_history(db)
+    plain = client.get("/export/workouts", params={"format": format}, headers=PLAIN)
+    with client.stream(
+        "GET",
+        "/export/workouts",
+        params={"format": format},
+        headers={"Accept-Encoding": "gzip"},
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        # httpx decodes bodies transparently, so read the raw stream
+        body = b"".join(response.iter_raw())
+    assert gzip.decompress(body) == plain.content
+
+
+def test_export_empty(client):
+    response = client.get("/export/workouts?format=csv", headers=PLAIN)
+    assert response.text.strip() == ",".join(EXPORT_COLUMNS)
+
+
+@pytest.mark.parametrize("header, expected", ACCEPT_ENCODINGS)
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def test_chunked_joins_lines_up_to_size():
+    chunks = list(chunked(["aaa\n", "bb\n", "c\n", "d\n"], size=6))
+    assert chunks == [b"aaa\nbb\n", b"c\nd\n"]
@@ -0,0 +1,114 @@
+import pytest
+
+from dataclasses import replace
+from datetime import date
+from app import async_api, main, models
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+READ_PATHS = [
+    "/workouts/?include_stats=true",
+    "/workouts/{workout_id}/tree",
+    "/workouts/trees?ids={workout_id}&ids=999",
+    "/workout/{workout_id}/exercises/",
+    "/exercises/{exercise_id}",
+    "/exercises/{exercise_id}/sets/",
+    "/analytics/exercises/Bench Press/progression",
+]
+MISSING_PATHS = [
+    "/workouts/999/tree",
+    "/workout/999/exercises/",
+    "/exercises/999",
+    "/exercises/999/sets/",
+]
+WORKOUT_LOG = {
+    "name": "Push Day",
+    "date": "2026-01-15T18:00:00",
+    "exercises": [{"name": "Bench Press", "sets": [{"reps": 5, "weight": 100.0}]}],
+}
+FAST_EXERCISE_LIST_QUERIES = 1
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+@pytest.fixture
+def fast_json(monkeypatch):
+    def _fast_json(enabled=True):
+        fast_settings = replace(main.settings, fast_json=enabled)
+        monkeypatch.setattr(main, "settings", fast_settings)
+        monkeypatch.setattr(async_api, "settings", fast_settings)
+
+    return _fast_json
+
+
+def without_ids(value):
+    if isinstance(value, list):
+        return [without_ids(item) for item in value]
+    if isinstance(value, dict):
+        return {k: without_ids(v) for k, v in value.items() if not k.endswith("id")}
+    return value
+
+
+def seed_workout(db):
+    workout = models.Workout(
+        name="Push Day",
+        date=date(2026, 1, 15),
+        exercises=[
+            models.Exercise(
+                name=name,
+                sets=[models.Set(reps=5 + i, weight_kg=100.0 + i) for i in range(3)],
+            )
+            for name in ["Bench Press", "Dip"]
+        ],
+        user_id=USER_ID,
+    )
+    db.add(workout)
+    db.commit()
+    return {"workout_id": workout.id, "exercise_id": workout.exercises[0].id}
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize("path", READ_PATHS)
+def test_fast_json_matches_default_response(client, db, fast_json, path):
+    client.post("/workouts/log", json=WORKOUT_LOG)
+    url = path.format(**seed_workout(db))
+    default = client.get(url)
+    fast_json()
+    fast = client.get(url)
+    assert fast.status_code == default.status_code == 200
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.json() == default.json()
+
+
+@pytest.mark.parametrize("path", MISSING_PATHS)
+def test_fast_json_missing_parent_is_404(client, fast_json, path):
+    fast_json()
+    assert client.get(path).status_code == 404
+
+
+def test_fast_json_workout_log(client, fast_json):
+    default = client.post("/workouts/log", json=WORKOUT_LOG)
+    fast_json()
+    fast = client.post("/workouts/log", json=WORKOUT_LOG)
+    assert fast.status_code == default.status_code == 201
+    assert without_ids(fast.json()) == without_ids(default.json())
+
+
+def test_fast_json_exercise_list_query_count(client, db, fast_json, max_queries):
+    ids = seed_workout(db)
+    fast_json()
+    with max_queries(FAST_EXERCISE_LIST_QUERIES):
+        response = client.get(f"/workout/{ids['workout_id']}/exercises/")
+    assert [len(exercise["sets"]) for exercise in response.json()] == [3, 3]
+
+
+def test_fast_json_keeps_openapi_schema(client, fast_json, monkeypatch):
+    default = client.get("/openapi.json").json()
+    fast_json()
+    monkeypatch.setattr(main.app, "openapi_schema", None)
+    assert client.get("/openapi.json").json() == default
@@ -0,0 +1,222 @@
+import threading
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+
+from app import crud, idempotency, main, models, schemas
+from app.config import settings
+from app.idempotency import IDEMPOTENCY_HEADER, REPLAYED_HEADER, digest, utcnow
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+SET = {"reps": 5, "weight": 100.0}
+LOG = {"name": "Legs", "exercises": [{"name": "Squat", "sets": [SET]}]}
+
+
+def keyed(key):
+    return {IDEMPOTENCY_HEADER: key}
+
+
+@pytest.fixture
+def exercise_id(db):
+    workout = models.Workout(
+        name="Push",
+        date=date(2026, 1, 15),
+        exercises=[models.Exercise(name="Bench Press")],
+        user_id=USER_ID,
+    )
+    db.add(workout)
+    db.commit()
+    return workout.exercises[0].id
+
+
+def set_count(db):
+    return db.query(models.Set).count()
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_retry_replays_response(client, db, exercise_id):
+    url = f"/exercises/{exercise_id}/sets/"
+    first = client.post(url, json=SET, headers=keyed("a"))
+    retry = client.post(url, json=SET, headers=keyed("a"))
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert REPLAYED_HEADER not in first.headers
+    assert set_count(db) == 1
+
+    assert client.post(url, json=SET, headers=keyed("b")).status_code == 201
+    assert client.post(url, json=SET).status_code == 201
+    assert set_count(db) == 3
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/users/", {"username": "lifter"}),
+        ("/workout-templates/", {"name": "Push"}),
+        ("/workouts/log", LOG),
+        ("/workout/{workout_id}/exercises/", {"name": "Dip"}),
+    ],
+)
+def test_create_endpoints_replay(client, db, exercise_id, path, body):
+    workout_id = db.get(models.Exercise, exercise_id).workout_id
+    url = path.format(workout_id=workout_id)
+    first = client.post(url, json=body, headers=keyed("k"))
+    retry = client.post(url, json=body, headers=keyed("k"))
+    assert first.status_code == 201
+    assert retry.json() == first.json()
+
+
+def test_key_reused_for_other_request(client, exercise_id):
+    url = f"/exercises/{exercise_id}/sets/"
+    client.post(url, json=SET, headers=keyed("a"))
+    response = client.post(url, json={**SET, "reps": 6}, headers=keyed("a"))
+    assert response.status_code == 422
+
+
+def test_keys_are_per_user(client, db, exercise_id):
+    other = client.post("/users/", json={"username": "other"}).json()["id"]
+    client.post("/workout-templates/", json={"name": "Push"}, headers=keyed("a"))
+    response = client.post(
+        "/workout-templates/",
+        json={"name": "Push"},
+        headers={**keyed("a"), "X-User-Id": str(other)},
+    )
+    assert response.status_code == 201
+    assert REPLAYED_HEADER not in response.headers
+    assert db.query(models.WorkoutTemplate).count() == 2
+
+
+def test_failed_create_releases_key(client, db, exercise_id):
+    response = client.post("/exercises/999/sets/", json=SET, headers=keyed("a"))
+    assert response.status_code == 404
+    assert db.query(models.IdempotencyKey).count() == 0
+
+
+def test_expired_keys_evicted(client, db, exercise_id):
+    db.add(
+        models.IdempotencyKey(
+            key=b"old",
+            fingerprint=b"",
+            status_code=201,
+            body=b"{}",
+            expires_at=utcnow() - timedelta(seconds=1),
+        )
+    )
+    db.commit()
+
+    client.post(f"/exercises/{exercise_id}/sets/", json=SET, headers=keyed("a"))
+    db.expire_all()
+    assert db.get(models.IdempotencyKey, b"old") is None
+    assert db.query(models.IdempotencyKey).count() == 1
+
+
+def test_claim_of_other_worker_in_progress(client, db, exercise_id):
+    url = f"/exercises/{exercise_id}/sets/"
+    db.add(
+        models.IdempotencyKey(
+            key=digest(USER_ID, "a"),
+            fingerprint=digest("POST", url, schemas.SetCreate(**SET).model_dump_json()),
+            expires_at=utcnow() + timedelta(minutes=1),
+        )
+    )
+    db.commit()
+
+    assert client.post(url, json=SET, headers=keyed("a")).status_code == 409
+    assert set_count(db) == 0
+
+
+def test_stale_claim_taken_over(client, db, exercise_id):
+    """A claim whose worker died before storing a response is not kept for
+    the whole TTL"""
+    url = f"/exercises/{exercise_id}/sets/"
+    db.add(
+        models.IdempotencyKey(
+            key=digest(USER_ID, "a"),
+            fingerprint=digest("POST", url, schemas.SetCreate(**SET).model_dump_json()),
+            expires_at=utcnow() - timedelta(seconds=1),
+        )
+    )
+    db.commit()
+
+    before = utcnow()
+    assert client.post(url, json=SET, headers=keyed("a")).status_code == 201
+    assert set_count(db) == 1
+    db.expire_all()
+    row = db.get(models.IdempotencyKey, digest(USER_ID, "a"))
+    assert row.status_code == 201
+    assert row.expires_at >= before + timedelta(seconds=settings.idempotency_ttl)
+
+
+def test_claim_leased_until_stored(client, db, exercise_id, monkeypatch):
+    leases, create_set = [], crud.create_set
+
+    def leased_create_set(**kwargs):
+        leases.append(db.query(models.IdempotencyKey.expires_at).scalar())
+        return create_set(**kwargs)
+
+    monkeypatch.setattr(main.crud, "create_set", leased_create_set)
+    before = utcnow()
+    client.post(f"/exercises/{exercise_id}/sets/", json=SET, headers=keyed("a"))
+    lease = timedelta(seconds=settings.idempotency_lease)
+    assert before + lease <= leases[0] <= utcnow() + lease
+
+
+def test_claim_completed_with_create(client, db, exercise_id, monkeypatch):
+    """A worker dying between the create and storing its response leaves the
+    key claimed past the lease, so a retry cannot apply the create again"""
+    monkeypatch.setattr(idempotency, "settings", replace(settings, idempotency_lease=0))
+
+    def die(*args):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(idempotency.Idempotent, "store", die)
+    url = f"/exercises/{exercise_id}/sets/"
+    with pytest.raises(RuntimeError):
+        client.post(url, json=SET, headers=keyed("a"))
+    assert set_count(db) == 1
+
+    assert client.post(url, json=SET, headers=keyed("a")).status_code == 409
+    assert set_count(db) == 1
+
+
+def test_concurrent_requests_coalesced(client, db, exercise_id, monkeypatch):
+    """A request arriving while another with its key runs replays its result"""
+    entered, proceed = threading.Event(), threading.Event()
+    calls, create_set = [], crud.create_set
+
+    def slow_create_set(**kwargs):
+        calls.append(kwargs)
+        entered.set()
+        proceed.wait(5)
+        return create_set(**kwargs)
+
+    monkeypatch.setattr(main.crud, "create_set", slow_create_set)
+    url = f"/exercises/{exercise_id}/sets/"
+    responses = []
+
+    def post():
+        responses.append(client.post(url, json=SET, headers=keyed("a")))
+
+    leader = threading.Thread(target=post)
+    leader.start()
+    assert entered.wait(5)
+    follower = threading.Thread(target=post)
+    follower.start()
+    follower.join(0.2)
+    assert follower.is_alive()  # waiting for the leader
+    proceed.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(calls) == 1
+    assert [r.status_code for r in responses] == [201, 201]
+    assert responses[0].json() == responses[1].json()
+    assert set_count(db) == 1
@@ -0,0 +1,175 @@
+import gzip
+import json
+
+import pytest
+
+from app import importer, models
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+HISTORY_CSV = """workout_name,workout_date,exercise_name,reps,weight
+Push,2026-01-01,Bench Press,5,100
+Push,2026-01-01,Bench Press,5,105
+Push,2026-01-01,Dip,10,0
+Pull,2026-01-02,Barbell Row,8,80
+Rest,2026-01-03,,,
+"""
+HISTORY_NDJSON = "\n".join(
+    json.dumps(row)
+    for row in [
+        {
+            "workout_id": 7,
+            "workout_name": "Legs",
+            "workout_date": "2026-01-04",
+            "exercise_id": 1,
+            "exercise_name": "Squat",
+            "reps": 5,
+            "weight": 140.0,
+        },
+        {
+            "workout_id": 7,
+            "workout_name": "Legs",
+            "workout_date": "2026-01-04",
+            "exercise_id": 2,
+            "exercise_name": "Squat",
+            "reps": 3,
+            "weight": 150.0,
+        },
+    ]
+)
+INVALID_ROWS = [
+    ("Push,2026-01-01,Bench Press,0,100", ["reps"]),
+    ("Push,2026-01-01,Bench Press,five,-1", ["reps", "weight"]),
+    ("Push,,Bench Press,5,100", ["workout_date"]),
+    ("Push,2026-01-01,,5,100", ["exercise_name"]),
+]
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def import_body(client, body, format="csv", headers=None):
+    response = client.post(
+        "/import/workouts", params={"format": format}, content=body, headers=headers
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def export_rows(client):
+    response = client.get("/export/workouts", headers={"Accept-Encoding": "identity"})
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def without_ids(row):
+    return {k: v for k, v in row.items() if not k.endswith("id")}
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_import_csv(client, db):
+    events = import_body(client, HISTORY_CSV)
+    assert events[-1] == {
+        "event": "done",
+        "rows": 5,
+        "workouts": 3,
+        "exercises": 3,
+        "sets": 4,
+        "errors": 0,
+    }
+    rows = export_rows(client)
+    assert [(r["workout_name"], r["exercise_name"], r["reps"]) for r in rows] == [
+        ("Push", "Bench Press", 5),
+        ("Push", "Bench Press", 5),
+        ("Push", "Dip", 10),
+        ("Pull", "Barbell Row", 8),
+        ("Rest", None, None),
+    ]
+
+
+def test_import_ndjson_groups_by_source_ids(client, db):
+    events = import_body(client, HISTORY_NDJSON, format="ndjson")
+    assert events[-1]["workouts"] == 1
+    assert events[-1]["exercises"] == 2
+
+
+def test_import_round_trips_export(client, db):
+    import_body(client, HISTORY_CSV)
+    before = [without_ids(row) for row in export_rows(client)]
+    exported = client.get("/export/workouts?format=csv").text
+    for model in (models.Set, models.Exercise, models.Workout):
+        db.query(model).delete()
+    db.commit()
+    import_body(client, exported)
+    assert [without_ids(row) for row in export_rows(client)] == before
+
+
+@pytest.mark.parametrize("line, fields", INVALID_ROWS)
+def test_import_reports_invalid_rows(client, db, line, fields):
+    events = import_body(client, HISTORY_CSV + line + "\n")
+    errors = [event for event in events if event["event"] == "error"]
+    assert [error["row"] for error in errors] == [6]
+    assert [e["field"] for e in errors[0]["errors"]] == fields
+    assert events[-1]["sets"] == 4
+    assert events[-1]["errors"] == 1
+
+
+def test_import_invalid_json_line(client, db):
+    events = import_body(client, HISTORY_NDJSON + "\n{not json\n[]", format="ndjson")
+    assert [event["row"] for event in events if event["event"] == "error"] == [3, 4]
+    assert events[-1]["sets"] == 2
+
+
+def test_import_workout_spanning_batches(client, db, monkeypatch):
+    monkeypatch.setattr(importer, "IMPORT_BATCH_SIZE", 2)
+    events = import_body(client, HISTORY_CSV)
+    progress = [event for event in events if event["event"] == "progress"]
+    assert [event["rows"] for event in progress] == [2, 4]
+    assert events[-1]["workouts"] == 3
+    assert events[-1]["exercises"] == 3
+
+
+def test_import_gzip_body(client, db):
+    events = import_body(
+        client,
+        gzip.compress(HISTORY_CSV.encode()),
+        headers={"Content-Encoding": "gzip"},
+    )
+    assert events[-1]["sets"] == 4
+
+
+def test_import_refreshes_summaries(client, db):
+    import_body(client, HISTORY_CSV)
+    response = client.get("/analytics/exercises/Bench Press/progression")
+    [point] = response.json()["points"]
+    assert point["set_count"] == 2
+    assert point["max_weight"] == 105.0
+
+
+def test_import_nested_values(client, db):
+    nested = json.dumps({"workout_name": "Push", "exercise_name": {"a": 1}})
+    events = import_body(client, HISTORY_NDJSON + "\n" + nested, format="ndjson")
+    [error] = [event for event in events if event["event"] == "error"]
+    assert error["row"] == 3
+    assert [e["field"] for e in error["errors"]] == ["exercise_name"]
+    assert events[-1]["sets"] == 2
+    assert events[-1]["errors"] == 1
+
+
+@pytest.mark.parametrize(
+    "body, headers",
+    [
+        (HISTORY_CSV.encode(), {"Content-Encoding": "gzip"}),
+        (gzip.compress(HISTORY_CSV.encode())[:-12], {"Content-Encoding": "gzip"}),
+        (HISTORY_CSV.encode() + b"Push,2026-01-09,Bench \xff,5,100\n", None),
+    ],
+    ids=["not-gzip", "truncated-gzip", "not-utf8"],
+)
+def test_import_unreadable_body(client, db, body, headers):
+    events = import_body(client, body, headers=headers)
+    assert events[-2]["event"] == "error"
+    assert events[-2]["errors"][0]["message"].startswith("Unreadable file")
+    assert events[-1]["event"] == "done"
+    assert events[-1]["errors"] == 1
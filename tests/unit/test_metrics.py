@@ -0,0 +1,93 @@
+import logging
+import pytest
+import re
+
+from datetime import date
+from app import metrics, models
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+TREE_ROUTE = 'method="GET",route="/workouts/{workout_id}/tree"'
+SERVER_TIMING = re.compile(r'^db;dur=[\d.]+;desc="1 statements", app;dur=[\d.]+$')
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+@pytest.fixture
+def instrumented(engine):
+    """Instrument the test engine, logging every statement as slow"""
+    metrics.registry.clear()
+    metrics.instrument_engine(engine, slow_query_seconds=0.0)
+    yield metrics.registry
+    metrics.registry.clear()
+
+
+def seed_workout(db):
+    workout = models.Workout(name="Push", date=date(2026, 1, 15), user_id=USER_ID)
+    db.add(workout)
+    db.commit()
+    return workout.id
+
+
+def sample(text, name, labels):
+    match = re.search(rf"^{re.escape(name + '{' + labels + '}')} (\S+)$", text, re.M)
+    assert match, f"{name}{{{labels}}} not found in:\n{text}"
+    return float(match.group(1))
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_metrics_per_route_template(client, db, instrumented):
+    workout_id = seed_workout(db)
+    for path in (f"/workouts/{workout_id}/tree", "/workouts/999/tree"):
+        client.get(path)
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    text = response.text
+    assert str(workout_id) + "/tree" not in text
+    for status in (200, 404):
+        labels = f'{TREE_ROUTE},status="{status}"'
+        assert sample(text, "fitness_http_requests_total", labels) == 1
+    assert sample(text, "fitness_db_statements_total", TREE_ROUTE) == 2
+    assert sample(text, "fitness_db_duration_seconds_total", TREE_ROUTE) > 0
+    histogram = "fitness_http_request_duration_seconds"
+    assert sample(text, histogram + "_count", TREE_ROUTE) == 2
+    assert sample(text, histogram + "_bucket", TREE_ROUTE + ',le="+Inf"') == 2
+    # The /metrics request itself is still in flight while it renders
+    assert sample(text, "fitness_http_requests_in_flight", TREE_ROUTE) == 0
+    metrics_route = 'method="GET",route="/metrics"'
+    assert sample(text, "fitness_http_requests_in_flight", metrics_route) == 1
+
+
+def test_unmatched_routes_share_a_label(client, instrumented):
+    for path in ("/nope/1", "/nope/2"):
+        assert client.get(path).status_code == 404
+    assert client.delete("/metrics").status_code == 405
+    text = instrumented.render()
+    labels = 'method="GET",route="unmatched",status="404"'
+    assert sample(text, "fitness_http_requests_total", labels) == 2
+    labels = 'method="DELETE",route="/metrics",status="405"'
+    assert sample(text, "fitness_http_requests_total", labels) == 1
+
+
+def test_server_timing_header(client, db, instrumented):
+    workout_id = seed_workout(db)
+    response = client.get(f"/workouts/{workout_id}/tree")
+    assert SERVER_TIMING.match(response.headers["server-timing"])
+
+
+def test_slow_query_log_names_route(client, db, instrumented, caplog):
+    workout_id = seed_workout(db)
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"):
+        client.get(f"/workouts/{workout_id}/tree")
+    [message] = [
+        r.getMessage() for r in caplog.records if "GET /workouts/" in r.getMessage()
+    ]
+    assert message.startswith("Slow query")
+    assert "GET /workouts/{workout_id}/tree" in message
+    assert "FROM workout" in message
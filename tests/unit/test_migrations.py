@@ -0,0 +1,180 @@
+import pytest
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, insert, inspect
+from sqlalchemy.orm import Session
+from app import models, search
+from app.config import settings
+from app.database import create_db_engine
+from app.migrations import BASELINE_REVISION, upgrade_database
+from app.units import KG_PER_LB
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+FOREIGN_KEY_INDEXES = [
+    ("exercise_templates", ["workout_template_id", "id"]),
+    ("exercises", ["workout_id", "id"]),
+    ("report_jobs", ["user_id", "id"]),
+    ("sets", ["exercise_id", "id"]),
+    ("workout", ["workout_template_id", "date"]),
+    ("workout", ["user_id", "date"]),
+    ("workout_templates", ["user_id", "id"]),
+]
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def schema_diff(engine):
+    with engine.connect() as connection:
+        context = MigrationContext.configure(
+            connection, opts={"include_name": search.include_name}
+        )
+        return compare_metadata(context, models.Base.metadata)
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_migrations_match_models(file_engine):
+    """Upgrading an empty database yields exactly the schema in app.models"""
+    upgrade_database(file_engine)
+    assert schema_diff(file_engine) == []
+
+
+@pytest.mark.parametrize("table, columns", FOREIGN_KEY_INDEXES)
+def test_foreign_keys_indexed(file_engine, table, columns):
+    upgrade_database(file_engine)
+    indexes = inspect(file_engine).get_indexes(table)
+    assert columns in [index["column_names"] for index in indexes]
+
+
+def test_upgrade_database_created_by_create_all(file_engine):
+    """Pre-migration databases are stamped at the baseline, then upgraded"""
+    # The baseline revision recreates the tables create_all used to build;
+    # models.Base can no longer be used as later revisions changed them
+    upgrade_database(file_engine, BASELINE_REVISION)
+    with file_engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+
+    upgrade_database(file_engine)
+    assert schema_diff(file_engine) == []
+
+
+def test_upgrade_is_idempotent(file_engine):
+    upgrade_database(file_engine)
+    upgrade_database(file_engine)
+    assert schema_diff(file_engine) == []
+
+
+def test_users_backfill_existing_rows(file_engine):
+    """Rows from before users existed are assigned to a default user"""
+    upgrade_database(file_engine, "0005")
+    with file_engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO workout_templates (id, name) VALUES (1, 'Push')"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO workout (id, name, date) VALUES (1, 'Push', '2026-01-15')"
+        )
+
+    upgrade_database(file_engine)
+    with file_engine.connect() as connection:
+        users = connection.exec_driver_sql("SELECT id, name FROM users").all()
+        owners = connection.exec_driver_sql(
+            "SELECT user_id FROM workout_templates "
+            "UNION ALL SELECT user_id FROM workout"
+        ).all()
+    assert users == [(1, "default")]
+    assert owners == [(1,), (1,)]
+    assert schema_diff(file_engine) == []
+
+
+def test_weights_converted_to_kilograms(file_engine):
+    """Weights are taken to be in their owner's unit and stored in kilograms"""
+    upgrade_database(file_engine, "0006")
+    with file_engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, name, default_measurement) "
+            "VALUES (1, 'imperial', 'lbs'), (2, 'metric', 'kgs')"
+        )
+        for user_id in (1, 2):
+            connection.exec_driver_sql(
+                "INSERT INTO workout (id, name, date, user_id) "
+                "VALUES (?, 'Push', '2026-01-15', ?)",
+                (user_id, user_id),
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO exercises (id, name, workout_id) "
+                "VALUES (?, 'Bench Press', ?)",
+                (user_id, user_id),
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO sets (reps, weight, exercise_id) VALUES (5, 100.0, ?)",
+                (user_id,),
+            )
+
+    upgrade_database(file_engine)
+    with file_engine.connect() as connection:
+        weights = connection.exec_driver_sql(
+            "SELECT weight_kg FROM sets ORDER BY exercise_id"
+        ).all()
+    assert weights == [(pytest.approx(100 * KG_PER_LB),), (100.0,)]
+
+
+def test_upgrade_keeps_children_with_foreign_keys_enforced(tmp_path):
+    """Batch mode drops the tables it copies; that must not cascade to children"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'enforced.db'}", settings)
+    upgrade_database(engine, "0008")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, name, default_measurement) "
+            "VALUES (1, 'lifter', 'kgs')"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO workout (id, name, date, user_id) "
+            "VALUES (1, 'Push', '2026-01-15', 1)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO exercises (id, name, workout_id) VALUES (1, 'Dip', 1)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO sets (reps, weight_kg, exercise_id) VALUES (5, 20.0, 1)"
+        )
+
+    upgrade_database(engine)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+        assert connection.exec_driver_sql("SELECT count(*) FROM sets").scalar() == 1
+        connection.exec_driver_sql("DELETE FROM workout")
+        assert connection.exec_driver_sql("SELECT count(*) FROM sets").scalar() == 0
+    engine.dispose()
+
+
+def test_exercise_names_backfilled_and_searchable(file_engine):
+    upgrade_database(file_engine, "0009")
+    with file_engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, name, default_measurement) "
+            "VALUES (1, 'lifter', 'kgs')"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO workout (id, name, date, user_id) "
+            "VALUES (1, 'Push', '2026-01-15', 1)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO exercises (name, workout_id) "
+            "VALUES ('Bench Press', 1), ('Bench Press', 1)"
+        )
+
+    upgrade_database(file_engine)
+    with Session(file_engine) as db:
+        db.execute(insert(models.Exercise), [{"name": "Bench Press", "workout_id": 1}])
+        db.commit()
+        assert search.search_exercise_names(db, 1, "bench") == [("Bench Press", 3, 0)]
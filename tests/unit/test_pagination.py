@@ -0,0 +1,181 @@
+import pytest
+
+from datetime import date, timedelta
+from app import models
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.tenancy import USER_HEADER
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+ROW_COUNT = 7
+PAGE_SIZE = 3
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def walk(client, url, **params):
+    """Follow `next_cursor` until the last page, returning every item"""
+    items, cursor = [], None
+    while True:
+        query = dict(params, limit=PAGE_SIZE)
+        if cursor is not None:
+            query["cursor"] = cursor
+        body = client.get(url, params=query).json()
+        assert len(body["items"]) <= PAGE_SIZE
+        items.extend(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.fixture(params=["client", "async_client"])
+def any_client(request):
+    """The sync app's client, then that of the async routes"""
+    return request.getfixturevalue(request.param)
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_cursor_round_trip():
+    columns = [models.Workout.date, models.Workout.id]
+    cursor = encode_cursor([date(2026, 1, 15), 42])
+    assert decode_cursor(cursor, columns) == [date(2026, 1, 15), 42]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1, 2, 3])])
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, [models.Workout.id])
+
+
+def test_workout_templates_page(client, db):
+    db.add_all(
+        [
+            models.WorkoutTemplate(name=f"T{i}", user_id=USER_ID)
+            for i in range(ROW_COUNT)
+        ]
+    )
+    db.commit()
+
+    items = walk(client, "/workout-templates/page")
+    assert [t["id"] for t in items] == list(range(1, ROW_COUNT + 1))
+
+
+def test_workout_templates_cursor_header(client, db):
+    """The offset list endpoint accepts a cursor and returns the next one"""
+    db.add_all(
+        [
+            models.WorkoutTemplate(name=f"T{i}", user_id=USER_ID)
+            for i in range(ROW_COUNT)
+        ]
+    )
+    db.commit()
+
+    first = client.get("/workout-templates/page", params={"limit": PAGE_SIZE})
+    cursor = first.json()["next_cursor"]
+    response = client.get(
+        "/workout-templates/", params={"cursor": cursor, "limit": PAGE_SIZE}
+    )
+    assert [t["id"] for t in response.json()] == [4, 5, 6]
+    assert "X-Next-Cursor" in response.headers
+
+    legacy = client.get("/workout-templates/", params={"skip": 3, "limit": 3})
+    assert legacy.json() == response.json()
+
+
+def test_workouts_page_newest_first(client, db):
+    """Workouts sharing a date are still paged without gaps or repeats"""
+    start = date(2026, 1, 1)
+    db.add_all(
+        [
+            models.Workout(
+                name=f"W{i}", date=start + timedelta(days=i // 2), user_id=USER_ID
+            )
+            for i in range(ROW_COUNT)
+        ]
+    )
+    db.commit()
+
+    items = walk(client, "/workouts/page")
+    keys = [(w["date"], w["id"]) for w in items]
+    assert keys == sorted(keys, reverse=True)
+    assert len(keys) == ROW_COUNT
+
+
+def test_exercise_and_set_pages(client, db):
+    workout = models.Workout(
+        name="W",
+        date=date(2026, 1, 1),
+        exercises=[models.Exercise(name=f"E{i}") for i in range(ROW_COUNT)],
+        user_id=USER_ID,
+    )
+    workout.exercises[0].sets = [
+        models.Set(reps=5, weight_kg=float(i)) for i in range(ROW_COUNT)
+    ]
+    db.add(workout)
+    db.commit()
+
+    exercises = walk(client, f"/workout/{workout.id}/exercises/page")
+    assert len(exercises) == ROW_COUNT
+
+    sets = walk(client, f"/exercises/{exercises[0]['id']}/sets/page")
+    assert [s["weight"] for s in sets] == [float(i) for i in range(ROW_COUNT)]
+
+
+def test_page_invalid_cursor(client):
+    response = client.get("/workout-templates/page", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+def test_workout_templates_list_follows_cursor(any_client):
+    for i in range(ROW_COUNT):
+        any_client.post("/workout-templates/", json={"name": f"T{i}"})
+
+    pages, cursor = [], encode_cursor([0])
+    while cursor is not None:
+        response = any_client.get(
+            "/workout-templates/", params={"cursor": cursor, "limit": PAGE_SIZE}
+        )
+        pages.append([t["name"] for t in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+    assert pages == [["T0", "T1", "T2"], ["T3", "T4", "T5"], ["T6"]]
+
+
+def test_workout_templates_list_invalid_cursor(any_client):
+    response = any_client.get("/workout-templates/", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("limit", [0, -5])
+@pytest.mark.parametrize("params", [{}, {"cursor": encode_cursor([0])}])
+def test_workout_templates_rejects_empty_pages(any_client, params, limit):
+    response = any_client.get("/workout-templates/", params=dict(params, limit=limit))
+    assert response.status_code == 422
+
+
+def test_page_missing_parent(client):
+    assert client.get("/exercises/99/sets/page").status_code == 404
+
+
+@pytest.mark.parametrize("url", ["/workout/1/exercises/page", "/exercises/1/sets/page"])
+def test_child_pages_are_scoped_to_the_user(client, db, url):
+    db.add(
+        models.Workout(
+            name="W",
+            date=date(2026, 1, 1),
+            exercises=[
+                models.Exercise(name="E", sets=[models.Set(reps=5, weight_kg=60.0)])
+            ],
+            user_id=USER_ID,
+        )
+    )
+    db.commit()
+    other = client.post("/users/", json={"username": "other"}).json()["id"]
+
+    past_end = client.get(url, params={"cursor": encode_cursor([1])})
+    assert past_end.json() == {"items": [], "next_cursor": None}
+    assert client.get(url, headers={USER_HEADER: str(other)}).status_code == 404
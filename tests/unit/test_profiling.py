@@ -0,0 +1,195 @@
+import asyncio
+import pytest
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from app import main, profiling
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+TOKEN = "s3cret"
+BUSY_SECONDS = 0.03
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def spin_profiled(seconds):
+    spin(seconds)
+
+
+def spin_other(seconds):
+    spin(seconds)
+
+
+SPINS = {"profiled": spin_profiled, "other": spin_other}
+
+
+def build_app(sample_rate=0.0):
+    app = FastAPI()
+    both_running = threading.Barrier(2)
+    entered, spun = set(), set()
+
+    async def wait_until(condition):
+        deadline = time.perf_counter() + 5
+        while not condition() and time.perf_counter() < deadline:
+            await asyncio.sleep(0.001)
+
+    @app.get("/overlap/{which}")
+    def overlap_endpoint(which: str):
+        both_running.wait(5)
+        SPINS[which](BUSY_SECONDS)
+        return {}
+
+    @app.get("/overlap-async/{which}")
+    async def overlap_async_endpoint(which: str):
+        # The other request spins while the profiled one waits on the loop
+        entered.add(which)
+        if which == "other":
+            await wait_until(lambda: "profiled" in entered)
+        else:
+            await wait_until(lambda: "other" in spun)
+        SPINS[which](BUSY_SECONDS)
+        spun.add(which)
+        return {}
+
+    @app.get("/sync/{item_id}")
+    def sync_endpoint(item_id: int):
+        spin(BUSY_SECONDS)
+        return {"id": item_id}
+
+    @app.get("/async")
+    async def async_endpoint():
+        spin(BUSY_SECONDS)
+        await asyncio.sleep(0)
+        return {}
+
+    profiler = profiling.Profiler(TOKEN, sample_rate=sample_rate, interval=0.001)
+    profiling.install(app, profiler)
+    return app
+
+
+@pytest.fixture
+def profiled_client():
+    return TestClient(build_app())
+
+
+def read_profile(client, profile_id):
+    response = client.get(
+        f"/debug/profiles/{profile_id}", headers={profiling.TOKEN_HEADER: TOKEN}
+    )
+    assert response.status_code == 200
+    return response.text.splitlines()
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize(
+    "path, endpoint",
+    [("/sync/1", "sync_endpoint"), ("/async", "async_endpoint")],
+)
+def test_profile_on_demand(profiled_client, path, endpoint):
+    response = profiled_client.get(path, headers={profiling.TOKEN_HEADER: TOKEN})
+    assert response.status_code == 200
+    lines = read_profile(profiled_client, response.headers[profiling.PROFILE_ID_HEADER])
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.split(";")[0].endswith(f"build_app.<locals>.{endpoint}")
+    assert any("test_profiling:spin" in line for line in lines)
+
+
+@pytest.mark.parametrize("path", ["/overlap", "/overlap-async"])
+def test_profile_samples_only_its_request(path):
+    """Another request overlapping the profiled one, in the threadpool or on
+    the event loop, is not counted in its profile"""
+    responses = {}
+    with TestClient(build_app()) as client:
+
+        def get(which, headers):
+            responses[which] = client.get(f"{path}/{which}", headers=headers)
+
+        threads = [
+            threading.Thread(
+                target=get, args=("profiled", {profiling.TOKEN_HEADER: TOKEN})
+            ),
+            threading.Thread(target=get, args=("other", {})),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        profile_id = responses["profiled"].headers[profiling.PROFILE_ID_HEADER]
+        lines = read_profile(client, profile_id)
+    assert any("test_profiling:spin_profiled" in line for line in lines)
+    assert not any("test_profiling:spin_other" in line for line in lines)
+
+
+def test_profile_query_flag(profiled_client):
+    response = profiled_client.get("/sync/1", params={"profile": TOKEN})
+    assert profiling.PROFILE_ID_HEADER in response.headers
+
+
+@pytest.mark.parametrize("headers", [{}, {profiling.TOKEN_HEADER: "wrong"}])
+def test_profiling_requires_token(profiled_client, headers):
+    response = profiled_client.get("/sync/1", headers=headers)
+    assert profiling.PROFILE_ID_HEADER not in response.headers
+    assert profiled_client.get("/debug/profiles", headers=headers).status_code == 403
+
+
+def endpoint_calls(app):
+    return {
+        route.path: route.dependant.call
+        for route in app.routes
+        if isinstance(route, APIRoute)
+    }
+
+
+def test_endpoints_wrapped_at_install():
+    app = build_app()
+    calls = endpoint_calls(app)
+    assert calls["/sync/{item_id}"].sampled
+
+    client = TestClient(app, headers={profiling.TOKEN_HEADER: TOKEN})
+    assert profiling.PROFILE_ID_HEADER in client.get("/sync/1").headers
+    assert endpoint_calls(app) == calls
+
+
+def test_continuous_sampling_per_route():
+    client = TestClient(build_app(sample_rate=1.0))
+    for item_id in range(3):
+        client.get(f"/sync/{item_id}")
+    headers = {profiling.TOKEN_HEADER: TOKEN}
+
+    routes = client.get("/debug/profiles", headers=headers).json()["routes"]
+    [route] = [r for r in routes if r["route"] == "/sync/{item_id}"]
+    assert route["requests"] == 3
+    assert route["samples"] > 0
+    stacks = client.get(
+        "/debug/profiles/route", params={"route": "/sync/{item_id}"}, headers=headers
+    )
+    assert "test_profiling:spin" in stacks.text
+    missing = client.get(
+        "/debug/profiles/route", params={"route": "/nope"}, headers=headers
+    )
+    assert missing.status_code == 404
+
+
+def test_profiling_disabled_by_default(client):
+    assert not main.settings.profile_token
+    assert all(
+        m.cls is not profiling.ProfilingMiddleware for m in main.app.user_middleware
+    )
+    assert client.get("/debug/profiles").status_code == 404
@@ -0,0 +1,157 @@
+import pytest
+
+from datetime import date
+from app import models
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+PAGE_SIZES = [1, 25]
+
+# Statements allowed per request, independent of page size
+TEMPLATE_LIST_QUERIES = 2
+TEMPLATE_READ_QUERIES = 1
+EXERCISE_LIST_QUERIES = 2
+EXERCISE_READ_QUERIES = 1
+SET_LIST_QUERIES = 1
+WORKOUT_TREE_QUERIES = 1
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def seed_templates(db, count, exercises_per_template=3):
+    for i in range(count):
+        db.add(
+            models.WorkoutTemplate(
+                name=f"Template {i}",
+                exercise_templates=[
+                    models.ExerciseTemplate(name=f"Exercise {j}")
+                    for j in range(exercises_per_template)
+                ],
+                user_id=USER_ID,
+            )
+        )
+    db.commit()
+
+
+def seed_workout(db, exercises, sets_per_exercise=4):
+    workout = models.Workout(
+        name="Push Day",
+        date=date(2026, 1, 15),
+        exercises=[
+            models.Exercise(
+                name=f"Exercise {i}",
+                sets=[
+                    models.Set(reps=10, weight_kg=100.0 + j)
+                    for j in range(sets_per_exercise)
+                ],
+            )
+            for i in range(exercises)
+        ],
+        user_id=USER_ID,
+    )
+    db.add(workout)
+    db.commit()
+    return workout.id
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize("page_size", PAGE_SIZES)
+def test_workout_template_list_query_count(client, db, max_queries, page_size):
+    """Listing templates must not lazy load exercise templates per row."""
+    seed_templates(db, page_size)
+
+    with max_queries(TEMPLATE_LIST_QUERIES):
+        response = client.get("/workout-templates/", params={"limit": page_size})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == page_size
+    assert all(len(t["exercise_templates"]) == 3 for t in body)
+
+
+def test_workout_template_read_query_count(client, db, max_queries):
+    seed_templates(db, 1)
+
+    with max_queries(TEMPLATE_READ_QUERIES):
+        response = client.get("/workout-templates/1")
+
+    assert response.status_code == 200
+    assert len(response.json()["exercise_templates"]) == 3
+
+
+@pytest.mark.parametrize("page_size", PAGE_SIZES)
+def test_exercise_list_query_count(client, db, max_queries, page_size):
+    """Listing exercises must not lazy load sets per exercise."""
+    workout_id = seed_workout(db, page_size)
+
+    with max_queries(EXERCISE_LIST_QUERIES):
+        response = client.get(f"/workout/{workout_id}/exercises/")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == page_size
+    assert all(len(e["sets"]) == 4 for e in body)
+
+    with max_queries(EXERCISE_LIST_QUERIES):
+        response = client.get(f"/workout/{workout_id}/exercises/page")
+
+    assert len(response.json()["items"]) == page_size
+
+
+def test_exercise_read_query_count(client, db, max_queries):
+    seed_workout(db, 1)
+
+    with max_queries(EXERCISE_READ_QUERIES):
+        response = client.get("/exercises/1")
+
+    assert response.status_code == 200
+    assert len(response.json()["sets"]) == 4
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/workout/999/exercises/",
+        "/workout/999/exercises/page",
+        "/exercises/999/sets/",
+        "/exercises/999/sets/page",
+        "/workouts/999/tree",
+    ],
+)
+def test_missing_parent_query_count(client, max_queries, path):
+    """A missing parent is detected by the read itself, not a separate check."""
+    with max_queries(1):
+        assert client.get(path).status_code == 404
+
+
+def test_set_list_query_count(client, db, max_queries):
+    seed_workout(db, 1)
+
+    with max_queries(SET_LIST_QUERIES):
+        response = client.get("/exercises/1/sets/")
+
+    assert [s["weight"] for s in response.json()] == [100.0, 101.0, 102.0, 103.0]
+
+    with max_queries(SET_LIST_QUERIES):
+        response = client.get("/exercises/1/sets/page")
+
+    assert len(response.json()["items"]) == 4
+
+
+@pytest.mark.parametrize("page_size", PAGE_SIZES)
+def test_workout_tree_query_count(client, db, max_queries, page_size):
+    workout_ids = [seed_workout(db, page_size) for _ in range(2)]
+
+    with max_queries(WORKOUT_TREE_QUERIES):
+        tree = client.get(f"/workouts/{workout_ids[0]}/tree").json()
+    with max_queries(WORKOUT_TREE_QUERIES):
+        trees = client.get("/workouts/trees", params={"ids": workout_ids}).json()
+
+    assert len(tree["exercises"]) == page_size
+    assert all(len(e["sets"]) == 4 for e in tree["exercises"])
+    assert [t["id"] for t in trees] == workout_ids
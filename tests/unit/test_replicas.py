@@ -0,0 +1,178 @@
+import pytest
+
+from dataclasses import replace
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app import models, tenancy
+from app.config import settings
+from app.database import Base, create_db_engine, get_db
+from app.main import app
+from app.tenancy import USER_HEADER, ReplicaRouter, read_only_url
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USERS = [
+    {"id": 1, "name": "lifter", "default_measurement": "kgs"},
+    {"id": 2, "name": "other", "default_measurement": "kgs"},
+]
+STICKY_SECONDS = 60
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+@pytest.fixture
+def primary_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'primary.db'}"
+
+
+@pytest.fixture
+def replica_url(tmp_path):
+    """A second file standing in for a replica, which never sees the primary's
+    writes, so a read shows which database served it"""
+    return f"sqlite:///{tmp_path / 'replica.db'}"
+
+
+@pytest.fixture
+def engines(primary_url, replica_url):
+    created = [create_db_engine(url, settings) for url in (primary_url, replica_url)]
+    for engine in created:
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(insert(models.User), USERS)
+    yield created
+    for engine in created:
+        engine.dispose()
+
+
+def make_client(monkeypatch, engines, replica_url, sticky_seconds):
+    PrimarySession = sessionmaker(autocommit=False, autoflush=False, bind=engines[0])
+
+    def override_get_db():
+        db = PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    router = ReplicaRouter([replica_url])
+    monkeypatch.setattr(tenancy, "replicas", router)
+    monkeypatch.setattr(
+        tenancy, "settings", replace(settings, read_your_writes_seconds=sticky_seconds)
+    )
+    tenancy.recent_writers.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    return router, TestClient(app, headers={USER_HEADER: "1"})
+
+
+@pytest.fixture
+def client(monkeypatch, engines, replica_url):
+    router, test_client = make_client(monkeypatch, engines, replica_url, 0)
+    yield test_client
+    app.dependency_overrides.clear()
+    router.dispose()
+
+
+@pytest.fixture
+def sticky_client(monkeypatch, engines, replica_url):
+    router, test_client = make_client(monkeypatch, engines, replica_url, STICKY_SECONDS)
+    yield test_client
+    app.dependency_overrides.clear()
+    router.dispose()
+
+
+def create_template(client, name="Push"):
+    response = client.post("/workout-templates/", json={"name": name})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def template_names(engine):
+    with engine.connect() as connection:
+        return (
+            connection.exec_driver_sql("SELECT name FROM workout_templates ORDER BY id")
+            .scalars()
+            .all()
+        )
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_writes_go_to_primary_and_reads_to_replica(client, engines):
+    primary, replica = engines
+    template_id = create_template(client)
+
+    assert template_names(primary) == ["Push"]
+    assert template_names(replica) == []
+    assert client.get(f"/workout-templates/{template_id}").status_code == 404
+    assert client.get("/users/me").json()["username"] == "lifter"
+
+
+def test_reads_after_a_write_stay_on_primary(sticky_client):
+    template_id = create_template(sticky_client)
+    response = sticky_client.get(f"/workout-templates/{template_id}")
+    assert response.json()["name"] == "Push"
+
+    other = sticky_client.get(
+        f"/workout-templates/{template_id}", headers={USER_HEADER: "2"}
+    )
+    assert other.status_code == 404
+
+
+def test_read_your_writes_window_expires(sticky_client):
+    template_id = create_template(sticky_client)
+    tenancy.recent_writers.delete("wrote:1")
+    response = sticky_client.get(f"/workout-templates/{template_id}")
+    assert response.status_code == 404
+
+
+def test_replica_sessions_are_read_only(engines, replica_url):
+    router = ReplicaRouter([replica_url])
+    with router.session() as db:
+        with pytest.raises(OperationalError, match="readonly"):
+            db.execute(insert(models.WorkoutTemplate).values(name="Push", user_id=1))
+    router.dispose()
+
+
+def test_replicas_taken_in_turn(engines, primary_url, replica_url):
+    router = ReplicaRouter([primary_url, replica_url])
+    with engines[0].begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO workout_templates (name, user_id) VALUES ('Push', 1)"
+        )
+    counts = []
+    for _ in range(4):
+        with router.session() as db:
+            counts.append(db.query(models.WorkoutTemplate).count())
+    assert counts == [1, 0, 1, 0]
+    router.dispose()
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            "sqlite:///./fitness.db",
+            "sqlite:///file:./fitness.db?mode=ro&uri=true",
+        ),
+        (
+            "sqlite:///file:fitness.db?uri=true",
+            "sqlite:///file:fitness.db?mode=ro&uri=true",
+        ),
+        (
+            "sqlite:///file:fitness.db?mode=ro&uri=true",
+            "sqlite:///file:fitness.db?mode=ro&uri=true",
+        ),
+        ("sqlite://", "sqlite://"),
+        (
+            "postgresql://reader@replica/fitness",
+            "postgresql://reader@replica/fitness",
+        ),
+    ],
+)
+def test_read_only_url(url, expected):
+    assert read_only_url(url) == expected
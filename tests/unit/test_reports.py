@@ -0,0 +1,278 @@
+import time
+
+import pytest
+
+from dataclasses import replace
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, sessionmaker
+from app import cache, models, reports
+from app.config import settings
+from app.database import Base, create_db_engine, get_db
+from app.main import app
+from app.tenancy import USER_HEADER
+from app.units import KG_PER_LB
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+# (Date, workout name, [(exercise, [(reps, weight), ...]), ...])
+HISTORY = [
+    ("2026-01-05", "Push", [("Bench Press", [(5, 100.0), (5, 100.0)])]),
+    ("2026-01-05", "Legs", [("Back Squat", [(5, 140.0)])]),
+    ("2026-01-07", "Pull", [("Barbell Row", [(10, 60.0)])]),
+    ("2026-01-08", "Rest", [("Bench Press", [])]),
+    ("2026-01-12", "Push", [("Bench Press", [(5, 110.0)])]),
+]
+WEEK_1 = {"chest": 1000.0, "legs": 700.0, "back": 600.0}
+JOB_TIMEOUT_SECONDS = 60
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def seed_history(db, user_id=USER_ID):
+    for day, name, exercises in HISTORY:
+        db.add(
+            models.Workout(
+                name=name,
+                date=date.fromisoformat(day),
+                exercises=[
+                    models.Exercise(
+                        name=exercise,
+                        sets=[models.Set(reps=r, weight_kg=w) for r, w in sets],
+                    )
+                    for exercise, sets in exercises
+                ],
+                user_id=user_id,
+            )
+        )
+    db.commit()
+
+
+def volumes(period):
+    return {g["muscle_group"]: g["total_volume"] for g in period["muscle_groups"]}
+
+
+def add_job(db, status=reports.PENDING, started_at=None):
+    job_id = db.scalar(
+        insert(models.ReportJob)
+        .values(user_id=USER_ID, kind="weekly", status=status, started_at=started_at)
+        .returning(models.ReportJob.id)
+    )
+    db.commit()
+    return job_id
+
+
+@pytest.fixture
+def file_url(tmp_path):
+    """A database file the spawned workers can open, unlike `sqlite://`"""
+    url = f"sqlite:///{tmp_path / 'reports.db'}"
+    engine = create_db_engine(url, settings)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(models.User(id=USER_ID, name="test", default_measurement="kgs"))
+        db.commit()
+        seed_history(db)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def file_db(file_url):
+    engine = create_db_engine(file_url, settings)
+    with Session(engine) as db:
+        yield db
+    engine.dispose()
+
+
+@pytest.fixture
+def file_client(monkeypatch, file_url):
+    engine = create_db_engine(file_url, settings)
+    FileSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = FileSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    worker = reports.ReportWorker(1)
+    monkeypatch.setattr(reports, "worker", worker)
+    cache.report_cache.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app, headers={USER_HEADER: str(USER_ID)})
+    app.dependency_overrides.clear()
+    worker.shutdown()
+    engine.dispose()
+
+
+def wait_for_report(client, job_id):
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        job = client.get(f"/reports/{job_id}").json()
+        if job["status"] in (reports.DONE, reports.FAILED):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Report job {job_id} did not finish")
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_weekly_report(engine, db):
+    seed_history(db)
+    with Session(engine) as checked:
+        report = reports.build_report(checked, USER_ID, "weekly")
+
+    first, second = report["periods"]
+    assert first["period"] == "2026-01-05"
+    assert (first["sessions"], first["training_days"]) == (3, 2)
+    assert (first["set_count"], first["total_reps"]) == (4, 25)
+    assert first["tonnage"] == sum(WEEK_1.values())
+    assert volumes(first) == WEEK_1
+    assert [g["muscle_group"] for g in first["muscle_groups"]] == list(WEEK_1)
+    assert first.get("tonnage_change") is None
+    assert second["tonnage"] == 550.0
+    assert second["tonnage_change"] == pytest.approx(550 / 2300 - 1, abs=1e-4)
+
+
+def test_monthly_report_in_date_range(db):
+    seed_history(db)
+    report = reports.build_report(db, USER_ID, "monthly", start=date(2026, 1, 6))
+    (month,) = report["periods"]
+    assert month["period"] == "2026-01-01"
+    assert (month["sessions"], month["training_days"]) == (2, 2)
+    assert volumes(month) == {"back": 600.0, "chest": 550.0}
+
+
+def test_report_in_users_unit(db):
+    seed_history(db)
+    db.get(models.User, USER_ID).default_measurement = "lbs"
+    db.commit()
+    first = reports.build_report(db, USER_ID, "weekly")["periods"][0]
+    assert first["tonnage"] == pytest.approx(2300 / KG_PER_LB, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    "name, group",
+    [
+        ("Incline Dumbbell Bench Press", "chest"),
+        ("Push-Up", "chest"),
+        ("Overhead Press", "shoulders"),
+        ("Leg Curl", "legs"),
+        ("Hammer Curl", "arms"),
+        ("Romanian Deadlift", "back"),
+        ("Pull-Up", "back"),
+        ("Farmer's Walk", "other"),
+    ],
+)
+def test_muscle_group(name, group):
+    assert reports.muscle_group(name) == group
+
+
+def test_run_job_stores_report_once(file_url, file_db):
+    job_id = add_job(file_db)
+    reports.run_job(file_url, job_id)
+    job = file_db.get(models.ReportJob, job_id)
+    assert job.status == reports.DONE
+    assert job.started_at <= job.finished_at
+    assert len(reports.job_response(job)["report"].periods) == 2
+
+    file_db.expire_all()
+    reports.run_job(file_url, job_id)
+    assert file_db.get(models.ReportJob, job_id).finished_at == job.finished_at
+
+
+def test_run_job_records_failure(monkeypatch, file_url, file_db):
+    def fail(*args):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(reports, "build_report", fail)
+    job_id = add_job(file_db)
+    reports.run_job(file_url, job_id)
+    job = file_db.get(models.ReportJob, job_id)
+    assert (job.status, job.error) == (reports.FAILED, "out of memory")
+
+
+def test_resume_unfinished_jobs(monkeypatch, file_db):
+    submitted = []
+    monkeypatch.setattr(
+        reports.worker, "submit", lambda url, job_id: submitted.append(job_id)
+    )
+    lease = timedelta(seconds=settings.report_job_lease)
+    job_ids = [
+        add_job(file_db, "running", reports.utcnow() - lease - timedelta(seconds=1)),
+        add_job(file_db, "pending"),
+        add_job(file_db, "done"),
+        # Still being built by a live worker of another server
+        add_job(file_db, "running", reports.utcnow()),
+    ]
+
+    assert reports.resume_report_jobs(file_db) == 2
+    assert sorted(submitted) == job_ids[:2]
+    statuses = file_db.scalars(select(models.ReportJob.status).order_by("id")).all()
+    assert statuses == ["pending", "pending", "done", "running"]
+
+
+def test_report_built_by_worker_process(file_client):
+    response = file_client.post("/reports/", json={"kind": "weekly"})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["location"] == f"/reports/{job_id}"
+
+    job = wait_for_report(file_client, job_id)
+    assert job["status"] == reports.DONE
+    assert volumes(job["report"]["periods"][0]) == WEEK_1
+
+    other = file_client.get(f"/reports/{job_id}", headers={USER_HEADER: "2"})
+    assert other.status_code == 404
+
+
+def test_report_reused_until_sets_change(file_client):
+    job_id = file_client.post("/reports/", json={"kind": "weekly"}).json()["id"]
+    wait_for_report(file_client, job_id)
+
+    cached = file_client.post("/reports/", json={"kind": "weekly"})
+    assert cached.status_code == 200
+    assert cached.json()["id"] == job_id
+    monthly = file_client.post("/reports/", json={"kind": "monthly"}).json()["id"]
+    assert monthly != job_id
+
+    file_client.post("/exercises/1/sets/", json={"reps": 5, "weight": 100.0})
+    response = file_client.post("/reports/", json={"kind": "weekly"})
+    assert response.json()["id"] not in (job_id, monthly)
+    job = wait_for_report(file_client, response.json()["id"])
+    assert job["report"]["periods"][0]["set_count"] == 5
+
+
+def test_report_rebuilt_when_unit_changes(file_client):
+    job_id = file_client.post("/reports/", json={"kind": "weekly"}).json()["id"]
+    wait_for_report(file_client, job_id)
+
+    file_client.patch("/users/me", json={"default_measurement": "lbs"})
+    response = file_client.post("/reports/", json={"kind": "weekly"})
+    assert response.json()["id"] != job_id
+    job = wait_for_report(file_client, response.json()["id"])
+    first = job["report"]["periods"][0]
+    assert first["tonnage"] == pytest.approx(2300 / KG_PER_LB, abs=0.01)
+
+
+def test_report_reuse_expires(file_client, monkeypatch):
+    """Another worker's write is not seen here, so reuse is bounded in time"""
+    monkeypatch.setattr(reports, "settings", replace(settings, report_cache_ttl=1))
+    job_id = file_client.post("/reports/", json={"kind": "weekly"}).json()["id"]
+    assert file_client.post("/reports/", json={"kind": "weekly"}).json()["id"] == job_id
+    time.sleep(1.1)
+    assert file_client.post("/reports/", json={"kind": "weekly"}).json()["id"] != job_id
+
+
+def test_invalid_report_range(client):
+    response = client.post(
+        "/reports/",
+        json={"kind": "weekly", "start": "2026-02-01", "end": "2026-01-01"},
+    )
+    assert response.status_code == 422
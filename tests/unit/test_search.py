@@ -0,0 +1,150 @@
+import pytest
+
+from datetime import date
+from sqlalchemy import delete, event, update
+from app import models, search
+from app.tenancy import USER_HEADER
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+WORKOUT_EXERCISES = [
+    ["Bench Press", "Overhead Press", "Dip"],
+    ["Bench Press", "Incline Bench Press"],
+    ["Bench Press", "Squat", "T-Bar Row"],
+]
+TEMPLATE_EXERCISES = ["Incline Bench Press", "Dumbbell Bench Press"]
+# The search is one statement, whatever the number of exercises
+SEARCH_QUERIES = 1
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+@pytest.fixture
+def seeded(db):
+    for day, names in enumerate(WORKOUT_EXERCISES, start=1):
+        db.add(
+            models.Workout(
+                name="Push",
+                date=date(2026, 1, day),
+                exercises=[models.Exercise(name=name) for name in names],
+                user_id=USER_ID,
+            )
+        )
+    db.add(
+        models.WorkoutTemplate(
+            name="Push",
+            exercise_templates=[
+                models.ExerciseTemplate(name=name) for name in TEMPLATE_EXERCISES
+            ],
+            user_id=USER_ID,
+        )
+    )
+    db.commit()
+
+
+def names(client, q, **params):
+    response = client.get("/exercise-names/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [
+        (n["name"], n["exercise_count"], n["template_count"]) for n in response.json()
+    ]
+
+
+def counts(db):
+    return dict(
+        db.query(
+            models.ExerciseName.name,
+            models.ExerciseName.exercise_count + models.ExerciseName.template_count,
+        )
+    )
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_prefix_search_ranks_most_used_first(client, max_queries, seeded):
+    with max_queries(SEARCH_QUERIES):
+        found = names(client, "ben")
+    assert found == [
+        ("Bench Press", 3, 0),
+        ("Incline Bench Press", 1, 1),
+        ("Dumbbell Bench Press", 0, 1),
+    ]
+
+
+@pytest.mark.parametrize(
+    "q, expected",
+    [
+        ("PRESS", ["Bench Press", "Incline Bench Press", "Overhead Press"]),
+        ("inc be pr", ["Incline Bench Press"]),
+        ("d", ["Dip", "Dumbbell Bench Press"]),
+        ("squats", []),
+        ("bar", ["T-Bar Row"]),
+        ('press" OR "dip', []),
+        ("--", []),
+    ],
+)
+def test_every_word_is_a_prefix(client, seeded, q, expected):
+    assert [name for name, *_ in names(client, q, limit=3)] == expected
+
+
+def test_search_is_scoped_to_the_user(client, seeded):
+    other = client.post("/users/", json={"username": "other"}).json()["id"]
+    response = client.get(
+        "/exercise-names/search",
+        params={"q": "bench"},
+        headers={USER_HEADER: str(other)},
+    )
+    assert response.json() == []
+
+
+def test_names_follow_renames_and_deletes(db, seeded):
+    db.execute(
+        update(models.Exercise).where(models.Exercise.name == "Dip").values(name="Row")
+    )
+    db.execute(delete(models.Workout).where(models.Workout.date == date(2026, 1, 2)))
+    db.execute(delete(models.WorkoutTemplate))
+    db.commit()
+
+    assert counts(db) == {
+        "Bench Press": 2,
+        "Overhead Press": 1,
+        "Row": 1,
+        "Squat": 1,
+        "T-Bar Row": 1,
+    }
+    assert search.search_exercise_names(db, USER_ID, "incline") == []
+    found = search.search_exercise_names(db, USER_ID, "ro")
+    assert [n.name for n in found] == ["Row", "T-Bar Row"]
+
+
+def test_names_follow_created_exercises(client, db, seeded):
+    client.post("/workout/1/exercises/", json={"name": "Squat"})
+    client.delete("/exercises/3")
+    assert names(client, "squ") == [("Squat", 2, 0)]
+    assert names(client, "dip") == []
+
+
+@pytest.mark.parametrize("params", [{"q": ""}, {"q": "bench", "limit": 0}, {}])
+def test_search_rejects_invalid_parameters(client, params):
+    response = client.get("/exercise-names/search", params=params)
+    assert response.status_code == 422
+
+
+def test_search_text_is_bound(engine, client, seeded):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert names(client, "bench' OR 1=1 --") == []
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    (statement, parameters), *_ = [s for s in statements if "MATCH" in s[0]]
+    assert "bench" not in statement
+    assert '"u1xbench"* AND "u1xor"* AND "u1x1"* AND "u1x1"*' in parameters
@@ -0,0 +1,116 @@
+import pytest
+
+from app import models
+from app.tenancy import USER_HEADER
+from app.units import KG_PER_LB
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+# (reps, weight in pounds) of the logged squat sets
+SETS = [(5, 135.0), (3, 225.0), (8, 102.5)]
+
+LOG = {
+    "name": "Legs",
+    "date": "2026-01-15T18:00:00",
+    "exercises": [
+        {"name": "Squat", "sets": [{"reps": r, "weight": w} for r, w in SETS]}
+    ],
+}
+
+
+@pytest.fixture
+def lbs_user(client):
+    """Headers of a new user, who weighs in pounds by default"""
+    response = client.post("/users/", json={"username": "imperial"})
+    return {USER_HEADER: str(response.json()["id"])}
+
+
+@pytest.fixture
+def logged(client, lbs_user):
+    return client.post("/workouts/log", json=LOG, headers=lbs_user).json()
+
+
+def set_weights(body):
+    return [s["weight"] for s in body["sets"]]
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_weights_stored_in_kilograms(db, logged):
+    exercise = db.get(models.Exercise, logged["exercises"][0]["id"])
+    assert [s.weight_kg for s in exercise.sets] == [
+        pytest.approx(w * KG_PER_LB) for _, w in SETS
+    ]
+
+
+def test_reads_use_the_users_unit(client, lbs_user, logged):
+    exercise = logged["exercises"][0]
+    pounds = [w for _, w in SETS]
+
+    tree = client.get(f"/workouts/{logged['id']}/tree", headers=lbs_user).json()
+    assert set_weights(tree["exercises"][0]) == pounds
+    exercise_url = f"/exercises/{exercise['id']}"
+    assert set_weights(client.get(exercise_url, headers=lbs_user).json()) == pounds
+    sets = client.get(f"{exercise_url}/sets/", headers=lbs_user).json()
+    assert [s["weight"] for s in sets] == pounds
+    page = client.get(f"{exercise_url}/sets/page", headers=lbs_user).json()
+    assert [s["weight"] for s in page["items"]] == pounds
+    set_url = f"/sets/{exercise['sets'][0]['id']}"
+    assert client.get(set_url, headers=lbs_user).json()["weight"] == 135.0
+
+    client.put("/users/me", json={"default_measurement": "kgs"}, headers=lbs_user)
+    kilograms = [round(w * KG_PER_LB, 2) for w in pounds]
+    sets = client.get(f"{exercise_url}/sets/", headers=lbs_user).json()
+    assert [s["weight"] for s in sets] == kilograms
+
+
+def test_writes_use_the_users_unit(client, db, lbs_user, logged):
+    exercise_url = f"/exercises/{logged['exercises'][0]['id']}"
+    created = client.post(
+        f"{exercise_url}/sets/", json={"reps": 1, "weight": 315.0}, headers=lbs_user
+    ).json()
+    assert created["weight"] == 315.0
+    assert db.get(models.Set, created["id"]).weight_kg == pytest.approx(315 * KG_PER_LB)
+
+    updated = client.put(
+        f"/sets/{created['id']}", json={"reps": 1, "weight": 320.0}, headers=lbs_user
+    ).json()
+    assert updated["weight"] == 320.0
+
+    renamed = client.put(exercise_url, json={"name": "Box Squat"}, headers=lbs_user)
+    assert set_weights(renamed.json())[-1] == 320.0
+
+
+def test_progression_and_stats_in_users_unit(client, lbs_user, logged):
+    url = "/analytics/exercises/Squat/progression"
+    point = client.get(url, headers=lbs_user).json()["points"][0]
+    assert point["max_weight"] == 225.0
+    assert point["total_volume"] == sum(r * w for r, w in SETS)
+    assert point["best_set"] == {"reps": 3, "weight": 225.0}
+    assert point["e1rm_epley"] == pytest.approx(225 * (1 + 3 / 30))
+
+    workouts = client.get(
+        "/workouts/", params={"include_stats": True}, headers=lbs_user
+    ).json()
+    assert workouts["items"][0]["total_volume"] == sum(r * w for r, w in SETS)
+
+
+def test_export_import_round_trip(client, lbs_user, logged):
+    exported = client.get(
+        "/export/workouts", params={"format": "csv"}, headers=lbs_user
+    ).text
+    assert exported.splitlines()[1].endswith(",5,135.0")
+
+    response = client.post(
+        "/import/workouts",
+        params={"format": "csv"},
+        content=exported.encode(),
+        headers=lbs_user,
+    )
+    assert response.status_code == 200
+    url = "/analytics/exercises/Squat/progression"
+    point = client.get(url, headers=lbs_user).json()["points"][0]
+    assert point["max_weight"] == 225.0
+    assert point["set_count"] == 2 * len(SETS)
@@ -0,0 +1,172 @@
+import pytest
+
+from datetime import date
+from app import analytics, models
+from app.tenancy import USER_HEADER
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+SET_WEIGHTS = [100.0, 102.5, 105.0]
+# Statements per update: the UPDATE, the children the response includes, and
+# the summary refresh (summary key, DELETE and INSERT) of set changes
+TEMPLATE_UPDATE_QUERIES = 2
+EXERCISE_TEMPLATE_UPDATE_QUERIES = 1
+SET_UPDATE_QUERIES = 4
+EXERCISE_UPDATE_QUERIES = 5
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+@pytest.fixture
+def template_id(db):
+    template = models.WorkoutTemplate(
+        name="Push",
+        exercise_templates=[models.ExerciseTemplate(name="Bench Press")],
+        user_id=USER_ID,
+    )
+    db.add(template)
+    db.commit()
+    return template.id
+
+
+@pytest.fixture
+def workout_id(db):
+    workout = models.Workout(
+        name="Push",
+        date=date(2026, 1, 15),
+        exercises=[
+            models.Exercise(
+                name="Bench Press",
+                sets=[models.Set(reps=5, weight_kg=w) for w in SET_WEIGHTS],
+            )
+        ],
+        user_id=USER_ID,
+    )
+    db.add(workout)
+    db.commit()
+    analytics.rebuild_summaries(db)
+    return workout.id
+
+
+def progression(client, name):
+    return client.get(f"/analytics/exercises/{name}/progression").json()["points"]
+
+
+def other_user(client):
+    other = client.post("/users/", json={"username": "other"}).json()["id"]
+    return {USER_HEADER: str(other)}
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize("method", ["put", "patch"])
+def test_update_workout_template(client, max_queries, template_id, method):
+    with max_queries(TEMPLATE_UPDATE_QUERIES):
+        response = client.request(
+            method, f"/workout-templates/{template_id}", json={"name": "Push A"}
+        )
+    assert response.status_code == 200
+    assert response.json()["name"] == "Push A"
+    assert [e["name"] for e in response.json()["exercise_templates"]] == ["Bench Press"]
+
+
+def test_update_exercise_template(client, max_queries, template_id):
+    with max_queries(EXERCISE_TEMPLATE_UPDATE_QUERIES):
+        response = client.patch("/exercise-templates/1", json={"name": "Dip"})
+    assert response.json() == {
+        "id": 1,
+        "name": "Dip",
+        "workout_template_id": template_id,
+    }
+
+
+def test_patch_set_keeps_unset_fields(client, max_queries, workout_id):
+    with max_queries(SET_UPDATE_QUERIES):
+        response = client.patch("/sets/1", json={"reps": 8})
+    assert response.json() == {
+        "id": 1,
+        "reps": 8,
+        "weight": SET_WEIGHTS[0],
+        "exercise_id": 1,
+    }
+    assert progression(client, "Bench Press")[0]["total_reps"] == 8 + 5 + 5
+
+
+def test_rename_exercise_moves_summary(client, max_queries, workout_id):
+    with max_queries(EXERCISE_UPDATE_QUERIES):
+        response = client.patch("/exercises/1", json={"name": "Dip"})
+    assert response.json()["name"] == "Dip"
+    assert [s["weight"] for s in response.json()["sets"]] == SET_WEIGHTS
+    assert progression(client, "Bench Press") == []
+    assert progression(client, "Dip")[0]["set_count"] == len(SET_WEIGHTS)
+
+
+def test_patch_workout_date_moves_summary(client, workout_id):
+    response = client.patch(
+        f"/workouts/{workout_id}", json={"date": "2026-02-01T00:00:00"}
+    )
+    assert response.json()["name"] == "Push"
+    assert response.json()["date"].startswith("2026-02-01")
+    assert progression(client, "Bench Press")[0]["period"] == "2026-02-01"
+
+
+def test_patch_current_user(client):
+    response = client.patch("/users/me", json={"timezone": "Europe/Oslo"})
+    assert response.json()["timezone"] == "Europe/Oslo"
+    assert response.json()["default_measurement"] == "kgs"
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/workout-templates/1", {"name": "Mine"}),
+        ("/exercise-templates/1", {"name": "Mine"}),
+        ("/exercises/1", {"name": "Mine"}),
+        ("/sets/1", {"reps": 1}),
+        ("/workouts/1", {"name": "Mine"}),
+    ],
+)
+def test_update_of_other_user_not_found(client, template_id, workout_id, path, body):
+    response = client.patch(path, json=body, headers=other_user(client))
+    assert response.status_code == 404
+    assert client.get("/sets/1").json()["reps"] == 5
+
+
+def test_bulk_update_sets(client, max_queries, workout_id):
+    updates = [{"id": 1, "reps": 6}, {"id": 3, "reps": 4, "weight": 110.0}]
+    with max_queries(SET_UPDATE_QUERIES) as counter:
+        response = client.patch("/exercises/1/sets/", json=updates)
+
+    assert response.status_code == 200
+    assert [(s["id"], s["reps"], s["weight"]) for s in response.json()] == [
+        (1, 6, SET_WEIGHTS[0]),
+        (3, 4, 110.0),
+    ]
+    assert sum(s.startswith("UPDATE sets") for s in counter.statements) == 1
+    assert progression(client, "Bench Press")[0]["max_weight"] == 110.0
+
+
+@pytest.mark.parametrize(
+    "updates, status_code",
+    [
+        ([{"id": 1, "reps": 6}, {"id": 99, "reps": 6}], 404),
+        ([{"id": 1, "reps": 6}, {"id": 1, "reps": 7}], 422),
+        ([{"id": 1}], 422),
+        ([], 422),
+    ],
+)
+def test_bulk_update_sets_all_or_nothing(client, workout_id, updates, status_code):
+    response = client.patch("/exercises/1/sets/", json=updates)
+    assert response.status_code == status_code
+    assert [s["reps"] for s in client.get("/exercises/1/sets/").json()] == [5, 5, 5]
+
+
+def test_bulk_update_sets_of_other_user_not_found(client, workout_id):
+    response = client.patch(
+        "/exercises/1/sets/", json=[{"id": 1, "reps": 6}], headers=other_user(client)
+    )
+    assert response.status_code == 404
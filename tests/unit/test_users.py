@@ -0,0 +1,153 @@
+import pytest
+
+from sqlalchemy import select
+from app import main, models, tenancy
+from app.database import Base
+from app.tenancy import USER_HEADER, ShardRouter, shard_index
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+SHARD_COUNT = 2
+
+LOG = {
+    "name": "Legs",
+    "date": "2026-01-15T18:00:00",
+    "exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100.0}]}],
+}
+
+
+def as_user(user_id):
+    return {USER_HEADER: str(user_id)}
+
+
+def create_user(client, name):
+    response = client.post("/users/", json={"username": name})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+@pytest.fixture
+def other_user(client):
+    return create_user(client, "other")
+
+
+@pytest.fixture
+def sharded(tmp_path, monkeypatch):
+    """Route user data to two file databases, keeping users on the test engine"""
+    router = ShardRouter(
+        [f"sqlite:///{tmp_path / f'shard{i}.db'}" for i in range(SHARD_COUNT)]
+    )
+    for engine in router.engines:
+        Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(tenancy, "shards", router)
+    monkeypatch.setattr(main, "shards", router)
+    yield router
+    router.dispose()
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_create_and_read_user(client):
+    user_id = create_user(client, "lifter")
+    body = client.get("/users/me", headers=as_user(user_id)).json()
+    assert body["username"] == "lifter"
+    assert body["default_measurement"] == "lbs"
+    assert body["created_at"]
+
+
+def test_duplicate_username(client):
+    create_user(client, "lifter")
+    response = client.post("/users/", json={"username": "lifter"})
+    assert response.status_code == 409
+
+
+def test_update_current_user(client, other_user):
+    response = client.put("/users/me", json={"timezone": "Europe/Oslo"})
+    assert response.status_code == 200
+    assert response.json()["timezone"] == "Europe/Oslo"
+
+    assert client.put("/users/me", json={"name": "other"}).status_code == 409
+    assert client.put("/users/me", json={"name": "test"}).status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/users/me", "/workouts/", "/workout-templates/"])
+def test_missing_user_header(client, path):
+    response = client.get(path, headers={USER_HEADER: ""})
+    assert response.status_code in (401, 422)
+    client.headers.pop(USER_HEADER)
+    assert client.get(path).status_code == 401
+
+
+def test_unknown_user(client):
+    assert client.get("/users/me", headers=as_user(999)).status_code == 404
+    response = client.post("/workouts/log", json=LOG, headers=as_user(999))
+    assert response.status_code == 404
+    response = client.post(
+        "/workout-templates/", json={"name": "Push"}, headers=as_user(999)
+    )
+    assert response.status_code == 404
+
+
+def test_users_only_see_their_own_data(client, other_user):
+    template = client.post("/workout-templates/", json={"name": "Push"}).json()
+    workout = client.post("/workouts/log", json=LOG).json()
+    exercise = workout["exercises"][0]
+    other = as_user(other_user)
+
+    for path in [
+        f"/workout-templates/{template['id']}",
+        f"/workouts/{workout['id']}/tree",
+        f"/exercises/{exercise['id']}",
+        f"/sets/{exercise['sets'][0]['id']}",
+    ]:
+        assert client.get(path, headers=other).status_code == 404
+        assert client.get(path).status_code == 200
+    assert client.get("/workouts/", headers=other).json()["items"] == []
+    assert client.get("/workout-templates/", headers=other).json() == []
+
+    response = client.post(
+        f"/workout-templates/{template['id']}/exercise-templates/",
+        json={"name": "Bench Press"},
+        headers=other,
+    )
+    assert response.status_code == 404
+    response = client.delete(f"/exercises/{exercise['id']}", headers=other)
+    assert response.status_code == 404
+
+
+def test_progression_per_user(client, other_user):
+    client.post("/workouts/log", json=LOG)
+    sets = [{"reps": 5, "weight": 200.0}]
+    heavier = {**LOG, "exercises": [{"name": "Squat", "sets": sets}]}
+    client.post("/workouts/log", json=heavier, headers=as_user(other_user))
+
+    url = "/analytics/exercises/Squat/progression"
+    mine = client.get(url).json()["points"]
+    theirs = client.get(url, headers=as_user(other_user)).json()["points"]
+    assert [p["max_weight"] for p in mine] == [100.0]
+    assert [p["max_weight"] for p in theirs] == [200.0]
+
+
+def test_sharded_users(client, sharded):
+    # The first two new users that hash to different shards
+    by_shard, created = {}, 0
+    while len(by_shard) < SHARD_COUNT:
+        created += 1
+        user_id = create_user(client, f"user{created}")
+        by_shard.setdefault(shard_index(user_id, SHARD_COUNT), user_id)
+
+    workouts = {}
+    for index, user_id in by_shard.items():
+        response = client.post("/workouts/log", json=LOG, headers=as_user(user_id))
+        assert response.status_code == 201
+        workouts[index] = response.json()["id"]
+
+    for index, engine in enumerate(sharded.engines):
+        with engine.connect() as connection:
+            rows = connection.execute(select(models.Workout.user_id)).all()
+        assert rows == [(by_shard[index],)]
+        user_id = by_shard[index]
+        tree = client.get(f"/workouts/{workouts[index]}/tree", headers=as_user(user_id))
+        assert tree.json()["exercises"][0]["name"] == "Squat"
@@ -0,0 +1,169 @@
+import pytest
+
+from datetime import date, timedelta
+from app import crud, models
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+START = date(2026, 1, 1)
+DAYS_IN_YEAR = 365
+PAGE_SIZE = 2
+FILTERS = [
+    ({"start": "2026-01-02", "end": "2026-01-03"}, ["Push B", "Pull"]),
+    ({"name": "Push"}, ["Push B", "Push A"]),
+    ({"name": "push"}, []),
+    ({"name": "Push", "start": "2026-01-02"}, ["Push B"]),
+    ({"workout_template_id": 1}, ["Push B", "Push A"]),
+    ({"workout_template_id": 2}, []),
+]
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def seed_workouts(db):
+    """Two sessions of one template plus two unrelated workouts"""
+    template = models.WorkoutTemplate(name="Push", user_id=USER_ID)
+    db.add(template)
+    db.flush()
+    db.add_all(
+        [
+            models.Workout(
+                name="Push A",
+                date=START,
+                workout_template_id=template.id,
+                exercises=[
+                    models.Exercise(
+                        name="Bench Press",
+                        sets=[models.Set(reps=5, weight_kg=100.0) for _ in range(3)],
+                    ),
+                    models.Exercise(name="Dip"),
+                ],
+                user_id=USER_ID,
+            ),
+            models.Workout(
+                name="Pull", date=START + timedelta(days=1), user_id=USER_ID
+            ),
+            models.Workout(
+                name="Push B",
+                date=START + timedelta(days=2),
+                workout_template_id=template.id,
+                user_id=USER_ID,
+            ),
+            models.Workout(
+                name="Legs", date=START + timedelta(days=3), user_id=USER_ID
+            ),
+        ]
+    )
+    db.commit()
+    return template.id
+
+
+def names(response):
+    assert response.status_code == 200
+    return [workout["name"] for workout in response.json()["items"]]
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize("params, expected", FILTERS)
+def test_list_workouts_filters(client, db, params, expected):
+    seed_workouts(db)
+    assert names(client.get("/workouts/", params=params)) == expected
+
+
+@pytest.mark.parametrize(
+    "prefix, upper",
+    [
+        ("Push", "Pusi"),
+        ("a\U0010ffff", "b"),
+        ("\U0010ffff\U0010ffff", None),
+        ("\ud7ff", "\ue000"),
+    ],
+)
+def test_prefix_upper_bound(prefix, upper):
+    assert crud.prefix_upper_bound(prefix) == upper
+
+
+@pytest.mark.parametrize("prefix", ["\U0010ffff", "\ud7ff"])
+def test_list_workouts_highest_code_points(client, db, prefix):
+    seed_workouts(db)
+    db.add(models.Workout(name=prefix + " Day", date=START, user_id=USER_ID))
+    db.commit()
+    response = client.get("/workouts/", params={"name": prefix})
+    assert names(response) == [prefix + " Day"]
+
+
+def test_list_workouts_pages(client, db):
+    seed_workouts(db)
+    first = client.get("/workouts/", params={"limit": PAGE_SIZE}).json()
+    assert [w["name"] for w in first["items"]] == ["Legs", "Push B"]
+    rest = client.get(
+        "/workouts/", params={"limit": PAGE_SIZE, "cursor": first["next_cursor"]}
+    ).json()
+    assert [w["name"] for w in rest["items"]] == ["Pull", "Push A"]
+    assert rest["next_cursor"] is None
+
+
+def test_list_workouts_stats(client, db):
+    template_id = seed_workouts(db)
+    items = client.get("/workouts/", params={"include_stats": True}).json()["items"]
+    push = items[-1]
+    assert push["workout_template_id"] == template_id
+    assert (push["exercise_count"], push["set_count"]) == (2, 3)
+    assert push["total_volume"] == 1500.0
+    assert (items[0]["exercise_count"], items[0]["total_volume"]) == (0, 0.0)
+
+    plain = client.get("/workouts/").json()["items"][-1]
+    assert plain["exercise_count"] is None
+
+
+def test_list_workouts_year_in_one_query(client, db, max_queries):
+    db.add_all(
+        models.Workout(
+            name="Run",
+            date=START + timedelta(days=i),
+            exercises=[
+                models.Exercise(name="Run", sets=[models.Set(reps=1, weight_kg=0)])
+            ],
+            user_id=USER_ID,
+        )
+        for i in range(DAYS_IN_YEAR)
+    )
+    db.commit()
+    params = {
+        "start": "2026-01-01",
+        "end": "2026-12-31",
+        "include_stats": True,
+        "limit": DAYS_IN_YEAR,
+    }
+    with max_queries(1):
+        body = client.get("/workouts/", params=params).json()
+    assert len(body["items"]) == DAYS_IN_YEAR
+    assert body["next_cursor"] is None
+
+
+def test_log_workout_from_template(client, db):
+    template_id = seed_workouts(db)
+    workout = {"name": "Push C", "workout_template_id": template_id}
+    logged = client.post("/workouts/log", json=workout)
+    assert logged.json()["workout_template_id"] == template_id
+    sessions = client.get("/workouts/", params={"workout_template_id": template_id})
+    assert names(sessions)[0] == "Push C"
+
+    workout["workout_template_id"] = 999
+    assert client.post("/workouts/log", json=workout).status_code == 404
+
+
+def test_delete_template_unlinks_workouts(client, db):
+    template_id = seed_workouts(db)
+    client.delete(f"/workout-templates/{template_id}")
+    assert names(client.get("/workouts/", params={"name": "Push"})) == [
+        "Push B",
+        "Push A",
+    ]
+    sessions = client.get("/workouts/", params={"workout_template_id": template_id})
+    assert names(sessions) == []
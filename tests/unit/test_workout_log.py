@@ -0,0 +1,88 @@
+import pytest
+
+from datetime import datetime
+from app import models, schemas
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+# One INSERT ... RETURNING per level of the tree, however large it is, plus
+# the DELETE and INSERT ... SELECT refreshing the progression summaries
+WORKOUT_LOG_QUERIES = 5
+
+
+def build_log(exercises, sets_per_exercise):
+    return {
+        "name": "Leg Day",
+        "date": "2026-01-15T18:00:00",
+        "exercises": [
+            {
+                "name": f"Exercise {i}",
+                "sets": [
+                    {"reps": 5 + j, "weight": 100.0 + i}
+                    for j in range(sets_per_exercise)
+                ],
+            }
+            for i in range(exercises)
+        ],
+    }
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+@pytest.mark.parametrize("exercises, sets_per_exercise", [(1, 1), (6, 4), (20, 10)])
+def test_log_workout_query_count(client, max_queries, exercises, sets_per_exercise):
+    payload = build_log(exercises, sets_per_exercise)
+
+    with max_queries(WORKOUT_LOG_QUERIES):
+        response = client.post("/workouts/log", json=payload)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert len(body["exercises"]) == exercises
+    assert all(len(e["sets"]) == sets_per_exercise for e in body["exercises"])
+
+
+def test_log_workout_matches_stored_tree(client, db):
+    body = client.post("/workouts/log", json=build_log(3, 2)).json()
+
+    workout = db.get(models.Workout, body["id"])
+    assert workout.name == "Leg Day"
+    for exercise, stored in zip(body["exercises"], workout.exercises):
+        assert exercise["id"] == stored.id
+        assert exercise["workout_id"] == workout.id
+        assert [(s["id"], s["reps"], s["weight"]) for s in exercise["sets"]] == [
+            (s.id, s.reps, s.weight_kg) for s in stored.sets
+        ]
+
+
+def test_log_workout_without_exercises(client):
+    response = client.post("/workouts/log", json={"name": "Rest Day"})
+    assert response.status_code == 201
+    assert response.json()["exercises"] == []
+
+
+def test_log_workout_dated_when_sent(client):
+    before = datetime.now()
+    assert schemas.WorkoutLogCreate(name="Rest Day").date >= before
+
+    response = client.post("/workouts/log", json={"name": "Rest Day"})
+    assert response.status_code == 201
+    logged = datetime.fromisoformat(response.json()["date"]).date()
+    assert before.date() <= logged <= datetime.now().date()
+
+
+def test_log_workout_rejects_null_date(client, db):
+    response = client.post("/workouts/log", json={"name": "Rest Day", "date": None})
+    assert response.status_code == 422
+    assert db.query(models.Workout).count() == 0
+
+
+def test_log_workout_rejects_invalid_set(client, db):
+    """Validation fails before anything is written"""
+    payload = build_log(2, 2)
+    payload["exercises"][1]["sets"][0]["reps"] = 0
+
+    assert client.post("/workouts/log", json=payload).status_code == 422
+    assert db.query(models.Workout).count() == 0
@@ -0,0 +1,89 @@
+from app import models
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+TEMPLATE_EXERCISES = ["Bench Press", "Dip", "Bench Press"]
+START_QUERIES = 2
+PREFILL_QUERIES = 3
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def seed_template(db):
+    template = models.WorkoutTemplate(
+        name="Push",
+        exercise_templates=[
+            models.ExerciseTemplate(name=name) for name in TEMPLATE_EXERCISES
+        ],
+        user_id=USER_ID,
+    )
+    db.add(template)
+    db.commit()
+    return template.id
+
+
+def start(client, template_id, **body):
+    response = client.post(f"/workout-templates/{template_id}/start", json=body)
+    assert response.status_code == 201
+    return response.json()
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_start_workout_copies_template(client, db, max_queries):
+    template_id = seed_template(db)
+    with max_queries(START_QUERIES):
+        workout = start(client, template_id, date="2026-01-15T18:00:00")
+    assert workout["name"] == "Push"
+    assert workout["date"].startswith("2026-01-15")
+    assert workout["workout_template_id"] == template_id
+    assert [e["name"] for e in workout["exercises"]] == TEMPLATE_EXERCISES
+    assert all(e["targets"] == [] for e in workout["exercises"])
+
+    tree = client.get(f"/workouts/{workout['id']}/tree").json()
+    assert [e["id"] for e in tree["exercises"]] == [
+        e["id"] for e in workout["exercises"]
+    ]
+
+
+def test_start_workout_name_override(client, db):
+    template_id = seed_template(db)
+    assert start(client, template_id, name="Push (deload)")["name"] == "Push (deload)"
+
+
+def test_start_workout_missing_template(client):
+    assert client.post("/workout-templates/99/start").status_code == 404
+
+
+def test_start_workout_prefills_last_session(client, db, max_queries):
+    template_id = seed_template(db)
+    previous = start(client, template_id, date="2026-01-01T00:00:00")
+    last = start(client, template_id, date="2026-01-08T00:00:00")
+    for exercise in previous["exercises"]:
+        client.post(
+            f"/exercises/{exercise['id']}/sets/", json={"reps": 1, "weight": 50.0}
+        )
+    first_bench, _, second_bench = last["exercises"]
+    for reps in (5, 5):
+        client.post(
+            f"/exercises/{first_bench['id']}/sets/",
+            json={"reps": reps, "weight": 100.0},
+        )
+    client.post(
+        f"/exercises/{second_bench['id']}/sets/", json={"reps": 8, "weight": 80.0}
+    )
+
+    with max_queries(PREFILL_QUERIES):
+        workout = start(client, template_id, prefill=True)
+    assert [e["targets"] for e in workout["exercises"]] == [
+        [{"reps": 5, "weight": 100.0}, {"reps": 5, "weight": 100.0}],
+        [],
+        [{"reps": 8, "weight": 80.0}],
+    ]
+    # Targets are suggestions, not logged sets
+    tree = client.get(f"/workouts/{workout['id']}/tree").json()
+    assert all(e["sets"] == [] for e in tree["exercises"])
@@ -0,0 +1,73 @@
+import pytest
+
+from datetime import date
+from app import models, schemas
+
+# -------------------------------------------------------------------
+# CONSTANTS (Change as needed)
+# -------------------------------------------------------------------
+USER_ID = 1  # the user conftest creates and sends requests as
+WORKOUT_DATE = date(2026, 1, 15)
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def seed_workouts(db):
+    """A full workout, one with an exercise but no sets and an empty one"""
+    workouts = [
+        models.Workout(
+            name="Push",
+            date=WORKOUT_DATE,
+            exercises=[
+                models.Exercise(
+                    name="Bench Press",
+                    sets=[models.Set(reps=5, weight_kg=100.0 + i) for i in range(3)],
+                ),
+                models.Exercise(name="Dip", sets=[models.Set(reps=10, weight_kg=0.0)]),
+            ],
+            user_id=USER_ID,
+        ),
+        models.Workout(
+            name="Pull",
+            date=WORKOUT_DATE,
+            exercises=[models.Exercise(name="Row")],
+            user_id=USER_ID,
+        ),
+        models.Workout(name="Rest", date=WORKOUT_DATE, user_id=USER_ID),
+    ]
+    db.add_all(workouts)
+    db.commit()
+    return [workout.id for workout in workouts]
+
+
+# -------------------------------------------------------------------
+# Unit tests
+# -------------------------------------------------------------------
+def test_workout_tree(client, db):
+    push, pull, rest = seed_workouts(db)
+    tree = client.get(f"/workouts/{push}/tree").json()
+    assert tree["name"] == "Push"
+    assert [e["name"] for e in tree["exercises"]] == ["Bench Press", "Dip"]
+    assert [s["weight"] for s in tree["exercises"][0]["sets"]] == [100, 101, 102]
+    assert tree["exercises"][1]["sets"][0]["exercise_id"] == tree["exercises"][1]["id"]
+
+    assert client.get(f"/workouts/{pull}/tree").json()["exercises"][0]["sets"] == []
+    assert client.get(f"/workouts/{rest}/tree").json()["exercises"] == []
+
+
+def test_workout_trees_keep_request_order(client, db):
+    push, pull, rest = seed_workouts(db)
+    response = client.get(
+        "/workouts/trees", params={"ids": [rest, 999, push, rest, pull]}
+    )
+    assert [tree["name"] for tree in response.json()] == ["Rest", "Push", "Pull"]
+
+
+@pytest.mark.parametrize(
+    "ids, status_code",
+    [([], 422), (list(range(1, schemas.PAGE_LIMIT_MAX + 2)), 422), ([1], 200)],
+)
+def test_workout_trees_id_limits(client, ids, status_code):
+    response = client.get("/workouts/trees", params={"ids": ids})
+    assert response.status_code == status_code